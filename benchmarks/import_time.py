@@ -0,0 +1,90 @@
+import argparse
+import os
+import subprocess
+import sys
+from typing import Any, Dict, List, Tuple
+from config.settings import IMPORT_TIME_BUDGET_MS, IMPORT_TIME_ENTRY_POINTS, LAZY_MODULES
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def import_times(module: str) -> List[Tuple[str, int, float, float]]:
+    # `python -X importtime` for one fresh import of `module`: (name, depth, self ms, cumulative ms) per module
+    # in the order the interpreter finished them; depth 0 is a module imported directly by the statement
+
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            cwd=ROOT, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"importing {module} failed:\n{result.stderr.strip()[-2000:]}")
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        rows.append((name.strip(), depth, int(self_us) / 1000, int(cumulative_us) / 1000))
+    return rows
+
+def measure_entry_point(module: str, runs: int = 5, top: int = 10) -> Dict[str, Any]:
+    # median import time over `runs` fresh interpreters, the heaviest direct imports of the median run
+    # and the lazily imported modules that got imported anyway
+
+    measured = []
+    for _ in range(runs):
+        rows = import_times(module)
+        end = next(index for index, (name, depth, *_) in enumerate(rows) if name == module and depth == 0)
+        # a module finishes after everything it imports, so its subtree is the run of deeper rows right before
+        # it; the rows before that belong to interpreter startup (site, encodings, .pth files)
+        start = end
+        while start > 0 and rows[start - 1][1] > 0:
+            start -= 1
+        measured.append((rows[end][3], rows[start:end]))
+    measured.sort(key=lambda entry: entry[0])
+    total_ms, subtree = measured[len(measured) // 2]
+    children = [(name, cumulative) for name, depth, _, cumulative in subtree if depth == 1]
+    children.sort(key=lambda child: child[1], reverse=True)
+    imported = {name for name, *_ in subtree}
+    return {
+        "module": module,
+        "total_ms": total_ms,
+        "runs_ms": [entry[0] for entry in measured],
+        "heaviest": children[:top],
+        "eager_lazy_modules": [name for name in LAZY_MODULES if name in imported],
+    }
+
+def print_entry_point(result: Dict[str, Any], budget_ms: float) -> bool:
+    ok = result["total_ms"] <= budget_ms and not result["eager_lazy_modules"]
+    icon = "✅" if ok else "❌"
+    spread = ", ".join(f"{ms:.0f}" for ms in result["runs_ms"])
+    print(f"\n{icon} import {result['module']}: {result['total_ms']:.1f} ms "
+          f"(budget {budget_ms:.0f} ms, runs {spread} ms)")
+    for name, cumulative in result["heaviest"]:
+        print(f"➡️ {name:<40} {cumulative:8.1f} ms")
+    for name in result["eager_lazy_modules"]:
+        print(f"❌ {name} is imported at startup; it should only be loaded on first use")
+    return ok
+
+def import_time_main() -> None:
+    # python -m benchmarks.import_time [--budget MS] [--runs N] [module ...]
+    # exits with status 1 when an entry point is over budget, so it can gate CI
+
+    parser = argparse.ArgumentParser(description="Import time of the entry points against the startup budget")
+    parser.add_argument("modules", nargs="*", default=list(IMPORT_TIME_ENTRY_POINTS),
+                        help="modules to import (default: the entry points)")
+    parser.add_argument("--budget", type=float, default=IMPORT_TIME_BUDGET_MS, help="budget per module in ms")
+    parser.add_argument("--runs", type=int, default=5, help="fresh interpreters per module (median is reported)")
+    parser.add_argument("--top", type=int, default=10, help="heaviest direct imports to list")
+    args = parser.parse_args()
+
+    ok = True
+    for module in args.modules:
+        try:
+            result = measure_entry_point(module, max(1, args.runs), args.top)
+        except RuntimeError as e:
+            print(f"❌ {e}")
+            ok = False
+            continue
+        ok = print_entry_point(result, args.budget) and ok
+    sys.exit(0 if ok else 1)
+
+if __name__ == "__main__":
+    import_time_main()
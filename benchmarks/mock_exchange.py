@@ -0,0 +1,217 @@
+import itertools
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+from benchmarks.synthetic import candle_rows, synthetic_markets, synthetic_pairs, synthetic_tickers
+from utils.http_client import HttpClient
+from utils.rate_limiter import RequestScheduler
+
+class MockExchange:
+
+    # local stand-in for the CoinDCX endpoints the bot calls, with injectable latency
+    # every response waits `latency` seconds plus up to `jitter` more; keep-alive is supported so the
+    # pooled client behaves as it does against the real exchange
+    # orders are kept in memory: market orders fill at once, limit orders stay open until cancelled
+
+    def __init__(self, pairs: int = 50, candles: int = 500, latency: float = 0.0, jitter: float = 0.0,
+                 host: str = "127.0.0.1", port: int = 0, seed: int = 7) -> None:
+        self.pairs = synthetic_pairs(pairs)
+        self.candle_count = candles
+        self.latency = latency
+        self.jitter = jitter
+        self.seed = seed
+        self.markets = synthetic_markets(self.pairs)
+        self._by_api_pair = {market["pair"]: market["symbol"] for market in self.markets}
+        self._ticker_step = itertools.count()
+        self._order_ids = itertools.count(1)
+        self._trade_ids = itertools.count(1)
+        self.orders: Dict[str, Dict[str, Any]] = {}
+        self.trades: List[Dict[str, Any]] = []
+        self.requests: Dict[str, int] = {}
+        self._candles_by_pair: Dict[str, List[Dict[str, Any]]] = {}
+        self._base_prices = {ticker["market"]: float(ticker["last_price"])
+                             for ticker in synthetic_tickers(self.pairs, seed)}
+        self._lock = threading.Lock()
+        self._random = random.Random(seed)
+        exchange = self
+
+        class _Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # one buffered write per response with Nagle off; otherwise headers and body go out as two
+            # segments and delayed ACKs add ~40 ms to every keep-alive request
+            wbufsize = -1
+            disable_nagle_algorithm = True
+
+            def log_message(self, format: str, *args: Any) -> None:
+                pass
+
+            def _reply(self) -> None:
+                url = urlparse(self.path)
+                length = int(self.headers.get("Content-Length") or 0)
+                body = json.loads(self.rfile.read(length) or b"{}") if length else {}
+                params = {key: values[-1] for key, values in parse_qs(url.query).items()}
+                status, payload = exchange.handle(self.command, url.path, body, params)
+                exchange.delay()
+                data = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+                self.wfile.flush()
+
+            do_GET = do_POST = _reply
+
+        self._server = ThreadingHTTPServer((host, port), _Handler)
+        self._server.daemon_threads = True
+        self.host, self.port = self._server.server_address[:2]
+        self.url = f"http://{self.host}:{self.port}"
+
+    def delay(self) -> None:
+        if self.latency or self.jitter:
+            time.sleep(self.latency + (self._random.uniform(0, self.jitter) if self.jitter else 0.0))
+
+    def start(self) -> "MockExchange":
+        threading.Thread(target=self._server.serve_forever, name="mock-exchange", daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def client(self, rate_limited: bool = False) -> HttpClient:
+        # an HttpClient pointed at this server; the rate limiter is kept (its bookkeeping is part of the
+        # request path) but without limits unless `rate_limited`
+        scheduler = RequestScheduler() if rate_limited else RequestScheduler(limits={}, global_limit=None)
+        return HttpClient(api_base_url=self.url, public_base_url=self.url, scheduler=scheduler)
+
+    def request_count(self, path: Optional[str] = None) -> int:
+        with self._lock:
+            return self.requests.get(path, 0) if path else sum(self.requests.values())
+
+    def handle(self, method: str, path: str, body: Dict[str, Any], params: Dict[str, str]) -> Tuple[int, Any]:
+        with self._lock:
+            self.requests[path] = self.requests.get(path, 0) + 1
+        handler = self._routes.get(path)
+        if handler is None:
+            return 404, {"message": "not found"}
+        return handler(self, body or params)
+
+    def _ticker(self, _: Dict[str, Any]) -> Tuple[int, Any]:
+        return 200, synthetic_tickers(self.pairs, self.seed, next(self._ticker_step))
+
+    def _markets_details(self, _: Dict[str, Any]) -> Tuple[int, Any]:
+        return 200, self.markets
+
+    def _candles(self, params: Dict[str, Any]) -> Tuple[int, Any]:
+        symbol = self._by_api_pair.get(params.get("pair"))
+        if symbol is None:
+            return 400, {"message": "unknown pair"}
+        rows = self._candles_by_pair.get(symbol)
+        if rows is None:
+            rows = self._candles_by_pair[symbol] = candle_rows(self.candle_count,
+                                                               seed=self.seed + self.pairs.index(symbol))
+        if "startTime" in params:
+            start = int(params["startTime"])
+            rows = [row for row in rows if row["time"] >= start]
+        return 200, rows
+
+    def _price(self, market: str) -> float:
+        return self._base_prices.get(market, 100.0)
+
+    def _new_order(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        market = payload.get("market")
+        quantity = float(payload.get("total_quantity", 0))
+        price = float(payload.get("price_per_unit") or self._price(market))
+        order = {
+            "id": f"mock-{next(self._order_ids)}",
+            "client_order_id": payload.get("client_order_id"),
+            "market": market, "side": payload.get("side"), "order_type": payload.get("order_type"),
+            "price_per_unit": price, "total_quantity": quantity, "remaining_quantity": quantity,
+            "status": "open", "fee_amount": 0.0, "created_at": int(time.time() * 1000),
+        }
+        if payload.get("order_type") == "market_order":
+            order.update(status="filled", remaining_quantity=0.0)
+            self.trades.append({"id": next(self._trade_ids), "order_id": order["id"], "symbol": market,
+                                "side": order["side"], "quantity": quantity, "price": price,
+                                "fee_amount": 0.0, "timestamp": order["created_at"]})
+        self.orders[order["id"]] = order
+        return order
+
+    def _create(self, body: Dict[str, Any]) -> Tuple[int, Any]:
+        with self._lock:
+            return 200, {"orders": [self._new_order(body)]}
+
+    def _create_multiple(self, body: Dict[str, Any]) -> Tuple[int, Any]:
+        with self._lock:
+            return 200, {"orders": [self._new_order(payload) for payload in body.get("orders", [])]}
+
+    def _cancel_ids(self, order_ids: List[str]) -> None:
+        for order_id in order_ids:
+            order = self.orders.get(order_id)
+            if order and order["status"] == "open":
+                order["status"] = "cancelled"
+
+    def _cancel(self, body: Dict[str, Any]) -> Tuple[int, Any]:
+        with self._lock:
+            if body.get("order_id") not in self.orders:
+                return 400, {"message": "order not found"}
+            self._cancel_ids([body["order_id"]])
+        return 200, {"status": "SUCCESS"}
+
+    def _cancel_by_ids(self, body: Dict[str, Any]) -> Tuple[int, Any]:
+        with self._lock:
+            self._cancel_ids(body.get("ids", []))
+        return 200, {"status": "SUCCESS"}
+
+    def _cancel_all(self, body: Dict[str, Any]) -> Tuple[int, Any]:
+        with self._lock:
+            self._cancel_ids([order_id for order_id, order in self.orders.items()
+                              if order["market"] == body.get("market")
+                              and (not body.get("side") or order["side"] == body["side"])])
+        return 200, {"status": "SUCCESS"}
+
+    def _status(self, body: Dict[str, Any]) -> Tuple[int, Any]:
+        with self._lock:
+            order = self.orders.get(body.get("order_id") or body.get("id"))
+            if order is None:
+                return 400, {"message": "order not found"}
+            filled = order["total_quantity"] - order["remaining_quantity"]
+            return 200, dict(order, filled_quantity=filled, average_price=order["price_per_unit"])
+
+    def _active_orders(self, body: Dict[str, Any]) -> Tuple[int, Any]:
+        with self._lock:
+            return 200, {"orders": [order for order in self.orders.values() if order["status"] == "open"
+                                    and (not body.get("market") or order["market"] == body["market"])]}
+
+    def _trade_history(self, body: Dict[str, Any]) -> Tuple[int, Any]:
+        from_id = int(body.get("from_id") or 0)
+        limit = int(body.get("limit") or 500)
+        with self._lock:
+            return 200, [trade for trade in self.trades if trade["id"] >= from_id][:limit]
+
+    def _users_info(self, _: Dict[str, Any]) -> Tuple[int, Any]:
+        return 200, {"coindcx_id": "mock-user", "first_name": "Mock", "email": "mock@example.com"}
+
+    def _users_balances(self, _: Dict[str, Any]) -> Tuple[int, Any]:
+        return 200, [{"currency": "INR", "balance": "100000.0", "locked_balance": "0.0"}]
+
+    _routes = {
+        "/exchange/ticker": _ticker,
+        "/exchange/v1/markets_details": _markets_details,
+        "/market_data/candles": _candles,
+        "/exchange/v1/orders/create": _create,
+        "/exchange/v1/orders/create_multiple": _create_multiple,
+        "/exchange/v1/orders/cancel": _cancel,
+        "/exchange/v1/orders/cancel_by_ids": _cancel_by_ids,
+        "/exchange/v1/orders/cancel_all": _cancel_all,
+        "/exchange/v1/orders/status": _status,
+        "/exchange/v1/orders/active_orders": _active_orders,
+        "/exchange/v1/orders/trade_history": _trade_history,
+        "/exchange/v1/users/info": _users_info,
+        "/exchange/v1/users/balances": _users_balances,
+    }
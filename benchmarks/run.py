@@ -0,0 +1,339 @@
+import argparse
+import contextlib
+import gc
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+import numpy as np
+import pandas as pd
+from config.settings import BENCHMARK_RESULTS_DIR, DEBUG_MODE
+from benchmarks.mock_exchange import MockExchange
+from benchmarks.synthetic import synthetic_candles
+from utils.lazy_imports import preload
+
+# a case: name -> (setup() -> call, iterations); setup runs once, outside the timed region
+Case = Callable[[], Callable[[], Any]]
+
+def measure(func: Callable[[], Any], iterations: int, warmup: int = 3) -> Dict[str, float]:
+    # per-call latency percentiles (microseconds) and throughput for `iterations` calls
+
+    for _ in range(min(warmup, iterations)):
+        func()
+    samples = np.empty(iterations, dtype=np.int64)
+    clock = time.perf_counter_ns
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        total_start = clock()
+        for i in range(iterations):
+            start = clock()
+            func()
+            samples[i] = clock() - start
+        total = clock() - total_start
+    finally:
+        if gc_enabled:
+            gc.enable()
+    micros = samples / 1000.0
+    return {
+        "iterations": iterations,
+        "mean_us": float(micros.mean()),
+        "p50_us": float(np.percentile(micros, 50)),
+        "p95_us": float(np.percentile(micros, 95)),
+        "p99_us": float(np.percentile(micros, 99)),
+        "max_us": float(micros.max()),
+        "ops_per_sec": iterations / (total / 1e9) if total else 0.0,
+    }
+
+class BenchmarkSuite:
+
+    # the trading hot path against synthetic data and a local mock exchange
+    # `scale` multiplies the iteration counts; `latency` is injected into every mock exchange response
+    # cases that cannot run here (e.g. pandas_ta missing) are recorded with their error, not dropped
+
+    def __init__(self, candles: int = 500, pairs: int = 50, latency: float = 0.0, scale: float = 1.0,
+                 only: Optional[List[str]] = None) -> None:
+        self.candles = candles
+        self.pairs = pairs
+        self.latency = latency
+        self.scale = scale
+        self.only = only
+        self.results: Dict[str, Dict[str, Any]] = {}
+
+    def _iterations(self, base: int) -> int:
+        return max(1, int(base * self.scale))
+
+    def _run_case(self, name: str, setup: Case, iterations: int) -> None:
+        if self.only and not any(name.startswith(prefix) for prefix in self.only):
+            return
+        try:
+            with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+                func = setup()
+                result = measure(func, self._iterations(iterations))
+        except Exception as e:
+            result = {"error": f"{type(e).__name__}: {e}"}
+        self.results[name] = result
+        if "error" in result:
+            print(f"⚠️ {name}: skipped ({result['error']})")
+        else:
+            print(f"⏱️ {name}: mean {result['mean_us']:.1f} us | p95 {result['p95_us']:.1f} us | "
+                  f"{result['ops_per_sec']:.0f} ops/s")
+
+    def _compute_cases(self) -> None:
+        # pure CPU: no network, no disk except the trade log
+
+        from utils.incremental_indicators import IncrementalIndicators
+        from utils.technical_indicators import TechnicalIndicators
+        from core.signal_generator import SignalGenerator
+        from core.quantity_utils import QuantityUtils
+        from core.position_manager import PositionManager
+        from utils.request_signer import RequestSigner
+
+        df = synthetic_candles(self.candles)
+
+        def needs_pandas_ta() -> None:
+            # pandas_ta is imported lazily, so check for it here: its absence only skips the cases that need it
+            if not preload("pandas_ta"):
+                raise ImportError("pandas_ta is not installed")
+
+        def indicators():
+            needs_pandas_ta()
+            return lambda: TechnicalIndicators.calculate(df.copy())
+        self._run_case(f"indicators.calculate[{self.candles}]", indicators, 50)
+
+        def incremental():
+            engine = IncrementalIndicators()
+            engine.update_from_frame(df)
+            times = iter(range(10 ** 9))
+            last = df.iloc[-1]
+            return lambda: engine.update(df.index[-1] + pd.Timedelta(minutes=5 * (next(times) + 1)),
+                                         last["high"], last["low"], last["close"], last["volume"])
+        self._run_case("indicators.incremental_update", incremental, 20000)
+
+        def signals():
+            generator = SignalGenerator()
+            engine = IncrementalIndicators(history=generator.rules.lookback + 1)
+            engine.update_from_frame(df)
+            frame = engine.tail_frame()
+            return lambda: generator.analyze_indicators(frame)
+        self._run_case("signals.analyze_indicators", signals, 5000)
+
+        def signals_vectorized():
+            needs_pandas_ta()
+            generator = SignalGenerator()
+            frame = TechnicalIndicators.calculate(df.copy())
+            return lambda: generator.analyze_indicators_vectorized(frame)
+        self._run_case(f"signals.vectorized[{self.candles}]", signals_vectorized, 200)
+
+        def quantity():
+            details = {"step": 0.0001, "target_currency_precision": 4, "min_quantity": 0.0001,
+                       "max_quantity": 1_000_000.0}
+            return lambda: QuantityUtils.calculate_quantity(10_000.0, 8_952_183.33, details)
+        self._run_case("quantity.calculate_quantity", quantity, 20000)
+
+        def positions():
+            manager = PositionManager()
+            for i in range(100):
+                manager.open("BTCINR", 100.0, 1.0, 90.0 - i * 0.01, 120.0 + i * 0.01, 100.0)
+            prices = iter(np.random.default_rng(1).uniform(95.0, 105.0, 10 ** 6))
+            return lambda: manager.evaluate("BTCINR", float(next(prices)))
+        self._run_case("positions.evaluate[100]", positions, 5000)
+
+        def signer():
+            request_signer = RequestSigner(api_key="bench", api_secret="x" * 64)
+            return lambda: request_signer.sign_payload({"market": "BTCINR", "side": "buy",
+                                                        "order_type": "market_order",
+                                                        "total_quantity": 0.01675, "timestamp": 1700000000000})
+        self._run_case("signer.sign_payload", signer, 20000)
+
+        def log_trade():
+            from utils.logging_utils import Logger
+            return lambda: Logger.log_trade("BTCINR", 100.0, 1000.0, 10.0, 5000.0, "buy", 99.0, 102.0)
+        self._run_case("logger.log_trade", log_trade, 5000)
+
+        def log_trade_flush():
+            from utils.logging_utils import Logger
+            def _batch():
+                for _ in range(100):
+                    Logger.log_trade("BTCINR", 100.0, 1000.0, 10.0, 5000.0, "buy", 99.0, 102.0)
+                Logger.flush()
+            return _batch
+        self._run_case("logger.log_trade_flush[100]", log_trade_flush, 50)
+
+    def _exchange_cases(self, exchange: MockExchange) -> None:
+        # request path and end-to-end loop against the mock exchange
+
+        from core.OMS import OrderManagementSystem
+        from core.quantity_utils import QuantityUtils
+        from core.signal_generator import SignalGenerator
+        from utils.historical_data import HistoricalData
+        from utils.incremental_indicators import IncrementalIndicators
+        from utils.market_data import MarketData, TickerSnapshot
+        from utils.request_signer import RequestSigner
+
+        pair = exchange.pairs[0]
+
+        def ticker():
+            return TickerSnapshot.fetch
+        self._run_case(f"http.ticker_snapshot[{self.pairs}]", ticker, 300)
+
+        def market_order():
+            oms = OrderManagementSystem(signer=RequestSigner(api_key="bench", api_secret="x" * 64))
+            return lambda: oms.place_market_order(pair, "buy", 0.01)
+        self._run_case("oms.place_market_order", market_order, 300)
+
+        def batch_orders():
+            oms = OrderManagementSystem(signer=RequestSigner(api_key="bench", api_secret="x" * 64))
+            orders = [{"market": market, "side": "buy", "order_type": "limit_order", "total_quantity": 0.01,
+                       "price_per_unit": 1.0} for market in exchange.pairs[:10]]
+            return lambda: oms.place_orders(orders)
+        self._run_case("oms.place_orders[10]", batch_orders, 100)
+
+        def monitor_cycle():
+            # one monitor_price_and_execute cycle: candle sync, indicators, signal, fresh ticker, sizing
+            generator = SignalGenerator()
+            engine = IncrementalIndicators(history=generator.rules.lookback + 1)
+
+            def _cycle():
+                df = HistoricalData.fetch(pair)
+                engine.update_from_frame(df)
+                generator.analyze_indicators(engine.tail_frame())
+                price = MarketData.get_ticker_snapshot(max_age=0).price(pair)
+                QuantityUtils.calculate_quantity(1000.0, price, MarketData.get_market_details(pair))
+            return _cycle
+        self._run_case("loop.monitor_cycle", monitor_cycle, 100)
+
+    def run(self) -> Dict[str, Any]:
+        from utils.candle_store import candle_store
+        from utils.http_client import get_client, set_client
+        from utils.logging_utils import Logger
+        from utils.market_data import MarketData
+
+        workdir = tempfile.mkdtemp(prefix="bench-")
+        previous_client = get_client()
+        previous_root, previous_logs = candle_store.root, Logger.LOGS_FOLDER
+        exchange = MockExchange(pairs=self.pairs, candles=self.candles, latency=self.latency).start()
+        client = exchange.client()
+        try:
+            # nothing touches the real exchange, the real candle store or logs/trades.csv
+            Logger.shutdown()
+            Logger.LOGS_FOLDER = os.path.join(workdir, "logs")
+            candle_store.root = os.path.join(workdir, "candles")
+            candle_store._series.clear()
+            set_client(client)
+            MarketData.invalidate_market_details()
+            started = time.perf_counter()
+            self._compute_cases()
+            self._exchange_cases(exchange)
+            elapsed = time.perf_counter() - started
+        finally:
+            Logger.shutdown()
+            Logger.LOGS_FOLDER = previous_logs
+            candle_store.root = previous_root
+            candle_store._series.clear()
+            set_client(previous_client)
+            MarketData.invalidate_market_details()
+            client.close()
+            exchange.stop()
+            shutil.rmtree(workdir, ignore_errors=True)
+        return {"meta": self.metadata(elapsed, exchange.request_count()), "results": self.results}
+
+    def metadata(self, elapsed: float, requests: int) -> Dict[str, Any]:
+        return {
+            "commit": _git("rev-parse", "HEAD"),
+            "dirty": bool(_git("status", "--porcelain", "--untracked-files=no")),
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "debug_mode": DEBUG_MODE,
+            "candles": self.candles,
+            "pairs": self.pairs,
+            "latency_ms": self.latency * 1000,
+            "scale": self.scale,
+            "elapsed_s": elapsed,
+            "mock_requests": requests,
+        }
+
+def _git(*args: str) -> Optional[str]:
+    try:
+        return subprocess.run(["git", *args], capture_output=True, text=True, check=True,
+                              cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def save_results(results: Dict[str, Any], path: Optional[str] = None) -> str:
+    # write to BENCHMARK_RESULTS_DIR/<time>_<commit>.json unless a path is given
+
+    if path is None:
+        commit = (results["meta"].get("commit") or "nocommit")[:10]
+        stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        path = os.path.join(BENCHMARK_RESULTS_DIR, f"{stamp}_{commit}.json")
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+    return path
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float = 0.10) -> List[Dict[str, Any]]:
+    # mean latency ratio per case present in both runs; ratio > 1 + threshold is a regression
+
+    rows = []
+    for name, result in sorted(current["results"].items()):
+        base = baseline["results"].get(name)
+        if not base or "error" in base or "error" in result:
+            continue
+        ratio = result["mean_us"] / base["mean_us"] if base["mean_us"] else float("inf")
+        rows.append({"case": name, "baseline_us": base["mean_us"], "current_us": result["mean_us"],
+                     "ratio": ratio, "regression": ratio > 1 + threshold,
+                     "improvement": ratio < 1 - threshold})
+    return rows
+
+def print_comparison(rows: List[Dict[str, Any]]) -> None:
+    for row in rows:
+        marker = "❌" if row["regression"] else ("✅" if row["improvement"] else "➖")
+        print(f"{marker} {row['case']}: {row['baseline_us']:.1f} us -> {row['current_us']:.1f} us "
+              f"({row['ratio']:.2f}x)")
+
+def benchmark_main(argv: Optional[List[str]] = None) -> int:
+    # python -m benchmarks.run [--candles N] [--pairs N] [--latency-ms MS] [--scale X] [--only PREFIX ...]
+    #                          [--output FILE] [--compare BASELINE.json [CURRENT.json]]
+    # exits 1 when --compare finds a regression
+
+    parser = argparse.ArgumentParser(description="Benchmark the trading hot path against a local mock exchange")
+    parser.add_argument("--candles", type=int, default=500)
+    parser.add_argument("--pairs", type=int, default=50)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--scale", type=float, default=1.0)
+    parser.add_argument("--only", nargs="*")
+    parser.add_argument("--output")
+    parser.add_argument("--compare", nargs="+", metavar="RESULTS")
+    parser.add_argument("--threshold", type=float, default=0.10)
+    args = parser.parse_args(argv)
+
+    if args.compare and len(args.compare) == 2:
+        with open(args.compare[0], encoding="utf-8") as f:
+            baseline = json.load(f)
+        with open(args.compare[1], encoding="utf-8") as f:
+            current = json.load(f)
+    else:
+        suite = BenchmarkSuite(candles=args.candles, pairs=args.pairs, latency=args.latency_ms / 1000,
+                               scale=args.scale, only=args.only)
+        current = suite.run()
+        print(f"✅ Results saved to {save_results(current, args.output)}")
+        if not args.compare:
+            return 0
+        with open(args.compare[0], encoding="utf-8") as f:
+            baseline = json.load(f)
+    rows = compare(baseline, current, args.threshold)
+    print_comparison(rows)
+    return 1 if any(row["regression"] for row in rows) else 0
+
+if __name__ == "__main__":
+    sys.exit(benchmark_main())
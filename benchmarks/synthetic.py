@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+from typing import Any, Dict, List, Optional
+from utils.ohlcv_archive import INTERVAL_MS
+
+# deterministic market data for benchmarks: the same seed gives the same candles and tickers on every run
+
+def synthetic_pairs(count: int) -> List[str]:
+    # BENCH0INR, BENCH1INR, ... plus the real pairs the defaults use
+    base = ["BTCINR", "ETHINR", "ADAINR"]
+    return (base + [f"BENCH{i}INR" for i in range(max(0, count - len(base)))])[:count]
+
+def synthetic_candle_array(count: int, start_price: float = 100.0, volatility: float = 0.002,
+                           start_time: int = 1_700_000_000_000, interval: str = "5m",
+                           seed: int = 7) -> np.ndarray:
+    # (count, 6) array of time, open, high, low, close, volume from a log-normal random walk
+
+    rng = np.random.default_rng(seed)
+    returns = rng.normal(0.0, volatility, count)
+    close = start_price * np.exp(np.cumsum(returns))
+    open_ = np.concatenate(([start_price], close[:-1]))
+    spread = np.abs(rng.normal(0.0, volatility, count)) * close
+    high = np.maximum(open_, close) + spread
+    low = np.minimum(open_, close) - spread
+    volume = rng.lognormal(3.0, 0.6, count)
+    times = start_time + np.arange(count, dtype=np.int64) * INTERVAL_MS[interval]
+    return np.column_stack((times.astype(np.float64), open_, high, low, close, volume))
+
+def synthetic_candles(count: int, start_price: float = 100.0, seed: int = 7, interval: str = "5m") -> pd.DataFrame:
+    # DataFrame shaped like HistoricalData.fetch(): timestamp index and open/high/low/close/volume columns
+
+    data = synthetic_candle_array(count, start_price, seed=seed, interval=interval)
+    df = pd.DataFrame(data[:, 1:], columns=["open", "high", "low", "close", "volume"])
+    df.index = pd.to_datetime(data[:, 0].astype(np.int64), unit="ms")
+    df.index.name = "timestamp"
+    return df
+
+def candle_rows(count: int, start_price: float = 100.0, seed: int = 7, interval: str = "5m",
+                start_time: Optional[int] = None) -> List[Dict[str, Any]]:
+    # candles in the public candles endpoint format (newest first, like CoinDCX)
+
+    kwargs = {} if start_time is None else {"start_time": start_time}
+    data = synthetic_candle_array(count, start_price, seed=seed, interval=interval, **kwargs)
+    return [{"time": int(row[0]), "open": row[1], "high": row[2], "low": row[3], "close": row[4], "volume": row[5]}
+            for row in data[::-1]]
+
+def synthetic_tickers(pairs: List[str], seed: int = 7, step: int = 0) -> List[Dict[str, Any]]:
+    # one ticker entry per pair; `step` moves every price along its own random walk
+
+    rng = np.random.default_rng(seed)
+    base = rng.uniform(1.0, 5_000_000.0, len(pairs))
+    drift = np.random.default_rng(seed + step).normal(0.0, 0.001, len(pairs)) if step else np.zeros(len(pairs))
+    prices = base * (1 + drift)
+    return [{"market": pair, "last_price": f"{price:.6f}", "bid": f"{price * 0.999:.6f}",
+             "ask": f"{price * 1.001:.6f}", "volume": "1000.0", "timestamp": 1_700_000_000 + step}
+            for pair, price in zip(pairs, prices)]
+
+def synthetic_markets(pairs: List[str]) -> List[Dict[str, Any]]:
+    # markets_details entries with the fields QuantityUtils and the candle store read
+
+    return [{"coindcx_name": pair, "symbol": pair, "pair": f"I-{pair[:-3]}_INR",
+             "base_currency_short_name": "INR", "target_currency_short_name": pair[:-3],
+             "min_quantity": 0.0001, "max_quantity": 1_000_000.0, "step": 0.0001,
+             "target_currency_precision": 4, "base_currency_precision": 2, "status": "active"}
+            for pair in pairs]
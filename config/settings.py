@@ -15,3 +15,141 @@ WALLET_THRESHOLD = 100
 
 # debugging mode is set to false/true for better security to restrict printing output on terminal as required
 DEBUG_MODE = True
+
+# market metadata cache (seconds before markets_details is downloaded again)
+MARKET_DETAILS_TTL = 300
+MARKET_DETAILS_BACKGROUND_REFRESH = True
+
+# ticker snapshots younger than this many seconds are reused instead of downloading the ticker again
+TICKER_MAX_AGE = 1.0
+
+# HTTP client: base URLs, connection pool, (connect, read) timeouts per endpoint class and GET retries
+API_BASE_URL = "https://api.coindcx.com"
+PUBLIC_BASE_URL = "https://public.coindcx.com"
+HTTP_POOL_SIZE = 10
+HTTP_TIMEOUTS = {
+    "ticker": (3.05, 5),
+    "markets": (3.05, 10),
+    "candles": (3.05, 10),
+    "orders": (3.05, 10),
+    "order_queries": (3.05, 10),
+    "account": (3.05, 10),
+    "default": (3.05, 10),
+}
+HTTP_MAX_RETRIES = 3
+HTTP_RETRY_BACKOFF = 0.25
+HTTP_RETRY_BUDGET = 0.2
+
+# price feed for position monitoring: "poll" polls the REST ticker, "stream" reads pushed prices
+# from a socket stream and falls back to polling while the stream is down
+PRICE_FEED = "poll"
+PRICE_STREAM_HOST = "127.0.0.1"
+PRICE_STREAM_PORT = 8765
+PRICE_STREAM_RECONNECT_DELAY = 10
+PRICE_POLL_INTERVAL = 5
+
+# local candle store (one append-only file per pair and interval), candles the exchange returns per
+# request, and the most pages a sync reads backwards to fill the gap left by downtime
+CANDLE_STORE_DIR = "data/candles"
+CANDLE_PAGE_SIZE = 500
+CANDLE_SYNC_MAX_PAGES = 50
+
+# memory-mapped OHLCV archives for backtests (one columnar file per pair and interval)
+OHLCV_ARCHIVE_DIR = "data/archive"
+
+# multi-pair asyncio runner
+RUNNER_CYCLE_INTERVAL = 5
+RUNNER_MAX_CONCURRENCY = 8
+
+# parallel universe scan (None uses every core)
+SCAN_MAX_WORKERS = None
+
+# parameter sweep output (ranked table)
+SWEEP_RESULTS_FILE = "logs/sweep_results.csv"
+
+# trade log writer: rows are queued and written in batches by a background thread
+TRADE_LOG_QUEUE_SIZE = 10000
+TRADE_LOG_BATCH_SIZE = 100
+TRADE_LOG_FLUSH_INTERVAL = 1.0
+
+# trade log backend: "csv" (logs/trades.csv), "sqlite" (indexed trade journal) or "both"
+TRADE_LOG_BACKEND = "csv"
+TRADE_JOURNAL_PATH = "logs/trades.db"
+
+# batch order requests: use the multi-order endpoints (create_multiple, cancel_by_ids), falling back to
+# concurrent single requests with up to OMS_BATCH_MAX_WORKERS in flight
+OMS_MULTI_ORDER_ENDPOINTS = True
+OMS_BATCH_MAX_WORKERS = 8
+
+# client-side rate limits per endpoint class: (requests per second, burst), plus one global bucket
+# priority lanes: lower numbers go first when the global budget is short; "orders" are creates and
+# cancels, "order_queries" the read-only status, active-order and trade-history polling
+RATE_LIMITS = {
+    "orders": (10, 20),
+    "order_queries": (5, 10),
+    "account": (2, 5),
+    "candles": (5, 10),
+    "ticker": (2, 4),
+    "markets": (1, 2),
+    "default": (5, 10),
+}
+RATE_LIMIT_GLOBAL = (15, 20)
+RATE_LIMIT_PRIORITIES = {"orders": 0, "order_queries": 1, "account": 1, "ticker": 2, "candles": 3, "markets": 3,
+                         "default": 2}
+RATE_LIMIT_BACKOFF = 1.0
+RATE_LIMIT_MAX_BACKOFF = 60.0
+RATE_LIMIT_ENABLED = True
+
+# order reconciliation: whether live trading keeps the local order book in sync with the exchange,
+# seconds between bulk active-order/trade-history syncs, seconds a freshly placed order may be missing
+# from the exchange's active list, trades fetched per page, and the most pages read in one cycle
+ORDER_RECONCILER_ENABLED = True
+ORDER_RECONCILE_INTERVAL = 5
+ORDER_RECONCILE_GRACE = 2.0
+ORDER_HISTORY_PAGE = 500
+ORDER_HISTORY_MAX_PAGES = 10
+
+# recorded ticker prices for paper trading replays (one compact binary file per recording)
+TICK_DATA_DIR = "data/ticks"
+
+# adaptive exit polling: the ticker poll interval for open positions follows their distance to the nearest
+# stop/target in ATRs (safety factor x estimated time to get there), bounded by min/max seconds
+ADAPTIVE_POLLING = True
+POLL_MIN_INTERVAL = 1.0
+POLL_MAX_INTERVAL = 30.0
+POLL_SAFETY_FACTOR = 0.25
+
+# benchmark suite results (python -m benchmarks.run), one JSON file per run
+BENCHMARK_RESULTS_DIR = "logs/benchmarks"
+
+# per-stage latency metrics in Prometheus text format: a local /metrics endpoint (port, None to disable)
+# and/or a file rewritten every METRICS_FILE_INTERVAL seconds; quantiles cover the last METRICS_RESERVOIR
+# observations per stage
+METRICS_ENABLED = False
+METRICS_PORT = 9108
+METRICS_FILE = None
+METRICS_FILE_INTERVAL = 15
+METRICS_RESERVOIR = 1024
+
+# tick-to-order traces of every exit (python -m utils.exit_traces for the report), kept in the logs folder
+EXIT_TRACE_ENABLED = True
+EXIT_TRACE_FILE = "exit_traces.bin"
+
+# SignalGenerator rules (core/signal_rules.py), checked in order; the first that holds on a bar is its signal
+# comparisons of indicator columns and numbers, prev(x) / prev(x, n), `a crosses_above b`, `a crosses_below b`,
+# combined with and / or / not
+SIGNAL_RULES = {
+    "buy": ("EMA_9 > EMA_21 and close > EMA_9 and Volume > prev(Volume) * 1.2 and RSI < 30 "
+            "and MACD crosses_above MACD_Signal and close <= BBL and Stoch_%K < 20"),
+    "sell": ("EMA_9 < EMA_21 and close < EMA_9 and Volume > prev(Volume) * 1.2 and RSI > 70 "
+             "and MACD crosses_below MACD_Signal and close >= BBU and Stoch_%K > 80"),
+}
+
+# startup: while the user types and the bot authenticates, worker threads import the heavy modules and fill
+# the market metadata and candle caches; `python -m benchmarks.import_time` fails when importing an entry
+# point takes longer than the budget (milliseconds) or pulls in one of the lazily imported modules
+STARTUP_WARMUP = True
+STARTUP_WARMUP_WORKERS = 4
+LAZY_MODULES = ("pandas", "numpy", "pandas_ta", "requests")
+IMPORT_TIME_BUDGET_MS = 150
+IMPORT_TIME_ENTRY_POINTS = ("main", "paper_trading")
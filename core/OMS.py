@@ -1,14 +1,18 @@
+import threading
 import time
-import hmac
-import hashlib
-import requests
 import json
+import secrets
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
-from typing import Dict, Optional, List
-from config.settings import API_KEY, API_SECRET, DEBUG_MODE
+from typing import Any, Dict, Iterable, Optional, List, Tuple
+from config.settings import DEBUG_MODE, OMS_BATCH_MAX_WORKERS, OMS_MULTI_ORDER_ENDPOINTS
+from utils.http_client import HttpClient, get_client
+from utils.metrics import metrics
+from utils.request_signer import RequestSigner, get_signer
 
-BASE_URL = "https://api.coindcx.com"
+# create_multiple statuses that mean the batch was refused outright, so no leg was placed
+BATCH_REJECTED_STATUSES = (400, 404, 405, 422)
 
 @dataclass
 class Order:
@@ -29,56 +33,70 @@ class Order:
     avg_price: float = 0.0
     stop_price: Optional[float] = None
     take_profit: Optional[float] = None
+    # unix times the create request went out and was acknowledged
+    sent_at: Optional[float] = None
+    acknowledged_at: Optional[float] = None
+
+@dataclass
+class OrderResult:
+
+    # outcome of one leg of a batch order request
+
+    request: Dict[str, Any]
+    order: Optional[Order] = None
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.order is not None
 
 class OrderManagementSystem:
     
     # manages order placement, cancellation, and status retrieval via CoinDCX API
     
-    def __init__(self) -> None:
-        self.base_url = BASE_URL
+    def __init__(self, http_client: Optional[HttpClient] = None, signer: Optional[RequestSigner] = None) -> None:
+        # uses the process-wide pooled client and signer unless they are injected
+        self.http_client = http_client
+        self.signer = signer
         self.active_orders: Dict[str, Order] = {}
         self.order_history: List[Order] = []
+        # secondary indexes over active_orders: market -> {order_id: order}, STATUS -> {order_id: order}
+        self.orders_by_market: Dict[str, Dict[str, Order]] = {}
+        self.orders_by_status: Dict[str, Dict[str, Order]] = {}
+        self._orders_lock = threading.RLock()
+        self.max_workers = OMS_BATCH_MAX_WORKERS
+        # flipped off when the exchange rejects a multi-order endpoint, so later batches go straight to the fallback
+        self.multi_order_endpoints = OMS_MULTI_ORDER_ENDPOINTS
 
-    def _generate_signature(self, payload: Dict) -> str:
-        # enerate HMAC signature for a given payload
+    def _send_signed(self, endpoint: str, payload: Dict, method: str = "POST") -> Tuple[int, Any]:
+        # sign and send a request; returns (status code, parsed body or text) and raises on network errors
 
-        payload_str = str(payload).replace("'", '"')
-        return hmac.new(
-            API_SECRET.encode('utf-8'),
-            payload_str.encode('utf-8'),
-            hashlib.sha256
-        ).hexdigest()
+        client = self.http_client or get_client()
+        # the signed bytes are sent as the body unchanged
+        body, headers = (self.signer or get_signer()).sign_payload(payload)
+        if DEBUG_MODE:
+            print(f"\n🔍 Making {method} request to {client.url(endpoint)}")
+            print(f"Payload: {payload}")
+            print(f"Headers: {headers}")
+        # round trip per endpoint, including rate-limit waits and retries
+        with metrics.span("oms_request", endpoint=endpoint):
+            response = client.request(method, endpoint, headers=headers, data=body)
+        if response.status_code in (200, 201):
+            if DEBUG_MODE:
+                print(f"✅ API Request Successful: {response.status_code}")
+                print(f"Response: {response.json()}")
+            return response.status_code, response.json()
+        if DEBUG_MODE:
+            print(f"❌ API Request Failed: {response.status_code}")
+            print(f"Response: {response.text}")
+        return response.status_code, response.text
 
     def _make_authenticated_request(self, endpoint: str, payload: Dict, method: str = "POST") -> Optional[Dict]:
         # make an authenticated request to the specified endpoint
         
-        url = f"{self.base_url}{endpoint}"
-        if 'timestamp' not in payload:
-            payload['timestamp'] = int(time.time() * 1000)
-        signature = self._generate_signature(payload)
-        headers = {
-            "Content-Type": "application/json",
-            "X-AUTH-APIKEY": API_KEY,
-            "X-AUTH-SIGNATURE": signature
-        }
-        if DEBUG_MODE:
-            print(f"\n🔍 Making {method} request to {endpoint}")
-            print(f"Payload: {payload}")
-            print(f"Headers: {headers}")
         try:
-            response = (requests.post(url, headers=headers, json=payload)
-                        if method == "POST"
-                        else requests.get(url, headers=headers, json=payload))
-            if response.status_code in (200, 201):
-                if DEBUG_MODE:
-                    print(f"✅ API Request Successful: {response.status_code}")
-                    print(f"Response: {response.json()}")
-                return response.json()
-            else:
-                if DEBUG_MODE:
-                    print(f"❌ API Request Failed: {response.status_code}")
-                    print(f"Response: {response.text}")
-                return None
+            status_code, body = self._send_signed(endpoint, payload, method)
+            return body if status_code in (200, 201) else None
         except Exception as e:
             if DEBUG_MODE:
                 print(f"❌ Request Error: {e}")
@@ -93,7 +111,11 @@ class OrderManagementSystem:
         else:
             # try to get the order directly from the response
             order_data = response
-        
+        return self._order_from_data(order_data, payload)
+
+    def _order_from_data(self, order_data: Dict, payload: Dict) -> Optional[Order]:
+        # build an Order from one acknowledged order and the payload that created it
+
         order_id = order_data.get("id") or order_data.get("orderId")
         status = order_data.get("status", "").upper()
 
@@ -117,70 +139,253 @@ class OrderManagementSystem:
             )
         return None
 
-    def place_market_order(self, market: str, side: str, total_quantity: float,
-                           stop_loss: Optional[float] = None, take_profit: Optional[float] = None) -> Optional[Order]:
-        # place a market order and return the created Order object
-        
+    @staticmethod
+    def _order_payload(market: str, side: str, order_type: str, total_quantity: float,
+                       price_per_unit: Optional[float] = None, stop_loss: Optional[float] = None,
+                       take_profit: Optional[float] = None, **extra: Any) -> Dict[str, Any]:
         payload = {
             "market": market,
             "side": side,
-            "order_type": "market_order",
+            "order_type": order_type,
             "total_quantity": total_quantity
         }
+        if order_type == "limit_order":
+            payload["price_per_unit"] = price_per_unit
         if stop_loss:
             payload["stop_loss"] = stop_loss
         if take_profit:
             payload["take_profit"] = take_profit
+        payload.update(extra)
+        return payload
+
+    def _submit_order(self, payload: Dict) -> OrderResult:
+        # send one create request without touching active_orders (safe from worker threads)
 
+        sent_at = time.time()
         response = self._make_authenticated_request("/exchange/v1/orders/create", payload)
-        if response:
-            order = self._parse_order_response(response, payload)
-            if order:
+        acknowledged_at = time.time()
+        if not response:
+            return OrderResult(payload, error="order request failed")
+        order = self._parse_order_response(response, payload)
+        if order:
+            order.sent_at, order.acknowledged_at = sent_at, acknowledged_at
+        return OrderResult(payload, order=order, error=None if order else "order not acknowledged")
+
+    def _index(self, order: Order) -> None:
+        self.orders_by_market.setdefault(order.market, {})[order.order_id] = order
+        self.orders_by_status.setdefault(order.status.upper(), {})[order.order_id] = order
+
+    def _unindex(self, order: Order) -> None:
+        for index, key in ((self.orders_by_market, order.market), (self.orders_by_status, order.status.upper())):
+            bucket = index.get(key)
+            if bucket is not None:
+                bucket.pop(order.order_id, None)
+                if not bucket:
+                    index.pop(key, None)
+
+    def _record_orders(self, orders: Iterable[Order]) -> None:
+        # bulk insert/replace in the active order book and its indexes
+        with self._orders_lock:
+            for order in orders:
+                previous = self.active_orders.get(order.order_id)
+                if previous is not None:
+                    self._unindex(previous)
                 self.active_orders[order.order_id] = order
-                return order
-        return None
+                self._index(order)
+
+    def _update_orders(self, updates: Iterable[Tuple[Order, Dict[str, Any]]]) -> None:
+        # bulk in-place field updates (status changes move the order between status buckets)
+        with self._orders_lock:
+            for order, fields in updates:
+                tracked = self.active_orders.get(order.order_id) is order
+                if tracked:
+                    self._unindex(order)
+                for name, value in fields.items():
+                    setattr(order, name, value)
+                if tracked:
+                    self._index(order)
+
+    def _close_orders(self, orders: Iterable[Tuple[str, str]]) -> List[Order]:
+        # bulk move (order_id, final status) from the active book to the history
+        closed = []
+        with self._orders_lock:
+            for order_id, status in orders:
+                order = self.active_orders.pop(order_id, None)
+                if order is None:
+                    continue
+                self._unindex(order)
+                order.status = status
+                closed.append(order)
+            self.order_history.extend(closed)
+        return closed
+
+    def _record_cancelled(self, order_ids: Iterable[str]) -> None:
+        self._close_orders((order_id, "CANCELLED") for order_id in order_ids)
+
+    def snapshot_orders(self) -> Dict[str, Order]:
+        # copy of the active order book (order_id -> order), e.g. to diff against the exchange
+        with self._orders_lock:
+            return dict(self.active_orders)
+
+    def apply_reconciliation(self, updates: Iterable[Tuple[Order, Dict[str, Any]]], created: Iterable[Order],
+                             closed: Iterable[Tuple[str, str]]) -> List[Order]:
+        # apply one exchange reconciliation atomically: field updates, orders found on the exchange and
+        # (order_id, final status) pairs to close; returns the closed orders
+        with self._orders_lock:
+            self._update_orders(updates)
+            self._record_orders(created)
+            return self._close_orders(closed)
+
+    def orders_for_market(self, market: str) -> List[Order]:
+        with self._orders_lock:
+            return list(self.orders_by_market.get(market, {}).values())
+
+    def orders_with_status(self, status: str) -> List[Order]:
+        with self._orders_lock:
+            return list(self.orders_by_status.get(status.upper(), {}).values())
+
+    def place_market_order(self, market: str, side: str, total_quantity: float,
+                           stop_loss: Optional[float] = None, take_profit: Optional[float] = None) -> Optional[Order]:
+        # place a market order and return the created Order object
+        
+        result = self._submit_order(self._order_payload(market, side, "market_order", total_quantity,
+                                                        stop_loss=stop_loss, take_profit=take_profit))
+        if result.order:
+            self._record_orders([result.order])
+        return result.order
 
     def place_limit_order(self, market: str, side: str, price_per_unit: float,
                           total_quantity: float, stop_loss: Optional[float] = None,
                           take_profit: Optional[float] = None) -> Optional[Order]:
         # place a limit order and return the created Order object
 
-        payload = {
-            "market": market,
-            "side": side,
-            "order_type": "limit_order",
-            "price_per_unit": price_per_unit,
-            "total_quantity": total_quantity
-        }
-        if stop_loss:
-            payload["stop_loss"] = stop_loss
-        if take_profit:
-            payload["take_profit"] = take_profit
+        result = self._submit_order(self._order_payload(market, side, "limit_order", total_quantity,
+                                                        price_per_unit, stop_loss, take_profit))
+        if result.order:
+            self._record_orders([result.order])
+        return result.order
 
-        response = self._make_authenticated_request("/exchange/v1/orders/create", payload)
-        if response:
-            order = self._parse_order_response(response, payload)
+    def _map_concurrently(self, func: Any, items: List[Any]) -> List[Any]:
+        # run single-order requests on the shared connection pool in parallel, keeping input order
+        if len(items) <= 1:
+            return [func(item) for item in items]
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(items))) as pool:
+            return list(pool.map(func, items))
+
+    def _place_multiple(self, payloads: List[Dict]) -> Optional[List[OrderResult]]:
+        # one signed create_multiple request; None when the exchange definitely rejected the batch as a whole
+        # (BATCH_REJECTED_STATUSES), in which case nothing was placed and the caller falls back to single requests
+
+        sent_at = time.time()
+        try:
+            status_code, response = self._send_signed("/exchange/v1/orders/create_multiple", {"orders": payloads})
+        except Exception as e:
+            # the batch may or may not have reached the exchange; resending could double the orders
+            return [OrderResult(payload, error=f"batch request failed: {e}") for payload in payloads]
+        acknowledged_at = time.time()
+        if status_code not in (200, 201):
+            if status_code in (404, 405):
+                self.multi_order_endpoints = False
+            if status_code in BATCH_REJECTED_STATUSES:
+                return None
+            # a 5xx (or anything unexpected) may come after the exchange accepted the batch; resending could
+            # double the orders, so the legs fail and the reconciler picks up whatever was placed
+            return [OrderResult(payload, error=f"batch request failed with status {status_code}")
+                    for payload in payloads]
+        acknowledged = response.get("orders", []) if isinstance(response, dict) else response or []
+        by_client_id = {data.get("client_order_id"): data for data in acknowledged if data.get("client_order_id")}
+        results = []
+        for i, payload in enumerate(payloads):
+            order_data = by_client_id.get(payload["client_order_id"])
+            if order_data is None and not by_client_id and i < len(acknowledged):
+                order_data = acknowledged[i]
+            payload.setdefault("timestamp", int(time.time() * 1000))
+            order = self._order_from_data(order_data, payload) if order_data else None
             if order:
-                self.active_orders[order.order_id] = order
-                return order
-        return None
+                order.sent_at, order.acknowledged_at = sent_at, acknowledged_at
+            results.append(OrderResult(payload, order=order, error=None if order else "order not acknowledged"))
+        return results
 
-    def cancel_order(self, order_id: str) -> bool:
-        # cancel an on the basis order_id
+    def place_orders(self, orders: List[Dict[str, Any]]) -> List[OrderResult]:
+        # place several orders at once; each spec takes the arguments of _order_payload
+        # (market, side, order_type, total_quantity, price_per_unit, stop_loss, take_profit)
+        # uses the multi-order endpoint when enabled, otherwise concurrent single requests;
+        # returns one result per spec, in order
 
+        if not orders:
+            return []
+        # the random part keeps ids unique across batches placed in the same millisecond
+        batch_id = f"bot_{int(time.time() * 1000)}_{secrets.token_hex(4)}"
+        payloads = [self._order_payload(**{"client_order_id": f"{batch_id}_{i}", **spec})
+                    for i, spec in enumerate(orders)]
+        results = None
+        if self.multi_order_endpoints and len(payloads) > 1:
+            results = self._place_multiple(payloads)
+        if results is None:
+            results = self._map_concurrently(self._submit_order, payloads)
+        self._record_orders(result.order for result in results if result.order)
+        if DEBUG_MODE:
+            print(f"🔍 Batch placed {sum(result.ok for result in results)}/{len(results)} orders")
+        return results
+
+    def _submit_cancel(self, order_id: str) -> bool:
         payload = {
             "order_id": order_id,
             "timestamp": int(time.time() * 1000)
         }
         response = self._make_authenticated_request("/exchange/v1/orders/cancel", payload)
-        if response and response.get("status") == "SUCCESS":
-            if order_id in self.active_orders:
-                order = self.active_orders.pop(order_id)
-                order.status = "CANCELLED"
-                self.order_history.append(order)
+        return bool(response and response.get("status") == "SUCCESS")
+
+    def cancel_order(self, order_id: str) -> bool:
+        # cancel an on the basis order_id
+
+        if self._submit_cancel(order_id):
+            self._record_cancelled([order_id])
             return True
         return False
 
+    def cancel_orders(self, order_ids: List[str]) -> Dict[str, bool]:
+        # cancel several orders with one cancel_by_ids request, falling back to concurrent single cancels
+        # returns order_id -> cancelled
+
+        if not order_ids:
+            return {}
+        results = None
+        if self.multi_order_endpoints and len(order_ids) > 1:
+            try:
+                status_code, _ = self._send_signed("/exchange/v1/orders/cancel_by_ids", {"ids": list(order_ids)})
+                if status_code in (200, 201):
+                    results = dict.fromkeys(order_ids, True)
+                elif status_code in (404, 405):
+                    self.multi_order_endpoints = False
+            except Exception as e:
+                if DEBUG_MODE:
+                    print(f"❌ Batch cancel failed, cancelling one by one: {e}")
+        if results is None:
+            # cancelling twice is harmless, so any batch failure can fall back
+            results = dict(zip(order_ids, self._map_concurrently(self._submit_cancel, list(order_ids))))
+        self._record_cancelled(order_id for order_id, cancelled in results.items() if cancelled)
+        return results
+
+    def cancel_all(self, market: Optional[str] = None, side: Optional[str] = None) -> Dict[str, bool]:
+        # cancel every open order of a market (optionally one side); without a market, every market
+        # that has tracked active orders is cancelled concurrently; returns market -> cancelled
+
+        with self._orders_lock:
+            markets = [market] if market else sorted(name for name in self.orders_by_market if name)
+
+        def _cancel_market(market_name: str) -> bool:
+            payload = {"market": market_name}
+            if side:
+                payload["side"] = side
+            response = self._make_authenticated_request("/exchange/v1/orders/cancel_all", payload)
+            return response is not None
+
+        results = dict(zip(markets, self._map_concurrently(_cancel_market, markets)))
+        self._record_cancelled([order.order_id for name, cancelled in results.items() if cancelled
+                                for order in self.orders_for_market(name) if side is None or order.side == side])
+        return results
+
     def get_order_status(self, order_id: str) -> Optional[Order]:
         # retrieve and update the status of an order
         
@@ -192,46 +397,99 @@ class OrderManagementSystem:
         if response:
             if order_id in self.active_orders:
                 order = self.active_orders[order_id]
-                order.status = response.get("status", "UNKNOWN")
-                order.filled_quantity = float(response.get("filled_quantity", 0))
-                order.remaining_quantity = float(response.get("remaining_quantity", 0))
-                order.avg_price = float(response.get("average_price", 0))
-                order.fee = float(response.get("fee", 0))
+                self._update_orders([(order, {
+                    "status": response.get("status", "UNKNOWN"),
+                    "filled_quantity": float(response.get("filled_quantity", 0)),
+                    "remaining_quantity": float(response.get("remaining_quantity", 0)),
+                    "avg_price": float(response.get("average_price", 0)),
+                    "fee": float(response.get("fee", 0)),
+                })])
                 if order.status in ("COMPLETED", "CANCELLED"):
-                    self.active_orders.pop(order_id)
-                    self.order_history.append(order)
+                    self._close_orders([(order_id, order.status)])
                 return order
         return None
 
-    def get_active_orders(self, market: Optional[str] = None) -> List[Order]:
-        # retrieve all active orders, optionally filtering by market
-        
+    @staticmethod
+    def order_id_of(order_data: Dict) -> Optional[str]:
+        return order_data.get("order_id") or order_data.get("orderId") or order_data.get("id")
+
+    @staticmethod
+    def active_fields(order_data: Dict) -> Dict[str, Any]:
+        # Order fields carried by an active_orders entry
+        # CoinDCX reports remaining_quantity; filled_quantity is derived from it when absent
+        total_quantity = float(order_data.get("total_quantity", 0))
+        remaining_quantity = float(order_data.get("remaining_quantity", 0))
+        if "filled_quantity" in order_data:
+            filled_quantity = float(order_data["filled_quantity"])
+        else:
+            filled_quantity = total_quantity - remaining_quantity if "remaining_quantity" in order_data else 0.0
+        return {
+            "status": order_data.get("status", "UNKNOWN"),
+            "price_per_unit": float(order_data.get("price_per_unit", 0)),
+            "total_quantity": total_quantity,
+            "filled_quantity": filled_quantity,
+            "remaining_quantity": remaining_quantity,
+            "avg_price": float(order_data.get("average_price", 0)),
+            "fee": float(order_data.get("fee", 0) or order_data.get("fee_amount", 0)),
+        }
+
+    def order_from_active(self, order_data: Dict) -> Order:
+        return Order(
+            order_id=self.order_id_of(order_data),
+            market=order_data.get("market"),
+            side=order_data.get("side"),
+            order_type=order_data.get("order_type"),
+            timestamp=order_data.get("timestamp", 0) or order_data.get("created_at", 0),
+            **self.active_fields(order_data)
+        )
+
+    def fetch_active_orders(self, market: Optional[str] = None) -> Optional[List[Dict]]:
+        # raw active orders in one request; None when the request failed (not the same as "no orders")
+
         payload = {"timestamp": int(time.time() * 1000)}
         if market:
             payload["market"] = market
         response = self._make_authenticated_request("/exchange/v1/orders/active_orders", payload, method="GET")
+        if response is None:
+            return None
+        return response.get("orders", []) if isinstance(response, dict) else response
+
+    def fetch_trade_history(self, market: Optional[str] = None, from_id: Optional[int] = None,
+                            limit: int = 500, sort: str = "asc") -> Optional[List[Dict]]:
+        # raw fills, oldest first (sort="desc" for newest first), optionally only those from trade id
+        # `from_id` on; None on failure
+        # the sort is always sent because the exchange's own default is newest first
+
+        payload: Dict[str, Any] = {"timestamp": int(time.time() * 1000), "limit": limit, "sort": sort}
+        if market:
+            payload["market"] = market
+        if from_id is not None:
+            payload["from_id"] = from_id
+        response = self._make_authenticated_request("/exchange/v1/orders/trade_history", payload, method="GET")
+        if response is None:
+            return None
+        return response.get("trades", []) if isinstance(response, dict) else response
+
+    def get_active_orders(self, market: Optional[str] = None) -> List[Order]:
+        # retrieve all active orders, optionally filtering by market
+        # known orders are updated in place; only new ones are built
+
+        response = self.fetch_active_orders(market)
+        if not response:
+            return []
         active_orders: List[Order] = []
-        if response:
-            for order_data in response:
-                order_id = order_data.get("order_id") or order_data.get("orderId")
-                order = Order(
-                    order_id=order_id,
-                    market=order_data.get("market"),
-                    side=order_data.get("side"),
-                    order_type=order_data.get("order_type"),
-                    price_per_unit=float(order_data.get("price_per_unit", 0)),
-                    total_quantity=float(order_data.get("total_quantity", 0)),
-                    status=order_data.get("status", "UNKNOWN"),
-                    timestamp=order_data.get("timestamp", 0),
-                    filled_quantity=float(order_data.get("filled_quantity", 0)),
-                    remaining_quantity=float(order_data.get("remaining_quantity", 0)),
-                    avg_price=float(order_data.get("average_price", 0)),
-                    fee=float(order_data.get("fee", 0))
-                )
-                self.active_orders[order_id] = order
-                active_orders.append(order)
-            return active_orders
-        return []
+        updates, created = [], []
+        for order_data in response:
+            order = self.active_orders.get(self.order_id_of(order_data))
+            if order is not None:
+                updates.append((order, self.active_fields(order_data)))
+            else:
+                order = self.order_from_active(order_data)
+                created.append(order)
+            active_orders.append(order)
+        self._update_orders(updates)
+        self._record_orders(created)
+        return active_orders
 
     def get_order_history(self, market: Optional[str] = None) -> List[Order]:
         # retrieve the order history for a given market (if provided)
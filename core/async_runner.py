@@ -0,0 +1,170 @@
+import asyncio
+import time
+from collections import deque
+from typing import Any, Dict, List, Optional
+from config.settings import (DEBUG_MODE, STOP_LOSS_PERCENTAGE, RISK_REWARD_RATIO,
+                             RUNNER_CYCLE_INTERVAL, RUNNER_MAX_CONCURRENCY)
+from core.position_manager import PositionExit, PositionManager
+from core.risk_management import RiskManagement
+from core.trading_logic import TradingLogic
+from utils.historical_data import HistoricalData
+from utils.incremental_indicators import IncrementalIndicators
+from utils.market_data import MarketData, TickerSnapshot
+
+class RunnerStats:
+
+    # throughput of the whole loop and latency of each pair's evaluation
+
+    def __init__(self, window: int = 100) -> None:
+        self.cycles = 0
+        self.evaluations = 0
+        self.started_at = time.monotonic()
+        self.last_cycle_seconds = 0.0
+        self.pair_latency: Dict[str, deque] = {}
+        self.window = window
+
+    def record_pair(self, trading_pair: str, seconds: float) -> None:
+        self.evaluations += 1
+        self.pair_latency.setdefault(trading_pair, deque(maxlen=self.window)).append(seconds)
+
+    def record_cycle(self, seconds: float) -> None:
+        self.cycles += 1
+        self.last_cycle_seconds = seconds
+
+    def throughput(self) -> float:
+        # pair evaluations per second since start
+        elapsed = time.monotonic() - self.started_at
+        return self.evaluations / elapsed if elapsed > 0 else 0.0
+
+    def report(self) -> Dict[str, Any]:
+        latency = {}
+        for pair, samples in self.pair_latency.items():
+            ordered = sorted(samples)
+            latency[pair] = {
+                "last_ms": samples[-1] * 1000,
+                "p50_ms": ordered[len(ordered) // 2] * 1000,
+                "max_ms": ordered[-1] * 1000,
+            }
+        return {
+            "cycles": self.cycles,
+            "evaluations": self.evaluations,
+            "evaluations_per_second": self.throughput(),
+            "last_cycle_ms": self.last_cycle_seconds * 1000,
+            "pair_latency": latency,
+        }
+
+class AsyncTradingRunner:
+
+    # trades many pairs from one process: every cycle shares one ticker snapshot (and the market
+    # metadata and candle caches), checks open positions for exits, and scans the pairs for entries as
+    # concurrent tasks; blocking I/O and pandas work run in worker threads
+    # positions live in the TradingLogic's PositionManager, the same book single-pair mode uses, so its
+    # price feed can also trigger exits between cycles; a position taken for an exit leaves the book,
+    # so the two paths never send the same exit twice
+
+    def __init__(self, trading_pairs: List[str], investment_amount: float,
+                 stop_loss_percentage: float = STOP_LOSS_PERCENTAGE,
+                 risk_reward_ratio: float = RISK_REWARD_RATIO,
+                 cycle_interval: float = RUNNER_CYCLE_INTERVAL,
+                 max_concurrency: int = RUNNER_MAX_CONCURRENCY,
+                 trading_logic: Optional[TradingLogic] = None) -> None:
+        self.trading_pairs = trading_pairs
+        self.investment_amount = investment_amount
+        self.stop_loss_percentage = stop_loss_percentage
+        self.risk_reward_ratio = risk_reward_ratio
+        self.cycle_interval = cycle_interval
+        self.max_concurrency = max_concurrency
+        self.trading_logic = trading_logic or TradingLogic()
+        # the same indicator engines as the TradingLogic, which seeds the poll scheduler's ATRs from them
+        self.engines: Dict[str, IncrementalIndicators] = self.trading_logic.indicator_engines
+        self.positions = self.trading_logic.positions
+        self.stats = RunnerStats()
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    def _evaluate(self, trading_pair: str) -> tuple:
+        # blocking part of a scan: candle sync, incremental indicators and signal rules
+
+        df = HistoricalData.fetch(trading_pair)
+        if df is None:
+            return False, "hold"
+        engine = self.trading_logic.indicator_engine(trading_pair)
+        engine.update_from_frame(df)
+        self.trading_logic.refresh_atr(trading_pair, engine)
+        return self.trading_logic.signal_gen.analyze_indicators(engine.tail_frame())
+
+    async def _scan_pair(self, trading_pair: str, snapshot: TickerSnapshot) -> None:
+        async with self._semaphore:
+            start = time.perf_counter()
+            try:
+                should_trade, signal = await asyncio.to_thread(self._evaluate, trading_pair)
+                current_price = snapshot.prices([trading_pair]).get(trading_pair)
+                if should_trade and current_price is not None:
+                    if signal == "buy" and not self.positions.has_position(trading_pair):
+                        await self._open_position(trading_pair, current_price)
+                    elif signal == "sell" and self.positions.has_position(trading_pair):
+                        await self._close_position(trading_pair, current_price, PositionManager.EXIT_SELL_SIGNAL)
+            except Exception as e:
+                print(f"\n❌ Error evaluating {trading_pair}: {e}")
+            finally:
+                self.stats.record_pair(trading_pair, time.perf_counter() - start)
+
+    async def _open_position(self, trading_pair: str, current_price: float) -> None:
+        print(f"\n🎯 Buy Signal Detected for {trading_pair}!")
+        levels = RiskManagement.calculate(current_price, self.stop_loss_percentage, self.risk_reward_ratio)
+        # a cold or stale markets cache downloads here, which must not stall the other pairs' scans
+        market_details = await asyncio.to_thread(MarketData.get_market_details, trading_pair)
+        order = await asyncio.to_thread(
+            self.trading_logic.place_order, "buy", trading_pair, current_price, self.investment_amount,
+            market_details.get("balance", 0), levels["stop_loss_price"], levels["take_profit_price"])
+        if order:
+            await asyncio.to_thread(self.trading_logic.refresh_atr, trading_pair)
+            self.positions.open(trading_pair, current_price, order.total_quantity, levels["stop_loss_price"],
+                                levels["take_profit_price"], self.investment_amount, market_details.get("balance", 0))
+
+    async def _send_exit(self, exit_: PositionExit) -> None:
+        print(f"\n🛑 {exit_.reason} for {exit_.position.trading_pair} at {exit_.price}")
+        try:
+            success = await asyncio.to_thread(self.trading_logic.exit_position, exit_)
+        except Exception as e:
+            print(f"\n❌ Error placing exit order for {exit_.position.trading_pair}: {e}")
+            success = False
+        self.positions.complete(exit_, bool(success))
+
+    async def _close_position(self, trading_pair: str, current_price: float, reason: str) -> None:
+        await asyncio.gather(*(self._send_exit(exit_)
+                               for exit_ in self.positions.exit_pair(trading_pair, current_price, reason)))
+
+    async def _check_positions(self, snapshot: TickerSnapshot) -> None:
+        # one pass over the open positions of the pairs in the snapshot; exits are sent concurrently
+
+        exits = self.positions.evaluate_prices(snapshot.prices(self.positions.pairs()))
+        await asyncio.gather(*(self._send_exit(exit_) for exit_ in exits))
+
+    async def run_cycle(self) -> None:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        snapshot = await asyncio.to_thread(MarketData.get_ticker_snapshot)
+        await self._check_positions(snapshot)
+        await asyncio.gather(*(self._scan_pair(pair, snapshot) for pair in self.trading_pairs))
+
+    async def run(self, cycles: Optional[int] = None) -> None:
+        # run forever (or for `cycles` cycles), starting a new cycle every cycle_interval seconds
+
+        print(f"\n📡 Monitoring {len(self.trading_pairs)} pairs...")
+        try:
+            while cycles is None or self.stats.cycles < cycles:
+                cycle_start = time.perf_counter()
+                try:
+                    await self.run_cycle()
+                except Exception as e:
+                    print(f"\n❌ Error during trading cycle: {e}")
+                self.stats.record_cycle(time.perf_counter() - cycle_start)
+                report = self.stats.report()
+                print(f"\r🔁 Cycle {report['cycles']} | {report['last_cycle_ms']:.0f} ms | "
+                      f"{report['evaluations_per_second']:.1f} pair evaluations/s | "
+                      f"Open positions: {len(self.positions)}", end="")
+                if DEBUG_MODE:
+                    print(f"\n🔍 Runner Stats: {report}")
+                await asyncio.sleep(max(0.0, self.cycle_interval - (time.perf_counter() - cycle_start)))
+        finally:
+            self.trading_logic.report_polling()
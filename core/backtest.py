@@ -0,0 +1,174 @@
+import numpy as np
+import pandas as pd
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+from config.settings import GRANULARITY, OHLCV_ARCHIVE_DIR, STOP_LOSS_PERCENTAGE, RISK_REWARD_RATIO
+from core.risk_management import RiskManagement
+from core.signal_generator import SignalGenerator
+from utils.ohlcv_archive import OhlcvArchive
+from utils.technical_indicators import TechnicalIndicators
+
+@dataclass
+class BacktestResult:
+
+    # signals and trades produced by one backtest run
+
+    entries: pd.Series                  # True on bars where a buy signal fired
+    exits: pd.Series                    # True on bars where a sell signal fired
+    trades: pd.DataFrame                # one row per closed trade
+    stats: Dict[str, float] = field(default_factory=dict)
+
+class Backtester:
+
+    # vectorized backtest of the SignalGenerator rules
+    # signals for the whole history come from one pass over the indicator columns; the trade loop
+    # only visits entries and finds each exit with array searches over the bars that follow
+    # exits: static stop, optional trailing stop (from highs of earlier bars), take-profit, sell signal;
+    # when several trigger on the same bar the stop wins (intra-bar order is unknown)
+
+    EXIT_STOP_LOSS = "stop_loss"
+    EXIT_TRAILING_STOP = "trailing_stop"
+    EXIT_TAKE_PROFIT = "take_profit"
+    EXIT_SELL_SIGNAL = "sell_signal"
+
+    def __init__(self, signal_gen: Optional[SignalGenerator] = None) -> None:
+        self.signal_gen = signal_gen or SignalGenerator()
+
+    def signals(self, df: pd.DataFrame) -> pd.DataFrame:
+        # buy/sell signal series for a DataFrame that already has TechnicalIndicators columns
+
+        buy, sell = self.signal_gen.analyze_indicators_vectorized(df)
+        return pd.DataFrame({"buy": buy, "sell": sell}, index=df.index)
+
+    @staticmethod
+    def _first_exit(start: int, high: np.ndarray, low: np.ndarray, sell: np.ndarray,
+                    entry_price: float, stop_loss_price: float, take_profit_price: float,
+                    trailing_stop_percentage: Optional[float]) -> Optional[tuple]:
+        # search forward from `start` in growing chunks so short trades do not scan the whole history
+
+        n = len(high)
+        highest = entry_price
+        chunk = 256
+        while start < n:
+            end = min(start + chunk, n)
+            seg_high, seg_low = high[start:end], low[start:end]
+            stop_line = np.full(end - start, stop_loss_price)
+            trailing = prior_high = None
+            if trailing_stop_percentage:
+                # highest price seen before each bar, including the entry
+                prior_high = np.maximum.accumulate(np.concatenate(([highest], seg_high[:-1])))
+                trailing = prior_high * (1 - trailing_stop_percentage)
+                stop_line = np.maximum(stop_line, trailing)
+                highest = max(highest, float(seg_high.max()))
+            hit_stop = seg_low <= stop_line
+            hit = hit_stop | (seg_high >= take_profit_price) | sell[start:end]
+            if hit.any():
+                k = int(np.argmax(hit))
+                if hit_stop[k]:
+                    reason = (Backtester.EXIT_TRAILING_STOP
+                              if trailing is not None and prior_high[k] > entry_price
+                              and trailing[k] > stop_loss_price
+                              else Backtester.EXIT_STOP_LOSS)
+                    return start + k, float(stop_line[k]), reason
+                if seg_high[k] >= take_profit_price:
+                    return start + k, take_profit_price, Backtester.EXIT_TAKE_PROFIT
+                return start + k, None, Backtester.EXIT_SELL_SIGNAL
+            start = end
+            chunk *= 4
+        return None
+
+    def run(self, df: pd.DataFrame, stop_loss_percentage: float = STOP_LOSS_PERCENTAGE,
+            risk_reward_ratio: float = RISK_REWARD_RATIO,
+            trailing_stop_percentage: Optional[float] = None,
+            signals: Optional[pd.DataFrame] = None) -> BacktestResult:
+        # simulate one position at a time: enter at the close of a buy bar, exit on the first trigger
+        # pass precomputed `signals` to reuse them across parameter sets
+
+        if signals is None:
+            signals = self.signals(df)
+        buy = signals["buy"].to_numpy()
+        sell = signals["sell"].to_numpy()
+        close = df["close"].to_numpy(dtype=np.float64)
+        high = df["high"].to_numpy(dtype=np.float64)
+        low = df["low"].to_numpy(dtype=np.float64)
+        times = df.index
+
+        entry_bars = np.flatnonzero(buy)
+        # per-trade values are collected in plain lists and turned into columns once at the end
+        entries, exits, entry_prices, exit_prices, stops, targets, reasons = [], [], [], [], [], [], []
+        next_entry = 0
+        while next_entry < len(entry_bars):
+            i = int(entry_bars[next_entry])
+            entry_price = float(close[i])
+            levels = RiskManagement.calculate(entry_price, stop_loss_percentage, risk_reward_ratio)
+            exit_ = self._first_exit(i + 1, high, low, sell, entry_price, levels["stop_loss_price"],
+                                     levels["take_profit_price"], trailing_stop_percentage)
+            if exit_ is None:
+                break  # position still open at the end of the data
+            j, exit_price, reason = exit_
+            entries.append(i)
+            exits.append(j)
+            entry_prices.append(entry_price)
+            exit_prices.append(float(close[j]) if exit_price is None else exit_price)
+            stops.append(levels["stop_loss_price"])
+            targets.append(levels["take_profit_price"])
+            reasons.append(reason)
+            # the next trade can open on the first buy signal after this exit
+            next_entry = int(np.searchsorted(entry_bars, j, side="right"))
+
+        entry_bar = np.asarray(entries, dtype=np.int64)
+        exit_bar = np.asarray(exits, dtype=np.int64)
+        entry_price_column = np.asarray(entry_prices, dtype=np.float64)
+        exit_price_column = np.asarray(exit_prices, dtype=np.float64)
+        trade_frame = pd.DataFrame({
+            "entry_time": times[entry_bar], "exit_time": times[exit_bar],
+            "entry_bar": entry_bar, "exit_bar": exit_bar,
+            "entry_price": entry_price_column, "exit_price": exit_price_column,
+            "stop_loss_price": np.asarray(stops, dtype=np.float64),
+            "take_profit_price": np.asarray(targets, dtype=np.float64),
+            "exit_reason": reasons, "return": exit_price_column / entry_price_column - 1,
+        })
+        return BacktestResult(
+            entries=signals["buy"], exits=signals["sell"], trades=trade_frame,
+            stats=self.summarize(trade_frame))
+
+    @staticmethod
+    def summarize(trades: pd.DataFrame) -> Dict[str, float]:
+        returns = trades["return"].to_numpy(dtype=np.float64)
+        if len(returns) == 0:
+            return {"trades": 0, "win_rate": 0.0, "total_return": 0.0, "avg_return": 0.0, "max_drawdown": 0.0}
+        equity = np.cumprod(1 + returns)
+        peaks = np.maximum.accumulate(np.concatenate(([1.0], equity)))[1:]
+        return {
+            "trades": int(len(returns)),
+            "win_rate": float((returns > 0).mean()),
+            "total_return": float(equity[-1] - 1),
+            "avg_return": float(returns.mean()),
+            "max_drawdown": float((1 - equity / peaks).max()),
+        }
+
+    def run_archive(self, trading_pair: str, interval: str = GRANULARITY, start_ms: Optional[int] = None,
+                    end_ms: Optional[int] = None, root: str = OHLCV_ARCHIVE_DIR,
+                    **parameters: Optional[float]) -> Optional[BacktestResult]:
+        # backtest a time range of the pair's OHLCV archive; parameters are those of run()
+        # returns None when the archive has no candles in the range
+
+        df = OhlcvArchive.load(trading_pair, interval, start_ms, end_ms, root)
+        if df is None:
+            print(f"⚠️ No archived candles for {trading_pair} {interval} in the requested range.")
+            return None
+        return self.run(TechnicalIndicators.calculate(df), **parameters)
+
+    def verify_against_per_bar(self, df: pd.DataFrame) -> List[int]:
+        # bars where the vectorized signal differs from SignalGenerator.analyze_indicators
+        # each bar is checked on a slice holding just the rows its rules can reach, as live scans see them
+
+        signals = self.signals(df)
+        expected = np.where(signals["buy"], "buy", np.where(signals["sell"], "sell", "hold"))
+        lookback = max(1, self.signal_gen.rules.lookback)
+        mismatches = []
+        for i in range(1, len(df)):
+            _, signal = self.signal_gen.analyze_indicators(df.iloc[max(0, i - lookback):i + 1])
+            if signal != expected[i]:
+                mismatches.append(i)
+        return mismatches
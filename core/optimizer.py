@@ -0,0 +1,142 @@
+import itertools
+import os
+import random
+import time
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Sequence, Tuple
+from config.settings import GRANULARITY, OHLCV_ARCHIVE_DIR, SCAN_MAX_WORKERS, SWEEP_RESULTS_FILE
+from core.backtest import Backtester
+from utils.historical_data import HistoricalData
+from utils.ohlcv_archive import OhlcvArchive
+from utils.technical_indicators import TechnicalIndicators
+
+# (stop_loss_percentage, risk_reward_ratio, trailing_stop_percentage or None)
+ParameterSet = Tuple[float, float, Optional[float]]
+
+DEFAULT_STOP_LOSS_GRID = [0.0025, 0.005, 0.0075, 0.01, 0.015, 0.02, 0.03]
+DEFAULT_RISK_REWARD_GRID = [1.0, 1.5, 2.0, 2.5, 3.0, 4.0]
+DEFAULT_TRAILING_STOP_GRID = [None, 0.0025, 0.005, 0.0075, 0.01, 0.015, 0.02]
+
+# per-worker copy of the prepared data, set once by the pool initializer
+_worker_data: Dict[str, Tuple[pd.DataFrame, pd.DataFrame]] = {}
+
+def _init_worker(prepared: Dict[str, Tuple[pd.DataFrame, pd.DataFrame]]) -> None:
+    global _worker_data
+    _worker_data = prepared
+
+def _evaluate_chunk(parameter_sets: List[ParameterSet]) -> List[dict]:
+    # worker: run every parameter set in the chunk against every prepared pair
+
+    backtester = Backtester()
+    rows = []
+    for stop_loss, risk_reward, trailing in parameter_sets:
+        returns = [backtester.run(prices, stop_loss, risk_reward, trailing, signals=signals).trades["return"].to_numpy()
+                   for prices, signals in _worker_data.values()]
+        stats = Backtester.summarize(pd.DataFrame({"return": np.concatenate(returns) if returns else []}))
+        rows.append({"stop_loss_percentage": stop_loss, "risk_reward_ratio": risk_reward,
+                     "trailing_stop_percentage": trailing, **stats})
+    return rows
+
+class ParameterSweep:
+
+    # evaluates stop-loss / risk-reward / trailing-stop settings against historical candles
+    # indicators and entry/exit signals do not depend on these parameters, so they are computed
+    # once per pair and handed to each worker once; tasks then only carry parameter tuples
+
+    def __init__(self, max_workers: Optional[int] = SCAN_MAX_WORKERS, chunk_size: int = 16) -> None:
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self.prepared: Dict[str, Tuple[pd.DataFrame, pd.DataFrame]] = {}
+
+    def prepare(self, candles: Dict[str, pd.DataFrame]) -> None:
+        # compute indicators and signals per pair; keep only the columns the trade simulation needs
+
+        backtester = Backtester()
+        for trading_pair, df in candles.items():
+            df = TechnicalIndicators.calculate(df.sort_index().copy())
+            signals = backtester.signals(df)
+            self.prepared[trading_pair] = (df[["high", "low", "close"]].copy(), signals)
+
+    def prepare_from_store(self, trading_pairs: List[str], interval: str = GRANULARITY) -> None:
+        candles = {}
+        for trading_pair in trading_pairs:
+            df = HistoricalData.load(trading_pair, interval)
+            if df is None:
+                print(f"⚠️ No stored candles for {trading_pair} {interval}, skipping.")
+                continue
+            candles[trading_pair] = df
+        self.prepare(candles)
+
+    def prepare_from_archive(self, trading_pairs: List[str], interval: str = GRANULARITY,
+                             start_ms: Optional[int] = None, end_ms: Optional[int] = None,
+                             root: str = OHLCV_ARCHIVE_DIR) -> None:
+        # like prepare_from_store, over a time range of the memory-mapped OHLCV archives
+        candles = {}
+        for trading_pair in trading_pairs:
+            df = OhlcvArchive.load(trading_pair, interval, start_ms, end_ms, root)
+            if df is None:
+                print(f"⚠️ No archived candles for {trading_pair} {interval}, skipping.")
+                continue
+            candles[trading_pair] = df
+        self.prepare(candles)
+
+    @staticmethod
+    def grid(stop_losses: Sequence[float] = DEFAULT_STOP_LOSS_GRID,
+             risk_rewards: Sequence[float] = DEFAULT_RISK_REWARD_GRID,
+             trailing_stops: Sequence[Optional[float]] = DEFAULT_TRAILING_STOP_GRID) -> List[ParameterSet]:
+        return list(itertools.product(stop_losses, risk_rewards, trailing_stops))
+
+    @staticmethod
+    def random_sample(count: int, stop_loss_range: Tuple[float, float] = (0.002, 0.03),
+                      risk_reward_range: Tuple[float, float] = (1.0, 4.0),
+                      trailing_stop_range: Tuple[float, float] = (0.002, 0.02),
+                      no_trailing_probability: float = 0.1, seed: Optional[int] = None) -> List[ParameterSet]:
+        rng = random.Random(seed)
+        return [(round(rng.uniform(*stop_loss_range), 5),
+                 round(rng.uniform(*risk_reward_range), 3),
+                 None if rng.random() < no_trailing_probability else round(rng.uniform(*trailing_stop_range), 5))
+                for _ in range(count)]
+
+    def run(self, parameter_sets: List[ParameterSet], rank_by: str = "total_return",
+            output_path: Optional[str] = SWEEP_RESULTS_FILE) -> pd.DataFrame:
+        # evaluate all parameter sets across the process pool and return them ranked (best first)
+
+        if not self.prepared:
+            raise ValueError("❌ No candles prepared for the sweep")
+        start = time.perf_counter()
+        chunks = [parameter_sets[i:i + self.chunk_size] for i in range(0, len(parameter_sets), self.chunk_size)]
+        rows: List[dict] = []
+        with ProcessPoolExecutor(max_workers=self.max_workers, initializer=_init_worker,
+                                 initargs=(self.prepared,)) as pool:
+            for chunk_rows in pool.map(_evaluate_chunk, chunks):
+                rows.extend(chunk_rows)
+        results = pd.DataFrame(rows).sort_values(rank_by, ascending=False, ignore_index=True)
+        results.insert(0, "rank", np.arange(1, len(results) + 1))
+        elapsed = time.perf_counter() - start
+        print(f"✅ Evaluated {len(parameter_sets)} parameter sets on {len(self.prepared)} pairs "
+              f"in {elapsed:.1f}s ({len(parameter_sets) / elapsed * 60:.0f}/min)")
+        if output_path:
+            os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+            results.to_csv(output_path, index=False)
+            print(f"✅ Ranked results written to {output_path}")
+        return results
+
+def sweep_main() -> None:
+    # prompt for pairs, sweep the default grid over the locally stored candles and show the best settings
+
+    trading_pairs = [pair.strip() for pair in
+                     input("Enter the trading pairs to optimize on (e.g., BTCINR, ETHINR): ").upper().split(",")
+                     if pair.strip()]
+    sweep = ParameterSweep()
+    # the archives hold the long histories; the candle store only the recent window
+    if all(os.path.exists(OhlcvArchive.path_for(pair, GRANULARITY)) for pair in trading_pairs):
+        sweep.prepare_from_archive(trading_pairs)
+    else:
+        sweep.prepare_from_store(trading_pairs)
+    results = sweep.run(ParameterSweep.grid())
+    print(results.head(10).to_string(index=False))
+
+if __name__ == "__main__":
+    sweep_main()
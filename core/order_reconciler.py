@@ -0,0 +1,243 @@
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from config.settings import (DEBUG_MODE, ORDER_RECONCILE_INTERVAL, ORDER_RECONCILE_GRACE, ORDER_HISTORY_PAGE,
+                             ORDER_HISTORY_MAX_PAGES)
+from core.OMS import Order, OrderManagementSystem
+
+# quantities closer than this are treated as equal
+QUANTITY_EPSILON = 1e-12
+
+@dataclass
+class OrderEvent:
+
+    # a change in an order's exchange state found by the reconciler
+    #  - kind: "new" (open on the exchange but unknown locally), "partial_fill", "fill" or "cancel"
+    #  - filled_delta: quantity filled since the previous cycle
+
+    kind: str
+    order: Order
+    filled_delta: float
+    timestamp: float
+
+# handler(event)
+OrderEventHandler = Callable[[OrderEvent], None]
+
+class OrderReconciler:
+
+    # keeps OrderManagementSystem.active_orders in sync with the exchange
+    # every cycle sends two requests however many orders are open: one active_orders snapshot and one
+    # trade_history page (oldest first) starting after the last trade seen, plus one page per further
+    # `history_limit` trades when more arrived since the last cycle; the first cycle reads the newest page
+    # to place the trade cursor; the snapshot is diffed against the local book, trades accumulate per
+    # order, and the changes are applied in one OMS call before events go out
+    # a tracked order missing from the snapshot is a fill when its trades cover the quantity, otherwise
+    # a cancel; orders placed within `grace` seconds are left alone until the exchange lists them
+
+    EVENT_NEW = "new"
+    EVENT_PARTIAL_FILL = "partial_fill"
+    EVENT_FILL = "fill"
+    EVENT_CANCEL = "cancel"
+
+    def __init__(self, oms: OrderManagementSystem, interval: float = ORDER_RECONCILE_INTERVAL,
+                 grace: float = ORDER_RECONCILE_GRACE, history_limit: int = ORDER_HISTORY_PAGE,
+                 max_pages: int = ORDER_HISTORY_MAX_PAGES) -> None:
+        self.oms = oms
+        self.interval = interval
+        self.grace = grace
+        self.history_limit = history_limit
+        self.max_pages = max_pages
+        self._handlers: List[OrderEventHandler] = []
+        self._last_trade_id: Optional[int] = None
+        # order_id -> [quantity, notional, fee, first seen] from the trades fetched so far
+        self._traded: Dict[str, List[float]] = {}
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.cycles = 0
+        self.requests = 0
+        self.events = 0
+
+    def subscribe(self, handler: OrderEventHandler) -> None:
+        self._handlers.append(handler)
+
+    def unsubscribe(self, handler: OrderEventHandler) -> None:
+        if handler in self._handlers:
+            self._handlers.remove(handler)
+
+    @staticmethod
+    def _trade_id(trade: Dict) -> Optional[int]:
+        try:
+            return int(trade.get("id"))
+        except (TypeError, ValueError):
+            return None
+
+    def _collect_trades(self, trades: List[Dict]) -> None:
+        # fold new trades into the per-order totals and advance the trade cursor
+
+        for trade in trades:
+            trade_id = self._trade_id(trade)
+            if trade_id is not None:
+                if self._last_trade_id is not None and trade_id <= self._last_trade_id:
+                    continue
+                self._last_trade_id = trade_id if self._last_trade_id is None else max(self._last_trade_id, trade_id)
+            order_id = OrderManagementSystem.order_id_of(trade)
+            if not order_id:
+                continue
+            quantity = float(trade.get("quantity", 0))
+            price = float(trade.get("price", 0) or trade.get("price_per_unit", 0))
+            totals = self._traded.setdefault(order_id, [0.0, 0.0, 0.0, time.time()])
+            totals[0] += quantity
+            totals[1] += quantity * price
+            totals[2] += float(trade.get("fee_amount", 0) or trade.get("fee", 0))
+
+    def _read_trades(self) -> Optional[bool]:
+        # fold every trade since the last cycle into the totals; returns whether every trade up to now
+        # has been read, or None when the first request failed
+
+        if self._last_trade_id is None:
+            # the exchange has no "from now on" cursor: the newest page places it
+            page = self.oms.fetch_trade_history(limit=self.history_limit, sort="desc")
+            self.requests += 1
+            if page is None:
+                return None
+            self._collect_trades(page[::-1])
+            return len(page) < self.history_limit
+        for _ in range(self.max_pages):
+            cursor = self._last_trade_id
+            page = self.oms.fetch_trade_history(from_id=cursor + 1, limit=self.history_limit, sort="asc")
+            self.requests += 1
+            if page is None:
+                return False
+            self._collect_trades(page)
+            if len(page) < self.history_limit:
+                return True
+            if self._last_trade_id == cursor:
+                # a full page that did not move the cursor (trades without ids) would repeat forever
+                return False
+        return False
+
+    def _fill_fields(self, order: Order, filled_quantity: float) -> Dict[str, Any]:
+        # fill quantity plus average price and fee from the trades, when there are any
+        fields: Dict[str, Any] = {
+            "filled_quantity": filled_quantity,
+            "remaining_quantity": max(0.0, order.total_quantity - filled_quantity),
+        }
+        traded = self._traded.get(order.order_id)
+        if traded and traded[0] > 0:
+            fields["avg_price"] = traded[1] / traded[0]
+            fields["fee"] = traded[2]
+        return fields
+
+    def reconcile(self) -> List[OrderEvent]:
+        # one reconciliation cycle; returns the events it dispatched
+
+        with self._lock:
+            started = time.time()
+            remote_orders = self.oms.fetch_active_orders()
+            self.requests += 1
+            self.cycles += 1
+            if remote_orders is None:
+                # without a snapshot a missing order cannot be told from a failed request
+                if DEBUG_MODE:
+                    print("⚠️ Order reconciliation skipped: active orders unavailable")
+                return []
+            # a missing order is only called cancelled when every trade up to now has been read
+            trades_complete = bool(self._read_trades())
+
+            local_orders = self.oms.snapshot_orders()
+            remote_by_id = {OrderManagementSystem.order_id_of(data): data for data in remote_orders}
+            remote_by_id.pop(None, None)
+
+            events: List[OrderEvent] = []
+            updates: List[Tuple[Order, Dict[str, Any]]] = []
+            created: List[Order] = []
+            closed: List[Tuple[str, str]] = []
+
+            for order_id, data in remote_by_id.items():
+                order = local_orders.get(order_id)
+                if order is None:
+                    order = self.oms.order_from_active(data)
+                    created.append(order)
+                    events.append(OrderEvent(self.EVENT_NEW, order, order.filled_quantity, started))
+                    continue
+                fields = self.oms.active_fields(data)
+                traded = self._traded.get(order_id)
+                filled_quantity = max(fields["filled_quantity"], traded[0] if traded else 0.0)
+                fields.update(self._fill_fields(order, filled_quantity))
+                fields["remaining_quantity"] = max(0.0, fields["total_quantity"] - filled_quantity)
+                delta = filled_quantity - order.filled_quantity
+                if any(getattr(order, name) != value for name, value in fields.items()):
+                    updates.append((order, fields))
+                if delta > QUANTITY_EPSILON:
+                    events.append(OrderEvent(self.EVENT_PARTIAL_FILL, order, delta, started))
+
+            grace_cutoff = (started - self.grace) * 1000
+            for order_id, order in local_orders.items():
+                if order_id in remote_by_id or (order.timestamp or 0) > grace_cutoff:
+                    continue
+                traded = self._traded.get(order_id)
+                filled_quantity = max(order.filled_quantity, traded[0] if traded else 0.0)
+                delta = filled_quantity - order.filled_quantity
+                if filled_quantity >= order.total_quantity - QUANTITY_EPSILON:
+                    updates.append((order, self._fill_fields(order, filled_quantity)))
+                    closed.append((order_id, "COMPLETED"))
+                    events.append(OrderEvent(self.EVENT_FILL, order, delta, started))
+                elif trades_complete:
+                    updates.append((order, self._fill_fields(order, filled_quantity)))
+                    closed.append((order_id, "CANCELLED"))
+                    events.append(OrderEvent(self.EVENT_CANCEL, order, delta, started))
+
+            self.oms.apply_reconciliation(updates, created, closed)
+
+            # totals are kept while an order is tracked; trades of an order the OMS has not recorded yet
+            # (its create call still in flight) are kept for a while in case it shows up
+            closed_ids = {order_id for order_id, _ in closed}
+            tracked = (set(remote_by_id) | set(self.oms.snapshot_orders())) - closed_ids
+            expired = started - self.grace - self.interval
+            for order_id in [order_id for order_id, totals in self._traded.items()
+                             if order_id not in tracked and (order_id in closed_ids or totals[3] < expired)]:
+                del self._traded[order_id]
+            self.events += len(events)
+
+        if DEBUG_MODE and events:
+            print(f"🔍 Reconciled {len(remote_by_id)} active orders: "
+                  + ", ".join(f"{event.kind} {event.order.order_id}" for event in events))
+        self._dispatch(events)
+        return events
+
+    def _dispatch(self, events: List[OrderEvent]) -> None:
+        for event in events:
+            for handler in list(self._handlers):
+                try:
+                    handler(event)
+                except Exception as e:
+                    print(f"❌ Error handling {event.kind} event for order {event.order.order_id}: {e}")
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="order-reconciler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+
+    def _run(self) -> None:
+        while not self._stop_event.is_set():
+            try:
+                self.reconcile()
+            except Exception as e:
+                print(f"❌ Order reconciliation failed: {e}")
+            self._stop_event.wait(self.interval)
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "cycles": self.cycles,
+            "requests": self.requests,
+            "requests_per_cycle": self.requests / self.cycles if self.cycles else 0.0,
+            "events": self.events,
+            "tracked_orders": len(self.oms.active_orders),
+        }
@@ -0,0 +1,104 @@
+import os
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional, Tuple
+from config.settings import GRANULARITY, SCAN_MAX_WORKERS
+from core.signal_generator import SignalGenerator
+from utils.candle_store import COLUMNS, candle_store
+from utils.technical_indicators import TechnicalIndicators
+
+@dataclass
+class ScanResult:
+
+    # compact per-pair outcome of a scan; this is all that travels back from a worker
+
+    trading_pair: str
+    should_trade: bool
+    signal: str
+    strength: float
+    close: float
+
+# (trading_pair, first row, end row) inside the shared candle block
+Shard = List[Tuple[str, int, int]]
+
+def _scan_shard(shm_name: str, total_rows: int, shard: Shard) -> List[ScanResult]:
+    # worker: attach to the shared candle block, evaluate each pair in the shard from its rows
+
+    block = shared_memory.SharedMemory(name=shm_name)
+    try:
+        candles = np.ndarray((total_rows, len(COLUMNS)), dtype=np.float64, buffer=block.buf)
+        signal_gen = SignalGenerator()
+        results = []
+        for trading_pair, start, end in shard:
+            rows = candles[start:end]
+            df = pd.DataFrame(rows[:, 1:], columns=COLUMNS[1:],
+                              index=pd.to_datetime(rows[:, 0].astype(np.int64), unit="ms"))
+            df = TechnicalIndicators.calculate(df)
+            should_trade, signal = signal_gen.analyze_indicators(df)
+            strength = signal_gen.get_signal_strength(df) if should_trade else 0.0
+            results.append(ScanResult(trading_pair, bool(should_trade), signal, float(strength), float(rows[-1, 4])))
+        del candles
+        return results
+    finally:
+        block.close()
+
+class ParallelScanner:
+
+    # scans a large pair universe across a process pool
+    # all candles are packed once into one shared-memory block; workers receive only its name and
+    # row ranges, so nothing but the small ScanResult list is pickled per pair
+
+    def __init__(self, max_workers: Optional[int] = SCAN_MAX_WORKERS, chunks_per_worker: int = 4) -> None:
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.chunks_per_worker = chunks_per_worker
+
+    def _shards(self, ranges: Shard) -> List[Shard]:
+        # interleave pairs across shards so large and small histories spread evenly
+        count = max(1, min(len(ranges), self.max_workers * self.chunks_per_worker))
+        return [ranges[i::count] for i in range(count)]
+
+    def scan_arrays(self, candles: Dict[str, np.ndarray]) -> List[ScanResult]:
+        # candles: pair -> array of shape (n, 6) with time (ms), open, high, low, close, volume, oldest first
+
+        candles = {pair: rows for pair, rows in candles.items() if len(rows) >= 2}
+        if not candles:
+            return []
+        total_rows = sum(len(rows) for rows in candles.values())
+        block = shared_memory.SharedMemory(create=True, size=total_rows * len(COLUMNS) * 8)
+        try:
+            packed = np.ndarray((total_rows, len(COLUMNS)), dtype=np.float64, buffer=block.buf)
+            ranges: Shard = []
+            offset = 0
+            for pair, rows in candles.items():
+                packed[offset:offset + len(rows)] = rows
+                ranges.append((pair, offset, offset + len(rows)))
+                offset += len(rows)
+            del packed
+            results: List[ScanResult] = []
+            with ProcessPoolExecutor(max_workers=self.max_workers) as pool:
+                futures = [pool.submit(_scan_shard, block.name, total_rows, shard) for shard in self._shards(ranges)]
+                for future in futures:
+                    results.extend(future.result())
+            return results
+        finally:
+            block.close()
+            block.unlink()
+
+    def scan(self, trading_pairs: List[str], interval: str = GRANULARITY, limit: int = 500,
+             sync: bool = True) -> List[ScanResult]:
+        # bring the candle store up to date (I/O in threads), then scan every pair in parallel
+
+        if sync:
+            def _sync(pair: str) -> None:
+                try:
+                    candle_store.sync(pair, interval)
+                except Exception as e:
+                    print(f"❌ Error fetching historical data for {pair}: {e}")
+            with ThreadPoolExecutor(max_workers=16) as pool:
+                list(pool.map(_sync, trading_pairs))
+        candles = {pair: np.array(candle_store.candles(pair, interval, limit), dtype=np.float64)
+                   for pair in trading_pairs}
+        return self.scan_arrays(candles)
@@ -0,0 +1,127 @@
+import math
+import threading
+from typing import Any, Dict, Optional
+from config.settings import (GRANULARITY, PRICE_POLL_INTERVAL, POLL_MIN_INTERVAL, POLL_MAX_INTERVAL,
+                             POLL_SAFETY_FACTOR, DEBUG_MODE)
+from core.position_manager import PositionManager
+from utils.clock import SystemClock
+from utils.ohlcv_archive import INTERVAL_MS
+
+class AdaptivePollScheduler:
+
+    # picks the next ticker poll from how close the open positions are to an exit
+    # the distance to the nearest trigger (static stop, trailing stop, take-profit) is measured in ATRs;
+    # price is assumed to move at most one ATR per candle, diffusing like a random walk within it, so a
+    # move of d takes about candle * min(d / ATR, (d / ATR) ** 2); the next poll comes after
+    # `safety` times that, clamped to [min_interval, max_interval]
+    # without an ATR for a pair the fixed baseline interval is used
+
+    def __init__(self, positions: PositionManager, min_interval: float = POLL_MIN_INTERVAL,
+                 max_interval: float = POLL_MAX_INTERVAL, safety: float = POLL_SAFETY_FACTOR,
+                 baseline_interval: float = PRICE_POLL_INTERVAL,
+                 candle_seconds: float = INTERVAL_MS[GRANULARITY] / 1000, clock: Any = None) -> None:
+        self.positions = positions
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.safety = safety
+        self.baseline_interval = baseline_interval
+        self.candle_seconds = candle_seconds
+        self.clock = clock or SystemClock()
+        self._atr: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._last_poll: Optional[float] = None
+        self.polls = 0
+        # fixed-interval polls the same monitoring time would have cost, and the seconds it covered
+        self.baseline_polls = 0.0
+        self.monitored_seconds = 0.0
+        self.triggers = 0
+        self.worst_trigger_delay = 0.0
+
+    def set_atr(self, trading_pair: str, atr: Optional[float]) -> None:
+        # latest ATR of the pair's candles; NaN (not enough candles yet) clears it
+        with self._lock:
+            if atr is None or math.isnan(atr) or atr <= 0:
+                self._atr.pop(trading_pair, None)
+            else:
+                self._atr[trading_pair] = float(atr)
+
+    def trigger_distance(self, trading_pair: str, current_price: float) -> Optional[float]:
+        # price distance to the nearest exit level of the pair's open positions (0 once one is crossed)
+
+        distance = None
+        for position in self.positions.positions(trading_pair):
+            gaps = [current_price - position.stop_loss_price, position.take_profit_price - current_price]
+            trailing_stop_price = position.trailing_stop_price
+            if trailing_stop_price is not None:
+                gaps.append(current_price - trailing_stop_price)
+            gap = max(0.0, min(gaps))
+            distance = gap if distance is None else min(distance, gap)
+        return distance
+
+    def interval_for(self, trading_pair: str, current_price: float) -> float:
+        distance = self.trigger_distance(trading_pair, current_price)
+        if distance is None:
+            return self.max_interval
+        with self._lock:
+            atr = self._atr.get(trading_pair)
+        if atr is None:
+            return min(max(self.baseline_interval, self.min_interval), self.max_interval)
+        moves = distance / atr
+        interval = self.safety * self.candle_seconds * min(moves, moves * moves)
+        return min(max(interval, self.min_interval), self.max_interval)
+
+    def next_interval(self, prices: Dict[str, float]) -> float:
+        # called after each poll with the prices it returned; the tightest pair sets the next wait
+        # polls with no open position end a monitoring stretch and are not counted
+
+        now = self.clock.time()
+        interval = None
+        for trading_pair in self.positions.pairs():
+            current_price = prices.get(trading_pair)
+            if current_price is not None:
+                pair_interval = self.interval_for(trading_pair, current_price)
+                interval = pair_interval if interval is None else min(interval, pair_interval)
+        with self._lock:
+            if interval is None:
+                self._last_poll = None
+                return self.max_interval
+            self.polls += 1
+            if self._last_poll is None:
+                self.baseline_polls += 1
+            else:
+                self.monitored_seconds += now - self._last_poll
+                self.baseline_polls += (now - self._last_poll) / self.baseline_interval
+            self._last_poll = now
+        return interval
+
+    def record_trigger(self, trading_pair: str) -> None:
+        # an exit fired on the current poll: it may have become true right after the previous poll,
+        # so the time since then is the worst case it waited
+        now = self.clock.time()
+        with self._lock:
+            self.triggers += 1
+            if self._last_poll is not None:
+                self.worst_trigger_delay = max(self.worst_trigger_delay, now - self._last_poll)
+
+    def stats(self) -> Dict[str, float]:
+        # polls made against the fixed baseline interval over the same monitoring time
+        with self._lock:
+            baseline_polls = int(round(self.baseline_polls))
+            return {
+                "polls": self.polls,
+                "baseline_polls": baseline_polls,
+                "saved_requests": baseline_polls - self.polls,
+                "avg_interval": self.monitored_seconds / self.polls if self.polls else 0.0,
+                "triggers": self.triggers,
+                "worst_trigger_delay": self.worst_trigger_delay,
+            }
+
+    def report(self) -> None:
+        stats = self.stats()
+        print(f"\n📊 Adaptive polling: {stats['polls']} polls vs {stats['baseline_polls']} at a fixed "
+              f"{self.baseline_interval}s ({stats['saved_requests']} requests saved) | "
+              f"Avg interval: {stats['avg_interval']:.1f}s | "
+              f"Worst trigger delay: {stats['worst_trigger_delay']:.1f}s over {stats['triggers']} exits")
+        if DEBUG_MODE:
+            with self._lock:
+                print(f"🔍 ATR by pair: {self._atr}")
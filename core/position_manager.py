@@ -0,0 +1,236 @@
+import itertools
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional
+from config.settings import TRAILING_STOP_PERCENTAGE
+from utils.metrics import metrics
+from utils.price_feed import PriceFeed
+
+@dataclass
+class Position:
+
+    # one open long position and its exit levels
+
+    position_id: int
+    trading_pair: str
+    entry_price: float
+    quantity: float
+    stop_loss_price: float
+    take_profit_price: float
+    investment_amount: float
+    wallet_balance: float
+    trailing_stop_percentage: Optional[float] = TRAILING_STOP_PERCENTAGE
+    highest_price: float = 0.0
+    opened_at: float = field(default_factory=time.time)
+    closed: threading.Event = field(default_factory=threading.Event, repr=False, compare=False)
+
+    @property
+    def trailing_stop_price(self) -> Optional[float]:
+        if not self.trailing_stop_percentage:
+            return None
+        return self.highest_price * (1 - self.trailing_stop_percentage)
+
+    def unrealized_pnl(self, current_price: float) -> float:
+        return (current_price - self.entry_price) * self.quantity
+
+    def check_exit(self, current_price: float) -> Optional[str]:
+        # update the highest price and return the exit reason, if any (same order as the old monitor loop)
+
+        if current_price > self.highest_price:
+            self.highest_price = current_price
+        if current_price <= self.stop_loss_price:
+            return PositionManager.EXIT_STOP_LOSS
+        trailing_stop_price = self.trailing_stop_price
+        if trailing_stop_price is not None and current_price <= trailing_stop_price and current_price < self.highest_price:
+            return PositionManager.EXIT_TRAILING_STOP
+        if current_price >= self.take_profit_price:
+            return PositionManager.EXIT_TAKE_PROFIT
+        return None
+
+    def exit_level(self, reason: str) -> Optional[float]:
+        # price level behind an exit reason; discretionary exits have none
+        if reason == PositionManager.EXIT_STOP_LOSS:
+            return self.stop_loss_price
+        if reason == PositionManager.EXIT_TRAILING_STOP:
+            return self.trailing_stop_price
+        if reason == PositionManager.EXIT_TAKE_PROFIT:
+            return self.take_profit_price
+        return None
+
+@dataclass
+class PositionExit:
+
+    # a triggered exit waiting for its sell order
+
+    position: Position
+    price: float
+    reason: str
+    timestamp: float          # when the triggering price was observed
+    trigger_price: Optional[float] = None
+    decided_at: float = field(default_factory=time.time)
+
+# exit_handler(exit) -> True when the sell order went through
+ExitHandler = Callable[[PositionExit], bool]
+
+class PositionManager:
+
+    # holds every open position in one index keyed by pair
+    # a price update only visits the positions of its own pair, in a single pass, so the cost grows
+    # with the number of price updates rather than with positions x polling sleeps
+    # triggered positions leave the open index before their sell order is sent, so a second update
+    # cannot trigger the same exit twice; a failed sell puts the position back
+
+    EXIT_STOP_LOSS = "Static Stop Loss"
+    EXIT_TRAILING_STOP = "Trailing Stop Loss"
+    EXIT_TAKE_PROFIT = "Take Profit"
+    EXIT_SELL_SIGNAL = "Sell Signal"
+
+    def __init__(self, exit_handler: Optional[ExitHandler] = None, price_feed: Optional[PriceFeed] = None) -> None:
+        self.exit_handler = exit_handler
+        self.price_feed = price_feed
+        self._positions: Dict[str, Dict[int, Position]] = {}
+        self._closing: Dict[int, Position] = {}
+        self._subscribed: set = set()
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def open(self, trading_pair: str, entry_price: float, quantity: float, stop_loss_price: float,
+             take_profit_price: float, investment_amount: float, wallet_balance: float = 0.0,
+             trailing_stop_percentage: Optional[float] = TRAILING_STOP_PERCENTAGE) -> Position:
+        # register a filled entry; the first position of a pair subscribes the manager to its prices
+
+        position = Position(next(self._ids), trading_pair, entry_price, quantity, stop_loss_price,
+                            take_profit_price, investment_amount, wallet_balance,
+                            trailing_stop_percentage, highest_price=entry_price)
+        with self._lock:
+            self._positions.setdefault(trading_pair, {})[position.position_id] = position
+            subscribe = trading_pair not in self._subscribed
+            self._subscribed.add(trading_pair)
+        if subscribe and self.price_feed is not None:
+            self.price_feed.subscribe(trading_pair, self.on_price)
+        print(f"\n📗 Monitoring position #{position.position_id} for {trading_pair} (Entry: {entry_price})")
+        return position
+
+    def positions(self, trading_pair: Optional[str] = None) -> List[Position]:
+        with self._lock:
+            if trading_pair is not None:
+                return list(self._positions.get(trading_pair, {}).values())
+            return [position for pair_positions in self._positions.values() for position in pair_positions.values()]
+
+    def has_position(self, trading_pair: str) -> bool:
+        with self._lock:
+            return bool(self._positions.get(trading_pair))
+
+    def entry_price(self, trading_pair: str) -> Optional[float]:
+        # entry of the oldest open position in a pair
+        with self._lock:
+            pair_positions = self._positions.get(trading_pair)
+            return next(iter(pair_positions.values())).entry_price if pair_positions else None
+
+    def __len__(self) -> int:
+        with self._lock:
+            return sum(len(pair_positions) for pair_positions in self._positions.values())
+
+    def _take(self, trading_pair: str, position_ids: List[int]) -> None:
+        # move positions from the open index to the closing set; caller holds the lock
+        pair_positions = self._positions.get(trading_pair, {})
+        for position_id in position_ids:
+            self._closing[position_id] = pair_positions.pop(position_id)
+        if not pair_positions:
+            self._positions.pop(trading_pair, None)
+
+    def evaluate(self, trading_pair: str, current_price: float,
+                 timestamp: Optional[float] = None) -> List[PositionExit]:
+        # one pass over the pair's positions; returns the exits triggered by this price
+
+        timestamp = time.time() if timestamp is None else timestamp
+        with self._lock:
+            pair_positions = self._positions.get(trading_pair)
+            if not pair_positions:
+                return []
+            exits = []
+            for position in pair_positions.values():
+                reason = position.check_exit(current_price)
+                if reason is not None:
+                    exits.append(PositionExit(position, current_price, reason, timestamp,
+                                              position.exit_level(reason)))
+            if exits:
+                self._take(trading_pair, [exit_.position.position_id for exit_ in exits])
+        return exits
+
+    def evaluate_prices(self, prices: Dict[str, float], timestamp: Optional[float] = None) -> List[PositionExit]:
+        # evaluate a whole ticker snapshot; pairs without open positions are skipped by the index lookup
+
+        exits = []
+        for trading_pair in self.pairs():
+            current_price = prices.get(trading_pair)
+            if current_price is not None:
+                exits.extend(self.evaluate(trading_pair, current_price, timestamp))
+        return exits
+
+    def pairs(self) -> List[str]:
+        with self._lock:
+            return list(self._positions)
+
+    def exit_pair(self, trading_pair: str, current_price: float,
+                  reason: str = EXIT_SELL_SIGNAL) -> List[PositionExit]:
+        # take every open position of a pair out for a discretionary exit (e.g. a sell signal)
+
+        timestamp = time.time()
+        with self._lock:
+            pair_positions = list(self._positions.get(trading_pair, {}).values())
+            self._take(trading_pair, [position.position_id for position in pair_positions])
+        return [PositionExit(position, current_price, reason, timestamp) for position in pair_positions]
+
+    def complete(self, exit_: PositionExit, success: bool) -> None:
+        # settle an exit: a filled sell closes the position, a failed one returns it to the index
+
+        position = exit_.position
+        with self._lock:
+            self._closing.pop(position.position_id, None)
+            if not success:
+                self._positions.setdefault(position.trading_pair, {})[position.position_id] = position
+            unsubscribe = (position.trading_pair in self._subscribed
+                           and not self._positions.get(position.trading_pair)
+                           and not any(p.trading_pair == position.trading_pair for p in self._closing.values()))
+            if unsubscribe:
+                self._subscribed.discard(position.trading_pair)
+        if success:
+            position.closed.set()
+        if unsubscribe and self.price_feed is not None:
+            self.price_feed.unsubscribe(position.trading_pair, self.on_price)
+
+    def dispatch(self, exits: List[PositionExit]) -> None:
+        # send the exit orders through the handler and settle each one
+
+        for exit_ in exits:
+            print(f"\n🛑 {exit_.reason} triggered for {exit_.position.trading_pair} at {exit_.price} "
+                  f"(position #{exit_.position.position_id}, Highest: {exit_.position.highest_price:.2f})")
+            try:
+                with metrics.span("position_stage", stage="exit_order", reason=exit_.reason):
+                    success = bool(self.exit_handler(exit_)) if self.exit_handler else True
+            except Exception as e:
+                print(f"\n❌ Error placing exit order for {exit_.position.trading_pair}: {e}")
+                success = False
+            self.complete(exit_, success)
+
+    def on_price(self, trading_pair: str, current_price: float, timestamp: float) -> None:
+        # PriceFeed callback: evaluate the pair and send any triggered exits
+
+        with metrics.span("position_stage", stage="evaluate"):
+            exits = self.evaluate(trading_pair, current_price, timestamp)
+        if exits:
+            self.dispatch(exits)
+        else:
+            positions = self.positions(trading_pair)
+            if positions:
+                pnl = sum(position.unrealized_pnl(current_price) for position in positions)
+                invested = sum(position.investment_amount for position in positions)
+                current_time = datetime.fromtimestamp(timestamp, timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+                print(f"\r🕒 {current_time} UTC | 💹 {trading_pair}: {current_price:.2f} | "
+                      f"Positions: {len(positions)} | P&L: {pnl:.2f} ({pnl / invested * 100:.2f}%)", end="")
+
+    def wait_closed(self, position: Position, timeout: Optional[float] = None) -> bool:
+        return position.closed.wait(timeout)
@@ -1,16 +1,24 @@
-from typing import Tuple
-import pandas as pd
+from __future__ import annotations
+from typing import Dict, Optional, Tuple
 from config.settings import DEBUG_MODE
+from core.signal_rules import SignalRules
+from utils.lazy_imports import lazy_import
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
 
 class SignalGenerator:
     
     # analyzes technical indicators from a DataFrame to generate buy/sell signals
+    # the buy/sell conditions are the SIGNAL_RULES expressions, compiled once (core/signal_rules.py)
     
-    def __init__(self) -> None:
+    def __init__(self, rules: Optional[Dict[str, str]] = None) -> None:
+        self.rules = SignalRules(rules)
         self.required_indicators = [
             "RSI", "MACD", "MACD_Signal", "EMA_9", "EMA_21",
             "BBU", "BBM", "BBL", "Stoch_%K", "Stoch_%D", "Volume"
         ]
+        self.required_indicators += [column for column in self.rules.columns
+                                     if column not in self.required_indicators]
 
     def validate_data(self, df: pd.DataFrame) -> bool:
         # check that all required indicators exist in the DataFrame
@@ -25,55 +33,26 @@ class SignalGenerator:
                 print("❌ Missing required indicators")
                 return False, "hold"
 
-            latest = df.iloc[-1]
-            previous = df.iloc[-2]
-
+            signal = self.rules.evaluate_latest(df)
             if DEBUG_MODE:
-                print("\n🔍 Latest Indicator Values:")
-                for indicator in self.required_indicators:
-                    print(f"{indicator}: {latest[indicator]:.2f}")
-
-            trend_up = (latest['EMA_9'] > latest['EMA_21'] and latest['close'] > latest['EMA_9'])
-            trend_down = (latest['EMA_9'] < latest['EMA_21'] and latest['close'] < latest['EMA_9'])
-            volume_increasing = latest['Volume'] > previous['Volume'] * 1.2
-
-            rsi_oversold = latest['RSI'] < 30
-            rsi_overbought = latest['RSI'] > 70
-
-            macd_crossover = (latest['MACD'] > latest['MACD_Signal'] and previous['MACD'] <= previous['MACD_Signal'])
-            macd_crossunder = (latest['MACD'] < latest['MACD_Signal'] and previous['MACD'] >= previous['MACD_Signal'])
-
-            bb_oversold = latest['close'] <= latest['BBL']
-            bb_overbought = latest['close'] >= latest['BBU']
-
-            stoch_oversold = latest['Stoch_%K'] < 20
-            stoch_overbought = latest['Stoch_%K'] > 80
-
-            if (trend_up and volume_increasing and rsi_oversold and macd_crossover and bb_oversold and stoch_oversold):
-                if DEBUG_MODE:
-                    print("\n🎯 Buy Signal Conditions Met:")
-                    print(f"Trend Up: {trend_up}")
-                    print(f"Volume Increasing: {volume_increasing}")
-                    print(f"RSI Oversold: {rsi_oversold}")
-                    print(f"MACD Crossover: {macd_crossover}")
-                    print(f"BB Oversold: {bb_oversold}")
-                    print(f"Stochastic Oversold: {stoch_oversold}")
-                return True, "buy"
-            elif (trend_down and volume_increasing and rsi_overbought and macd_crossunder and bb_overbought and stoch_overbought):
-                if DEBUG_MODE:
-                    print("\n🎯 Sell Signal Conditions Met:")
-                    print(f"Trend Down: {trend_down}")
-                    print(f"Volume Increasing: {volume_increasing}")
-                    print(f"RSI Overbought: {rsi_overbought}")
-                    print(f"MACD Crossunder: {macd_crossunder}")
-                    print(f"BB Overbought: {bb_overbought}")
-                    print(f"Stochastic Overbought: {stoch_overbought}")
-                return True, "sell"
-            return False, "hold"
+                self.rules.print_latest()
+            if signal is None:
+                return False, "hold"
+            return True, signal
         except Exception as e:
             print(f"❌ Error in signal generation: {e}")
             return False, "error"
 
+    def analyze_indicators_vectorized(self, df: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
+        # evaluate the analyze_indicators rules for every bar at once
+        # returns (buy, sell) boolean arrays; bar i uses row i as 'latest' and row i-1 as 'previous'
+        
+        if not self.validate_data(df):
+            raise ValueError("❌ Missing required indicators")
+        signals = self.rules.evaluate_frame(df)
+        none = np.zeros(len(df), dtype=bool)
+        return signals.get("buy", none), signals.get("sell", none)
+
     def get_signal_strength(self, df: pd.DataFrame) -> float:        
         # calculate a combined signal strength from several indicators
         # returns a value from 0 to 100
@@ -0,0 +1,364 @@
+from __future__ import annotations
+import re
+import threading
+from typing import Any, Callable, Dict, FrozenSet, List, Optional, Tuple
+from config.settings import SIGNAL_RULES
+from utils.lazy_imports import lazy_import
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+# rule language, one expression per signal:
+#   conditions:  a < b, a <= b, a > b, a >= b, a == b, a != b, a crosses_above b, a crosses_below b
+#   values:      indicator columns (EMA_9, Stoch_%K, close, ...), numbers, + - * /, unary minus,
+#                prev(x) / prev(x, n) for x one / n bars back, parentheses
+#   logic:       and, or, not, parentheses
+# e.g. "EMA_9 > EMA_21 and Volume > prev(Volume) * 1.2 and (RSI < 30 or close <= BBL)"
+# a comparison with a missing value (NaN, or a bar before the first) is False, != included
+
+_TOKEN = re.compile(r"\s*(?:(?P<number>\d+\.?\d*|\.\d+)|(?P<name>[A-Za-z_][A-Za-z0-9_%]*)"
+                    r"|(?P<op><=|>=|==|!=|[<>()+\-*/,]))")
+# numpy ufunc names, looked up when a rule is compiled so importing this module does not load numpy
+_COMPARISONS = {"<": "less", "<=": "less_equal", ">": "greater", ">=": "greater_equal",
+                "==": "equal", "!=": "not_equal"}
+_ARITHMETIC = {"+": "add", "-": "subtract", "*": "multiply", "/": "divide"}
+_CROSSES = ("crosses_above", "crosses_below")
+_KEYWORDS = {"and", "or", "not", "prev"} | set(_CROSSES)
+
+# fn(columns, outcomes) -> array; condition nodes also store their result in outcomes[text]
+Evaluator = Callable[[Dict[str, Any], Dict[str, Any]], Any]
+
+class _Node:
+
+    # one compiled sub-expression: its evaluator, value kind ("num" or "bool"), lookback and columns
+
+    __slots__ = ("fn", "kind", "lag", "columns")
+
+    def __init__(self, fn: Evaluator, kind: str, lag: int = 0, columns: FrozenSet[str] = frozenset()) -> None:
+        self.fn = fn
+        self.kind = kind
+        self.lag = lag
+        self.columns = columns
+
+def _shift(values: Any, periods: int) -> np.ndarray:
+    # values `periods` bars back; bars before the first are NaN
+    values = np.asarray(values, dtype=np.float64)
+    shifted = np.full_like(values, np.nan)
+    if periods < len(values):
+        shifted[periods:] = values[:len(values) - periods]
+    return shifted
+
+class _Parser:
+
+    # recursive descent over the token list; builds evaluators bottom-up, checking kinds as it goes
+
+    def __init__(self, source: str) -> None:
+        self.source = source
+        # open parentheses around the current position; a value is only complete without a comparison inside them
+        self.depth = 0
+        self.tokens: List[Tuple[str, str, int, int]] = []
+        position = 0
+        source = source.rstrip()
+        while position < len(source):
+            match = _TOKEN.match(source, position)
+            if not match or match.end() == position:
+                raise ValueError(f"❌ Unexpected character in signal rule at {position}: {source[position:]!r}")
+            kind = match.lastgroup
+            self.tokens.append((kind, match.group(kind), match.start(kind), match.end()))
+            position = match.end()
+        self.index = 0
+        # conditions in the order they appear in the rule
+        self.conditions: List[str] = []
+
+    def _peek(self) -> Optional[str]:
+        return self.tokens[self.index][1] if self.index < len(self.tokens) else None
+
+    def _take(self, expected: Optional[str] = None) -> Tuple[str, str, int, int]:
+        if self.index >= len(self.tokens):
+            raise ValueError(f"❌ Signal rule ended early: {self.source!r}")
+        token = self.tokens[self.index]
+        if expected is not None and token[1] != expected:
+            raise ValueError(f"❌ Expected {expected!r} at {token[2]} in signal rule: {self.source!r}")
+        self.index += 1
+        return token
+
+    def parse(self) -> _Node:
+        node = self._or()
+        if self.index < len(self.tokens):
+            raise ValueError(f"❌ Unexpected {self._peek()!r} at {self.tokens[self.index][2]} "
+                             f"in signal rule: {self.source!r}")
+        if node.kind != "bool":
+            raise ValueError(f"❌ Signal rule is a value, not a condition: {self.source!r}")
+        return node
+
+    def _logic(self, operator: str, operand: Callable[[], _Node], combine: Any) -> _Node:
+        nodes = [operand()]
+        while self._peek() == operator:
+            self._take()
+            nodes.append(operand())
+        if len(nodes) == 1:
+            return nodes[0]
+        for node in nodes:
+            self._expect_kind(node, "bool", operator)
+        first, rest = nodes[0].fn, [node.fn for node in nodes[1:]]
+
+        def fn(columns: Dict[str, np.ndarray], outcomes: Dict[str, np.ndarray]) -> np.ndarray:
+            # every operand is evaluated (no short circuit) so each condition has an outcome for the breakdown
+            result = first(columns, outcomes)
+            for f in rest:
+                result = combine(result, f(columns, outcomes))
+            return result
+
+        return _Node(fn, "bool", max(node.lag for node in nodes), frozenset().union(*(node.columns for node in nodes)))
+
+    def _or(self) -> _Node:
+        return self._logic("or", self._and, np.logical_or)
+
+    def _and(self) -> _Node:
+        return self._logic("and", self._not, np.logical_and)
+
+    def _not(self) -> _Node:
+        if self._peek() == "not":
+            self._take()
+            node = self._not()
+            self._expect_kind(node, "bool", "not")
+            inner = node.fn
+            return _Node(lambda columns, outcomes: np.logical_not(inner(columns, outcomes)), "bool",
+                         node.lag, node.columns)
+        return self._condition()
+
+    def _condition(self) -> _Node:
+        start = self.tokens[self.index][2] if self.index < len(self.tokens) else len(self.source)
+        left = self._sum()
+        operator = self._peek()
+        if operator not in _COMPARISONS and operator not in _CROSSES:
+            if left.kind != "bool" and not (self.depth and operator == ")"):
+                raise ValueError(f"❌ Expected a comparison after {self.source[start:self.tokens[self.index - 1][3]].strip()!r} "
+                                 f"in signal rule: {self.source!r}")
+            return left
+        self._take()
+        right = self._sum()
+        for node in (left, right):
+            self._expect_kind(node, "num", operator)
+        text = self.source[start:self.tokens[self.index - 1][3]].strip()
+        if not (left.columns | right.columns):
+            raise ValueError(f"❌ Condition {text!r} does not use any indicator")
+        self.conditions.append(text)
+        left_fn, right_fn = left.fn, right.fn
+        if operator in _COMPARISONS:
+            compare = getattr(np, _COMPARISONS[operator])
+            if operator == "!=":
+                # NaN != x is True in numpy; a missing value makes every comparison False here
+                def compare(a: Any, b: Any) -> np.ndarray:
+                    return np.not_equal(a, b) & ~np.isnan(a) & ~np.isnan(b)
+
+            def fn(columns: Dict[str, np.ndarray], outcomes: Dict[str, np.ndarray]) -> np.ndarray:
+                result = outcomes[text] = compare(left_fn(columns, outcomes), right_fn(columns, outcomes))
+                return result
+
+            return _Node(fn, "bool", max(left.lag, right.lag), left.columns | right.columns)
+        # a crosses_above b: a > b on this bar and a <= b on the previous one
+        now, before = (np.greater, np.less_equal) if operator == "crosses_above" else (np.less, np.greater_equal)
+
+        def cross(columns: Dict[str, np.ndarray], outcomes: Dict[str, np.ndarray]) -> np.ndarray:
+            a, b = left_fn(columns, outcomes), right_fn(columns, outcomes)
+            result = outcomes[text] = now(a, b) & before(_shift(a, 1), _shift(b, 1))
+            return result
+
+        return _Node(cross, "bool", max(left.lag, right.lag) + 1, left.columns | right.columns)
+
+    def _binary(self, operators: str, operand: Callable[[], _Node]) -> _Node:
+        node = operand()
+        while self._peek() is not None and self._peek() in operators:
+            operator = self._take()[1]
+            right = operand()
+            for side in (node, right):
+                self._expect_kind(side, "num", operator)
+            func, left_fn, right_fn = getattr(np, _ARITHMETIC[operator]), node.fn, right.fn
+            node = _Node(lambda columns, outcomes, func=func, left_fn=left_fn, right_fn=right_fn:
+                         func(left_fn(columns, outcomes), right_fn(columns, outcomes)),
+                         "num", max(node.lag, right.lag), node.columns | right.columns)
+        return node
+
+    def _sum(self) -> _Node:
+        return self._binary("+-", self._product)
+
+    def _product(self) -> _Node:
+        return self._binary("*/", self._unary)
+
+    def _unary(self) -> _Node:
+        if self._peek() == "-":
+            self._take()
+            node = self._unary()
+            self._expect_kind(node, "num", "-")
+            inner = node.fn
+            return _Node(lambda columns, outcomes: np.negative(inner(columns, outcomes)), "num",
+                         node.lag, node.columns)
+        return self._atom()
+
+    def _atom(self) -> _Node:
+        kind, value, position, _ = self._take()
+        if kind == "number":
+            number = float(value)
+            return _Node(lambda columns, outcomes: number, "num")
+        if value == "(":
+            self.depth += 1
+            node = self._or()
+            self._take(")")
+            self.depth -= 1
+            return node
+        if value == "prev":
+            self._take("(")
+            node = self._sum()
+            self._expect_kind(node, "num", "prev")
+            periods = 1
+            if self._peek() == ",":
+                self._take()
+                periods_token = self._take()
+                if periods_token[0] != "number" or not periods_token[1].isdigit() or int(periods_token[1]) < 1:
+                    raise ValueError(f"❌ prev() needs a whole number of bars at {periods_token[2]}: {self.source!r}")
+                periods = int(periods_token[1])
+            self._take(")")
+            inner = node.fn
+            return _Node(lambda columns, outcomes: _shift(inner(columns, outcomes), periods), "num",
+                         node.lag + periods, node.columns)
+        if kind == "name" and value not in _KEYWORDS:
+            return _Node(lambda columns, outcomes: columns[value], "num", 0, frozenset((value,)))
+        raise ValueError(f"❌ Unexpected {value!r} at {position} in signal rule: {self.source!r}")
+
+    def _expect_kind(self, node: _Node, kind: str, operator: str) -> None:
+        if node.kind != kind:
+            wanted = "values" if kind == "num" else "conditions"
+            raise ValueError(f"❌ {operator!r} takes {wanted} in signal rule: {self.source!r}")
+
+class SignalRules:
+
+    # compiled signal rules: {"buy": "...", "sell": "..."} parsed once into numpy evaluators
+    # evaluate_frame runs them over whole columns (backtests); evaluate_latest runs the same evaluators on
+    # the last `lookback + 1` bars only (live scans)
+    # rules are checked in order and the first one that holds takes the bar, so a bar has at most one signal
+    # every condition's outcome is counted per evaluated bar, for the hit breakdown
+
+    def __init__(self, rules: Optional[Dict[str, str]] = None) -> None:
+        self.sources = dict(rules if rules is not None else SIGNAL_RULES)
+        self._compiled: Dict[str, _Node] = {}
+        self.conditions: Dict[str, List[str]] = {}
+        for signal, source in self.sources.items():
+            parser = _Parser(source)
+            self._compiled[signal] = parser.parse()
+            self.conditions[signal] = list(dict.fromkeys(parser.conditions))
+        self.columns = sorted(frozenset().union(*(node.columns for node in self._compiled.values())))
+        # bars a rule needs besides the current one (prev(x, n), crosses)
+        self.lookback = max((node.lag for node in self._compiled.values()), default=0)
+        self._lock = threading.Lock()
+        self.reset_hits()
+
+    def reset_hits(self) -> None:
+        with self._lock:
+            self.bars = 0
+            self.signal_hits = dict.fromkeys(self._compiled, 0)
+            self.condition_hits = {signal: dict.fromkeys(conditions, 0)
+                                   for signal, conditions in self.conditions.items()}
+            self.last_outcomes: Dict[str, Dict[str, bool]] = {}
+
+    def _run(self, columns: Dict[str, np.ndarray]) -> Tuple[Dict[str, np.ndarray], Dict[str, Dict[str, np.ndarray]]]:
+        signals, outcomes = {}, {}
+        taken = None
+        with np.errstate(invalid="ignore", divide="ignore"):
+            for signal, node in self._compiled.items():
+                signal_outcomes: Dict[str, np.ndarray] = {}
+                fired = np.asarray(node.fn(columns, signal_outcomes), dtype=bool)
+                if taken is None:
+                    taken = fired
+                else:
+                    fired = fired & ~taken
+                    taken = taken | fired
+                signals[signal] = fired
+                outcomes[signal] = signal_outcomes
+        return signals, outcomes
+
+    @staticmethod
+    def frame_columns(df: pd.DataFrame, names: List[str], rows: Optional[int] = None) -> Dict[str, np.ndarray]:
+        # float64 columns (None/strings become NaN), optionally only the last `rows` rows
+        missing = [name for name in names if name not in df.columns]
+        if missing:
+            raise ValueError(f"❌ Signal rules use unknown columns: {', '.join(missing)}")
+        if rows is None:
+            return {name: pd.to_numeric(df[name], errors="coerce").to_numpy(dtype=np.float64) for name in names}
+        # one conversion of the tail rows is much cheaper than selecting each column of the frame
+        try:
+            block = df.iloc[-rows:].to_numpy(dtype=np.float64, na_value=np.nan)
+        except (TypeError, ValueError):
+            return {name: pd.to_numeric(df[name].iloc[-rows:], errors="coerce").to_numpy(dtype=np.float64)
+                    for name in names}
+        return {name: block[:, df.columns.get_loc(name)] for name in names}
+
+    def evaluate(self, columns: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        # signal -> boolean array over every bar of the columns; counts the hits of every bar
+        missing = [name for name in self.columns if name not in columns]
+        if missing:
+            raise ValueError(f"❌ Signal rules use unknown columns: {', '.join(missing)}")
+        signals, outcomes = self._run(columns)
+        bars = len(next(iter(signals.values()))) if signals else 0
+        with self._lock:
+            self.bars += bars
+            for signal, fired in signals.items():
+                self.signal_hits[signal] += int(np.count_nonzero(fired))
+                for text, outcome in outcomes[signal].items():
+                    self.condition_hits[signal][text] += int(np.count_nonzero(outcome))
+        return signals
+
+    def evaluate_frame(self, df: pd.DataFrame) -> Dict[str, np.ndarray]:
+        return self.evaluate(self.frame_columns(df, self.columns))
+
+    def evaluate_latest(self, df: pd.DataFrame) -> Optional[str]:
+        # the signal of the last bar, or None; only the rows the rules look back over are converted
+
+        signals, outcomes = self._run(self.frame_columns(df, self.columns, self.lookback + 1))
+        fired_signal = None
+        latest = {}
+        for signal, fired in signals.items():
+            hit = bool(fired[-1]) if len(fired) else False
+            if hit and fired_signal is None:
+                fired_signal = signal
+            latest[signal] = {text: bool(outcome[-1]) if len(outcome) else False
+                              for text, outcome in outcomes[signal].items()}
+        with self._lock:
+            self.bars += 1
+            for signal, signal_outcomes in latest.items():
+                self.signal_hits[signal] += fired_signal == signal
+                for text, hit in signal_outcomes.items():
+                    self.condition_hits[signal][text] += hit
+            self.last_outcomes = latest
+        return fired_signal
+
+    def breakdown(self) -> Dict[str, Dict[str, Any]]:
+        # per signal: how often it fired and how often each of its conditions held, over the evaluated bars
+        with self._lock:
+            bars = self.bars
+            return {
+                signal: {
+                    "hits": self.signal_hits[signal],
+                    "rate": self.signal_hits[signal] / bars if bars else 0.0,
+                    "conditions": {text: {"hits": hits, "rate": hits / bars if bars else 0.0}
+                                   for text, hits in self.condition_hits[signal].items()},
+                }
+                for signal in self._compiled
+            }
+
+    def print_latest(self) -> None:
+        # the outcome of every condition on the last bar evaluated by evaluate_latest
+        with self._lock:
+            latest = dict(self.last_outcomes)
+        for signal, outcomes in latest.items():
+            met = sum(outcomes.values())
+            print(f"\n🔍 {signal.capitalize()} conditions met: {met}/{len(outcomes)}")
+            for text, hit in outcomes.items():
+                print(f"{'✅' if hit else '❌'} {text}")
+
+    def print_breakdown(self) -> None:
+        breakdown = self.breakdown()
+        print(f"\n📊 Signal rule hits over {self.bars} bars:")
+        for signal, entry in breakdown.items():
+            print(f"➡️ {signal}: {entry['hits']} ({entry['rate'] * 100:.2f}%)")
+            for text, stats in entry["conditions"].items():
+                print(f"   {text}: {stats['hits']} ({stats['rate'] * 100:.2f}%)")
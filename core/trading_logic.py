@@ -1,145 +1,138 @@
 import time
 from datetime import datetime, timezone
-from typing import Any
+from typing import Any, Optional
 from core.OMS import OrderManagementSystem
-from config.settings import DEBUG_MODE, TRAILING_STOP_PERCENTAGE
+from core.order_reconciler import OrderEvent, OrderReconciler
+from config.settings import DEBUG_MODE, ADAPTIVE_POLLING, ORDER_RECONCILER_ENABLED
 from utils.historical_data import HistoricalData
-from utils.technical_indicators import TechnicalIndicators
+from utils.incremental_indicators import IncrementalIndicators
 from core.quantity_utils import QuantityUtils
 from utils.logging_utils import Logger
+from utils.exit_traces import NAN, ExitTrace, record_exit_trace
 from utils.market_data import MarketData
+from utils.metrics import metrics
+from core.poll_scheduler import AdaptivePollScheduler
+from core.position_manager import PositionExit, PositionManager
 from core.signal_generator import SignalGenerator
+from utils.price_feed import PollingPriceFeed, PriceFeed, create_price_feed
 
 class TradingLogic:
     
     # encapsulates the live trading logic: monitoring prices, placing orders, and managing open positions
     
-    def __init__(self) -> None:
+    def __init__(self, price_feed: Optional[PriceFeed] = None) -> None:
         self.oms = OrderManagementSystem()
+        self.price_feed = price_feed or create_price_feed()
         self.signal_gen = SignalGenerator()
-        self.open_positions: dict[str, float] = {}
+        # every open position, checked on each price update the feed pushes
+        self.positions = PositionManager(self.exit_position, self.price_feed)
+        # polls the ticker sooner as positions approach an exit and less often when none is close
+        self.poll_scheduler = AdaptivePollScheduler(self.positions)
+        if ADAPTIVE_POLLING and isinstance(self.price_feed, PollingPriceFeed):
+            self.price_feed.scheduler = self.poll_scheduler
+        self.indicator_engines: dict[str, IncrementalIndicators] = {}
+        # keeps the OMS's active orders in sync with the exchange; started once the first order is placed
+        self.reconciler = OrderReconciler(self.oms) if ORDER_RECONCILER_ENABLED else None
+        if self.reconciler:
+            self.reconciler.subscribe(self.on_order_event)
+
+    def on_order_event(self, event: OrderEvent) -> None:
+        # OrderReconciler handler: report exchange-side changes to orders placed by the bot
+        metrics.increment("order_events", kind=event.kind)
+        if event.kind == OrderReconciler.EVENT_CANCEL:
+            print(f"⚠️ Order {event.order.order_id} ({event.order.market}) was cancelled on the exchange")
+        elif DEBUG_MODE:
+            print(f"🔍 Order {event.order.order_id} {event.kind}: filled {event.filled_delta}")
 
     def monitor_position(self, trading_pair: str, entry_price: float, quantity: float,
                          stop_loss_price: float, take_profit_price: float,
                          investment_amount: float, wallet_balance: float) -> bool:
-        # monitor an open position and trigger a sell if stop-loss, trailing stop, or take-profit is hit
-        print(f"\n📗 Monitoring position for {trading_pair} (Entry: {entry_price})")
+        # register a filled buy with the position manager and wait until its exit order goes through
+        # exit checks for every open position run on the feed's price updates, not in this thread
+        self.refresh_atr(trading_pair)
+        position = self.positions.open(trading_pair, entry_price, quantity, stop_loss_price,
+                                       take_profit_price, investment_amount, wallet_balance)
         try:
-            highest_price = entry_price  # initialize highest price reached
-            while True:
-                current_price = MarketData.fetch_real_time_price(trading_pair)
-                if current_price is None:
-                    print("❌ Failed to fetch current price")
-                    time.sleep(5)
-                    continue
-
-                # update highest price and compute trailing stop loss price
-                if current_price > highest_price:
-                    highest_price = current_price
-                trailing_stop_price = highest_price * (1 - TRAILING_STOP_PERCENTAGE)
-
-                unrealized_pnl = (current_price - entry_price) * quantity
-                pnl_percentage = (unrealized_pnl / investment_amount) * 100
-                current_time = datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
-                print(f"\r🕒 {current_time} UTC | 💹 Current Price: {current_price:.2f} | P&L: {unrealized_pnl:.2f} ({pnl_percentage:.2f}%)", end="")
+            return self.positions.wait_closed(position)
+        except Exception as e:
+            print(f"\n❌ Error monitoring position: {e}")
+            return False
+        finally:
+            self.report_polling()
 
-                # Check for static stop loss first
-                if current_price <= stop_loss_price:
-                    print(f"\n🛑 Static Stop Loss triggered at {current_price}")
-                    sell_order = self.place_order(
-                        order_side="sell",
-                        trading_pair=trading_pair,
-                        current_price=current_price,
-                        investment_amount=investment_amount,
-                        wallet_balance=wallet_balance,
-                        stop_loss_price=None,
-                        take_profit_price=None,
-                        initial_price=entry_price
-                    )
-                    if sell_order:
-                        print(f"✅ Stop Loss order executed successfully at {current_time} UTC")
-                        Logger.log_trade(
-                            trading_pair=trading_pair,
-                            current_price=current_price,
-                            investment_amount=investment_amount,
-                            quantity=quantity,
-                            wallet_balance=wallet_balance,
-                            order_type="sell",
-                            stop_loss_price=None,
-                            take_profit_price=None,
-                            initial_price=entry_price,
-                            profit=(current_price - entry_price) * quantity,
-                            sell_price=current_price,
-                            buy_price=entry_price
-                        )
-                    return True
+    def refresh_atr(self, trading_pair: str, engine: Optional[IncrementalIndicators] = None) -> None:
+        # hand the poll scheduler the pair's latest ATR; without a warm indicator engine one is built
+        # from the stored candles (no network I/O)
+        engine = engine or self.indicator_engines.get(trading_pair)
+        if engine is None or not engine.latest:
+            df = HistoricalData.load(trading_pair)
+            if df is None:
+                if DEBUG_MODE:
+                    print(f"🔍 No stored candles for {trading_pair}; polling at the fixed interval")
+                return
+            engine = self.indicator_engine(trading_pair)
+            engine.update_from_frame(df)
+        self.poll_scheduler.set_atr(trading_pair, engine.latest.get("ATR"))
 
-                # check for trailing stop loss if price has risen
-                if current_price <= trailing_stop_price and current_price < highest_price:
-                    print(f"\n🛑 Trailing Stop Loss triggered at {current_price} (Highest: {highest_price:.2f}, Trailing SL: {trailing_stop_price:.2f})")
-                    sell_order = self.place_order(
-                        order_side="sell",
-                        trading_pair=trading_pair,
-                        current_price=current_price,
-                        investment_amount=investment_amount,
-                        wallet_balance=wallet_balance,
-                        stop_loss_price=None,
-                        take_profit_price=None,
-                        initial_price=entry_price
-                    )
-                    if sell_order:
-                        print(f"✅ Trailing Stop Loss order executed successfully at {current_time} UTC")
-                        Logger.log_trade(
-                            trading_pair=trading_pair,
-                            current_price=current_price,
-                            investment_amount=investment_amount,
-                            quantity=quantity,
-                            wallet_balance=wallet_balance,
-                            order_type="sell",
-                            stop_loss_price=None,
-                            take_profit_price=None,
-                            initial_price=entry_price,
-                            profit=(current_price - entry_price) * quantity,
-                            sell_price=current_price,
-                            buy_price=entry_price
-                        )
-                    return True
+    def indicator_engine(self, trading_pair: str) -> IncrementalIndicators:
+        # the pair's incremental indicators, keeping as many rows as the signal rules look back over
+        engine = self.indicator_engines.get(trading_pair)
+        if engine is None:
+            engine = self.indicator_engines.setdefault(
+                trading_pair, IncrementalIndicators(history=self.signal_gen.rules.lookback + 1))
+        return engine
 
-                # Check for take profit
-                if current_price >= take_profit_price:
-                    print(f"\n🎯 Take Profit triggered at {current_price}")
-                    sell_order = self.place_order(
-                        order_side="sell",
-                        trading_pair=trading_pair,
-                        current_price=current_price,
-                        investment_amount=investment_amount,
-                        wallet_balance=wallet_balance,
-                        stop_loss_price=None,
-                        take_profit_price=None,
-                        initial_price=entry_price
-                    )
-                    if sell_order:
-                        print(f"✅ Take Profit order executed successfully at {current_time} UTC")
-                        Logger.log_trade(
-                            trading_pair=trading_pair,
-                            current_price=current_price,
-                            investment_amount=investment_amount,
-                            quantity=quantity,
-                            wallet_balance=wallet_balance,
-                            order_type="sell",
-                            stop_loss_price=None,
-                            take_profit_price=None,
-                            initial_price=entry_price,
-                            profit=(current_price - entry_price) * quantity,
-                            sell_price=current_price,
-                            buy_price=entry_price
-                        )
-                    return True
+    def report_polling(self) -> None:
+        # adaptive polling savings and worst-case exit delay, once any poll was scheduled
+        if self.poll_scheduler.polls:
+            self.poll_scheduler.report()
 
-                time.sleep(5)
-        except Exception as e:
-            print(f"\n❌ Error monitoring position: {e}")
+    def exit_position(self, exit_: PositionExit) -> bool:
+        # PositionManager exit handler: sell the position at the triggering price
+        position = exit_.position
+        if exit_.reason != PositionManager.EXIT_SELL_SIGNAL:
+            self.poll_scheduler.record_trigger(position.trading_pair)
+        sell_order = self.place_order(
+            order_side="sell",
+            trading_pair=position.trading_pair,
+            current_price=exit_.price,
+            investment_amount=position.investment_amount,
+            wallet_balance=position.wallet_balance,
+            stop_loss_price=None,
+            take_profit_price=None,
+            initial_price=position.entry_price
+        )
+        self.trace_exit(exit_, sell_order)
+        if not sell_order:
             return False
+        metrics.increment("position_exits", reason=exit_.reason)
+        current_time = datetime.fromtimestamp(exit_.timestamp, timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+        print(f"✅ {exit_.reason} order executed successfully at {current_time} UTC")
+        return True
+
+    @staticmethod
+    def trace_exit(exit_: PositionExit, sell_order: Any) -> ExitTrace:
+        # persist the exit's timeline: price observed, exit decided, sell sent and acknowledged
+        # a failed sell is kept (ok=False) without request times; they are not known past the OMS
+        fill_price = (sell_order.avg_price or sell_order.price_per_unit) if sell_order else 0.0
+        trace = ExitTrace(
+            trading_pair=exit_.position.trading_pair,
+            reason=exit_.reason,
+            position_id=exit_.position.position_id,
+            observed_at=exit_.timestamp,
+            decided_at=exit_.decided_at,
+            sent_at=sell_order.sent_at if sell_order and sell_order.sent_at else NAN,
+            acknowledged_at=sell_order.acknowledged_at if sell_order and sell_order.acknowledged_at else NAN,
+            trigger_price=exit_.trigger_price if exit_.trigger_price is not None else exit_.price,
+            observed_price=exit_.price,
+            fill_price=fill_price or NAN,
+            quantity=sell_order.total_quantity if sell_order else NAN,
+            ok=bool(sell_order)
+        )
+        record_exit_trace(trace)
+        if sell_order:
+            metrics.observe("exit_tick_to_ack", trace.tick_to_ack, reason=exit_.reason)
+        return trace
 
     def place_order(self, order_side: str, trading_pair: str, current_price: float, investment_amount: float,
                     wallet_balance: float, stop_loss_price: Any, take_profit_price: Any,
@@ -169,8 +162,9 @@ class TradingLogic:
                 )
                 initial_price_to_log = initial_price
 
-            # log trade
+            # log trade (once; sells carry the realized profit)
             if order:
+                is_sell = order_side.lower() != "buy" and initial_price is not None
                 Logger.log_trade(
                     trading_pair=trading_pair,
                     current_price=current_price,
@@ -180,13 +174,16 @@ class TradingLogic:
                     order_type=order_side,
                     stop_loss_price=stop_loss_price,
                     take_profit_price=take_profit_price,
-                    initial_price=initial_price_to_log
+                    initial_price=initial_price_to_log,
+                    profit=(current_price - initial_price) * quantity if is_sell else None,
+                    buy_price=initial_price if is_sell else None,
+                    sell_price=current_price if is_sell else None
                 )
                 print(f"✅ {order_side.capitalize()} Order Successful!")
+                if self.reconciler:
+                    self.reconciler.start()
                 if DEBUG_MODE:
                     print(f"🔍 Order Details: {order}")
-                if order_side.lower() == "buy":
-                    self.open_positions[trading_pair] = current_price
                 return order
             print(f"❌ {order_side.capitalize()} Order Failed!")
             return None
@@ -201,19 +198,31 @@ class TradingLogic:
         print("\n📡 Monitoring Market Price...")
         try:
             while True:
-                df = HistoricalData.fetch(trading_pair)
+                cycle_start = time.perf_counter()
+                with metrics.span("trading_loop_stage", stage="candles"):
+                    df = HistoricalData.fetch(trading_pair)
                 if df is None:
                     print("❌ Failed to fetch historical data.")
                     time.sleep(5)
                     continue
-                df = TechnicalIndicators.calculate(df)
-                should_trade, signal = self.signal_gen.analyze_indicators(df)
-                current_price = MarketData.fetch_real_time_price(trading_pair)
+                # only candles newer than the last one seen (plus the open candle) are applied
+                engine = self.indicator_engine(trading_pair)
+                with metrics.span("trading_loop_stage", stage="indicators"):
+                    engine.update_from_frame(df)
+                    df = engine.tail_frame()
+                self.refresh_atr(trading_pair, engine)
+                with metrics.span("trading_loop_stage", stage="signals"):
+                    should_trade, signal = self.signal_gen.analyze_indicators(df)
+                # one ticker download per cycle, shared by every price lookup in it
+                with metrics.span("trading_loop_stage", stage="ticker"):
+                    snapshot = MarketData.get_ticker_snapshot()
+                current_price = snapshot.prices([trading_pair]).get(trading_pair)
                 if current_price is None:
                     print("❌ Failed to fetch current price.")
                     time.sleep(5)
                     continue
-                market_details = MarketData.get_market_details(trading_pair)
+                with metrics.span("trading_loop_stage", stage="market_details"):
+                    market_details = MarketData.get_market_details(trading_pair)
                 if not market_details:
                     print(f"❌ Failed to fetch market details for {trading_pair}.")
                     time.sleep(5)
@@ -223,18 +232,24 @@ class TradingLogic:
                     signal_strength = self.signal_gen.get_signal_strength(df)
                     print(f"\n📊 Signal Strength: {signal_strength:.2f}%")
                     if signal.lower() == "buy":
+                        if self.positions.has_position(trading_pair):
+                            print(f"⚠️ Position already open for {trading_pair}, ignoring buy signal.")
+                            time.sleep(5)
+                            continue
                         print("\n🎯 Buy Signal Detected!")
-                        buy_order = self.place_order(
-                            "buy", 
-                            trading_pair, 
-                            current_price, 
-                            investment_amount,
-                            market_details.get("balance", 0),
-                            stop_loss_price,
-                            take_profit_price
-                        )
+                        with metrics.span("trading_loop_stage", stage="order"):
+                            buy_order = self.place_order(
+                                "buy",
+                                trading_pair,
+                                current_price,
+                                investment_amount,
+                                market_details.get("balance", 0),
+                                stop_loss_price,
+                                take_profit_price
+                            )
                         if buy_order:
-                            self.monitor_position(
+                            # exits are handled by the position manager; keep scanning for signals
+                            self.positions.open(
                                 trading_pair=trading_pair,
                                 entry_price=current_price,
                                 quantity=buy_order.total_quantity,
@@ -243,25 +258,16 @@ class TradingLogic:
                                 investment_amount=investment_amount,
                                 wallet_balance=market_details.get("balance", 0)
                             )
-                            break
                     elif signal.lower() == "sell":
                         print("\n🎯 Sell Signal Detected!")
-                        entry_price = self.open_positions.get(trading_pair)
-                        if entry_price is None:
-                            print("⚠️ No recorded entry price for sell order.")
-                            continue
-                        sell_order = self.place_order(
-                            "sell",
-                            trading_pair,
-                            current_price,
-                            investment_amount,
-                            market_details.get("balance", 0),
-                            stop_loss_price,
-                            take_profit_price,
-                            initial_price=entry_price
-                        )
-                        if sell_order:
-                            break
+                        exits = self.positions.exit_pair(trading_pair, current_price)
+                        if not exits:
+                            print("⚠️ No open position to sell.")
+                        self.positions.dispatch(exits)
+                # the whole scan, excluding the pause before the next one
+                metrics.observe("trading_loop_cycle", time.perf_counter() - cycle_start)
                 time.sleep(5)
         except Exception as e:
             print(f"\n❌ Error during price monitoring: {e}")
+        finally:
+            self.report_polling()
@@ -1,14 +1,16 @@
-from config.settings import RISK_REWARD_RATIO, STOP_LOSS_PERCENTAGE
+from config.settings import RISK_REWARD_RATIO, STOP_LOSS_PERCENTAGE, METRICS_ENABLED, STARTUP_WARMUP
 from core.risk_management import RiskManagement
 from utils.auth import Auth
 from core.trading_logic import TradingLogic
 from utils.market_data import MarketData
+from utils.metrics import metrics
+from utils.startup_warmup import StartupWarmup
 
 def get_user_input() -> tuple[str, float]:
     # prompt the user for trading pair and investment amount
     
     print("➡️ Provide Trading Parameters ⬅️")
-    trading_pair = input("📈 Enter the trading pair (e.g., BTCINR, ETHINR): ").strip().upper()
+    trading_pair = input("📈 Enter the trading pair, or several separated by commas (e.g., BTCINR, ETHINR): ").strip().upper()
     while True:
         try:
             investment_amount = float(input("💰 Enter the investment amount in INR: ").strip())
@@ -21,6 +23,9 @@ def get_user_input() -> tuple[str, float]:
 def main() -> None:
     # main function
     
+    # import pandas & co. and download the markets list while the user types
+    warmup = StartupWarmup().start() if STARTUP_WARMUP else None
+
     try:
         trading_pair, investment_amount = get_user_input()
         print("\n📝 Trade Summary:")
@@ -29,6 +34,13 @@ def main() -> None:
     except Exception as e:
         print(f"❌ Error during user input: {e}")
         return
+    trading_pairs = [pair.strip() for pair in trading_pair.split(",") if pair.strip()]
+    if warmup:
+        warmup.warm_pairs(trading_pairs)
+
+    # per-stage latency metrics for the scrape endpoint / textfile collector
+    if METRICS_ENABLED:
+        metrics.start_exporters()
 
     # connect to CoinDCX
     print("\n🔑 Testing API Authentication...")
@@ -47,6 +59,21 @@ def main() -> None:
         print(f"❌ Error during wallet balance fetch: {e}")
         return
 
+    # the candles were syncing during authentication; let them finish before the first cycle reads them
+    if warmup:
+        warmup.wait()
+
+    # several pairs: scan and trade them all from one asyncio loop
+    if "," in trading_pair:
+        # asyncio and the runner are only needed on this path
+        import asyncio
+        from core.async_runner import AsyncTradingRunner
+        try:
+            asyncio.run(AsyncTradingRunner(trading_pairs, investment_amount).run())
+        except KeyboardInterrupt:
+            print("\n⏹️ Multi-pair trading stopped.")
+        return
+
     # fetch market data for Trading Pair
     print(f"\n📊 Fetching Market Data for {trading_pair}...")
     try:
@@ -2,7 +2,7 @@ import time
 import math
 from datetime import datetime
 from dataclasses import dataclass
-from typing import Optional, List
+from typing import Any, Optional, List, Tuple
 from config.settings import DEBUG_MODE
 from utils.market_data import MarketData
 from utils.historical_data import HistoricalData
@@ -10,7 +10,12 @@ from utils.technical_indicators import TechnicalIndicators
 from core.signal_generator import SignalGenerator
 from core.quantity_utils import QuantityUtils
 from core.risk_management import RiskManagement
+from core.position_manager import PositionManager
 from utils.logging_utils import Logger
+from utils.price_feed import PriceFeed, create_price_feed
+from utils.clock import SystemClock, VirtualClock
+from utils.exit_traces import ExitTrace, record_exit_trace
+from utils.tick_store import ReplayPriceFeed, TickReader
 
 @dataclass
 class PaperOrder:
@@ -34,7 +39,9 @@ class PaperTradingOMS:
     
     # simulated Order Management System for paper trading
     
-    def __init__(self, initial_balance: float) -> None:
+    def __init__(self, initial_balance: float, clock: Any = None) -> None:
+        # clock: SystemClock for live prices, the replay's VirtualClock for recorded ticks
+        self.clock = clock or SystemClock()
         self.wallet_balance = initial_balance
         self.order_history: List[PaperOrder] = []
         self.order_counter = 0
@@ -43,10 +50,19 @@ class PaperTradingOMS:
         self.order_counter += 1
         return f"PAPER_ORDER_{self.order_counter}"
 
+    def position_id(self, market: str) -> int:
+        # paper positions are numbered by the sequence number of the buy that opened them (0 if none)
+        for order in reversed(self.order_history):
+            if order.market == market and order.side.lower() == "buy":
+                return int(order.order_id.rsplit("_", 1)[1])
+        return 0
+
     def place_market_order(self, market: str, side: str, total_quantity: float,
                            stop_loss: Optional[float] = None, take_profit: Optional[float] = None,
-                           execution_price: Optional[float] = None) -> Optional[PaperOrder]:        
+                           execution_price: Optional[float] = None,
+                           initial_price: Optional[float] = None) -> Optional[PaperOrder]:        
         # simulate placing a market order
+        # initial_price: entry price of the position a sell closes, used to log the realized profit
         
         if execution_price is None:
             print("❌ [Paper Trading] Execution price must be provided.")
@@ -71,7 +87,7 @@ class PaperTradingOMS:
             order_type="market_order",
             price_per_unit=simulated_price,
             total_quantity=total_quantity,
-            timestamp=int(time.time() * 1000),
+            timestamp=int(self.clock.time() * 1000),
             status="FILLED",
             filled_quantity=total_quantity,
             remaining_quantity=0,
@@ -90,15 +106,49 @@ class PaperTradingOMS:
             order_type=side,
             stop_loss_price=stop_loss,
             take_profit_price=take_profit,
-            initial_price=(simulated_price if side.lower() == "buy" else None)
+            initial_price=(simulated_price if side.lower() == "buy" else initial_price),
+            profit=(None if side.lower() == "buy" or initial_price is None
+                    else (simulated_price - initial_price) * total_quantity),
+            buy_price=(initial_price if side.lower() == "sell" else None),
+            sell_price=(simulated_price if side.lower() == "sell" else None),
+            timestamp=self.clock.time()
         )
         return order
 
 open_positions: dict[str, float] = {}
 
+def enter_paper_position(paper_oms: PaperTradingOMS, trading_pair: str, investment_amount: float,
+                         current_price: float, market_details: dict) -> Optional[Tuple[float, dict]]:
+    # size and place the simulated buy; returns (quantity, risk levels) or None when the buy failed
+
+    risk_mgmt = RiskManagement.calculate(current_price, 0.01, 1.5)  # 1% stop-loss, risk-reward ratio 1.5
+    print(f"\n📊 Live Data for {trading_pair}:")
+    print(f"➡️ Current Price: {current_price:.2f} INR")
+    print(f"➡️ Risk Management: Initial Stop-Loss = {risk_mgmt['stop_loss_price']} INR, Take-Profit = {risk_mgmt['take_profit_price']} INR")
+
+    quantity = QuantityUtils.calculate_quantity(investment_amount, current_price, market_details)
+    print(f"📈 Calculated Quantity: {quantity}")
+
+    buy_order = paper_oms.place_market_order(
+        market=trading_pair,
+        side="buy",
+        total_quantity=quantity,
+        stop_loss=risk_mgmt['stop_loss_price'],
+        take_profit=risk_mgmt['take_profit_price'],
+        execution_price=current_price
+    )
+    if not buy_order:
+        print("❌ Paper trading buy order failed.")
+        return None
+
+    print("✅ Paper trading buy order executed successfully.")
+    open_positions[trading_pair] = current_price
+    return quantity, risk_mgmt
+
 def paper_trade_main() -> None:
     # main function for the paper trading environment
     # prompts user for input, places a simulated buy order, and monitors the position
+    # with a recorded tick file the whole session is replayed on a virtual clock instead
     
     trading_pair = input("Enter the trading pair for paper trading (e.g., ADAINR): ").strip().upper()
     try:
@@ -108,6 +158,11 @@ def paper_trade_main() -> None:
         print(f"❌ Invalid input: {e}")
         return
 
+    tick_file = input("Enter a recorded tick file to replay (leave empty for live prices): ").strip()
+    if tick_file:
+        replay_paper_trade(tick_file, trading_pair, investment_amount)
+        return
+
     paper_oms = PaperTradingOMS(initial_balance=investment_amount)
     current_price = MarketData.fetch_real_time_price(trading_pair)
     if current_price is None:
@@ -119,28 +174,10 @@ def paper_trade_main() -> None:
         print("❌ Failed to fetch market details.")
         return
 
-    risk_mgmt = RiskManagement.calculate(current_price, 0.01, 1.5)  # 1% stop-loss, risk-reward ratio 1.5
-    print(f"\n📊 Live Data for {trading_pair}:")
-    print(f"➡️ Current Price: {current_price:.2f} INR")
-    print(f"➡️ Risk Management: Initial Stop-Loss = {risk_mgmt['stop_loss_price']} INR, Take-Profit = {risk_mgmt['take_profit_price']} INR")
-
-    quantity = QuantityUtils.calculate_quantity(investment_amount, current_price, market_details)
-    print(f"📈 Calculated Quantity: {quantity}")
-
-    buy_order = paper_oms.place_market_order(
-        market=trading_pair,
-        side="buy",
-        total_quantity=quantity,
-        stop_loss=risk_mgmt['stop_loss_price'],
-        take_profit=risk_mgmt['take_profit_price'],
-        execution_price=current_price
-    )
-    if not buy_order:
-        print("❌ Paper trading buy order failed.")
+    entry = enter_paper_position(paper_oms, trading_pair, investment_amount, current_price, market_details)
+    if entry is None:
         return
-
-    print("✅ Paper trading buy order executed successfully.")
-    open_positions[trading_pair] = current_price  
+    quantity, risk_mgmt = entry
     simulate_monitor_position(
         trading_pair, 
         current_price, 
@@ -153,87 +190,138 @@ def paper_trade_main() -> None:
         polling_interval=5
     )
 
+def replay_paper_trade(tick_file: str, trading_pair: str, investment_amount: float,
+                       market_details: Optional[dict] = None,
+                       polling_interval: int = 5) -> Optional[PaperTradingOMS]:
+    # run the paper trading session against recorded ticks: the first tick is the entry price and the
+    # rest drive simulate_monitor_position on a virtual clock, so no sleeps and no price requests
+    # returns the paper OMS (its order history is the result) or None when the entry failed
+
+    ticks = TickReader(tick_file).ticks([trading_pair])
+    first = next(ticks, None)
+    ticks.close()
+    if first is None:
+        print(f"❌ No {trading_pair} ticks in {tick_file}.")
+        return None
+    _, current_price, timestamp = first
+
+    market_details = market_details or MarketData.get_market_details(trading_pair)
+    if not market_details:
+        print("❌ Failed to fetch market details.")
+        return None
+
+    clock = VirtualClock(timestamp)
+    paper_oms = PaperTradingOMS(initial_balance=investment_amount, clock=clock)
+    entry = enter_paper_position(paper_oms, trading_pair, investment_amount, current_price, market_details)
+    if entry is None:
+        return None
+    quantity, risk_mgmt = entry
+    started = time.perf_counter()
+    simulate_monitor_position(
+        trading_pair,
+        current_price,
+        quantity,
+        initial_stop_loss=risk_mgmt['stop_loss_price'],
+        take_profit_price=risk_mgmt['take_profit_price'],
+        paper_oms=paper_oms,
+        investment_amount=investment_amount,
+        trailing_stop_percentage=0.005,
+        polling_interval=polling_interval,
+        price_feed=ReplayPriceFeed(tick_file, clock),
+        status_interval=60
+    )
+    if DEBUG_MODE:
+        print(f"\n🔍 [Paper Trading] Replayed {datetime.fromtimestamp(clock.time()) - datetime.fromtimestamp(timestamp)} "
+              f"of ticks in {time.perf_counter() - started:.3f}s")
+    return paper_oms
+
 def simulate_monitor_position(trading_pair: str, entry_price: float, quantity: float,
                               initial_stop_loss: float, take_profit_price: float,
                               paper_oms: PaperTradingOMS, investment_amount: float,
                               trailing_stop_percentage: float = 0.005,
-                              polling_interval: int = 5) -> None:
+                              polling_interval: int = 5,
+                              price_feed: Optional[PriceFeed] = None,
+                              status_interval: float = 0) -> Optional[PaperOrder]:
     
     # simulate monitoring of an open paper trading position
     # uses a trailing stop-loss which adjusts as the price increases
+    # status_interval: minimum clock seconds between P&L status lines (replays print one per virtual minute)
+    # returns the sell order, or None when the feed ended first (a replay ran out of ticks)
     
     trailing_stop = initial_stop_loss
     max_price = entry_price
+    position_id = paper_oms.position_id(trading_pair)
 
     print(f"\n📗 [Paper Trading] Monitoring position for {trading_pair} with Trailing Stop-Loss (simulated)...")
-    while True:
-        live_price = MarketData.fetch_real_time_price(trading_pair)
-        if live_price is None:
-            print("❌ [Paper Trading] Failed to fetch live price, retrying...")
-            time.sleep(polling_interval)
-            continue
-
-        if live_price > max_price:
-            max_price = live_price
-            new_trailing = max_price * (1 - trailing_stop_percentage)
-            if new_trailing > trailing_stop:
-                trailing_stop = new_trailing
-
-        unrealized_pnl = (live_price - entry_price) * quantity
-        pnl_percentage = (unrealized_pnl / (entry_price * quantity)) * 100
-        current_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        print(f"\r🕒 {current_time} | Price: {live_price:.2f} INR | P&L: {unrealized_pnl:.2f} ({pnl_percentage:.2f}%) | Trailing Stop: {trailing_stop:.2f} INR", end="")
-
-        if live_price <= trailing_stop:
-            print(f"\n🛑 [Paper Trading] Trailing Stop-Loss triggered at {live_price:.2f} INR")
-            entry_price_for_sell = open_positions.get(trading_pair, entry_price)
-            paper_oms.place_market_order(
-                market=trading_pair,
-                side="sell",
-                total_quantity=quantity,
-                execution_price=live_price
-            )
-            Logger.log_trade(
-                trading_pair=trading_pair,
-                current_price=live_price,
-                investment_amount=investment_amount,
-                quantity=quantity,
-                wallet_balance=paper_oms.wallet_balance,
-                order_type="sell",
-                stop_loss_price=None,
-                take_profit_price=None,
-                initial_price=entry_price_for_sell,
-                profit=(live_price - entry_price_for_sell) * quantity,
-                sell_price=live_price,
-                buy_price=entry_price_for_sell
-            )
-            break
-        elif live_price >= take_profit_price:
-            print(f"\n🎯 [Paper Trading] Take Profit triggered at {live_price:.2f} INR")
-            entry_price_for_sell = open_positions.get(trading_pair, entry_price)
-            paper_oms.place_market_order(
-                market=trading_pair,
-                side="sell",
-                total_quantity=quantity,
-                execution_price=live_price
-            )
-            Logger.log_trade(
-                trading_pair=trading_pair,
-                current_price=live_price,
-                investment_amount=investment_amount,
-                quantity=quantity,
-                wallet_balance=paper_oms.wallet_balance,
-                order_type="sell",
-                stop_loss_price=None,
-                take_profit_price=None,
-                initial_price=entry_price_for_sell,
-                profit=(live_price - entry_price_for_sell) * quantity,
-                sell_price=live_price,
-                buy_price=entry_price_for_sell
-            )
-            break
-
-        time.sleep(polling_interval)
+    # a feed built here is stopped on the way out, so its polling thread does not outlive the position
+    own_feed = price_feed is None
+    feed = price_feed or create_price_feed(poll_interval=polling_interval)
+    ticks = feed.ticks(trading_pair, timeout=polling_interval * 3)
+    sell_order = None
+    last_status = None
+    try:
+        for live_price in ticks:
+            if live_price is None:
+                print("❌ [Paper Trading] Failed to fetch live price, retrying...")
+                continue
+
+            if live_price > max_price:
+                max_price = live_price
+                new_trailing = max_price * (1 - trailing_stop_percentage)
+                if new_trailing > trailing_stop:
+                    trailing_stop = new_trailing
+
+            now = paper_oms.clock.time()
+            if last_status is None or now - last_status >= status_interval:
+                last_status = now
+                unrealized_pnl = (live_price - entry_price) * quantity
+                pnl_percentage = (unrealized_pnl / (entry_price * quantity)) * 100
+                current_time = datetime.fromtimestamp(now).strftime('%Y-%m-%d %H:%M:%S')
+                print(f"\r🕒 {current_time} | Price: {live_price:.2f} INR | P&L: {unrealized_pnl:.2f} ({pnl_percentage:.2f}%) | Trailing Stop: {trailing_stop:.2f} INR", end="")
+
+            exit_reason = None
+            if live_price <= trailing_stop:
+                print(f"\n🛑 [Paper Trading] Trailing Stop-Loss triggered at {live_price:.2f} INR")
+                exit_reason = (PositionManager.EXIT_TRAILING_STOP if trailing_stop > initial_stop_loss
+                               else PositionManager.EXIT_STOP_LOSS)
+                exit_level = trailing_stop
+            elif live_price >= take_profit_price:
+                print(f"\n🎯 [Paper Trading] Take Profit triggered at {live_price:.2f} INR")
+                exit_reason = PositionManager.EXIT_TAKE_PROFIT
+                exit_level = take_profit_price
+            if exit_reason:
+                # same trace as a live exit, on the paper clock (a replay's virtual time)
+                decided_at = paper_oms.clock.time()
+                entry_price_for_sell = open_positions.get(trading_pair, entry_price)
+                sell_order = paper_oms.place_market_order(
+                    market=trading_pair,
+                    side="sell",
+                    total_quantity=quantity,
+                    execution_price=live_price,
+                    initial_price=entry_price_for_sell
+                )
+                acknowledged_at = paper_oms.clock.time()
+                record_exit_trace(ExitTrace(
+                    trading_pair=trading_pair,
+                    reason=exit_reason,
+                    position_id=position_id,
+                    observed_at=now,
+                    decided_at=decided_at,
+                    sent_at=decided_at,
+                    acknowledged_at=acknowledged_at,
+                    trigger_price=exit_level,
+                    observed_price=live_price,
+                    fill_price=sell_order.avg_price if sell_order else float("nan"),
+                    quantity=quantity,
+                    ok=sell_order is not None,
+                    paper=True
+                ))
+                break
+    finally:
+        ticks.close()
+        if own_feed:
+            feed.stop()
+    return sell_order
 
 if __name__ == "__main__":
     paper_trade_main()
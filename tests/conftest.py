@@ -0,0 +1,38 @@
+import os
+import sys
+import pandas as pd
+import pytest
+
+# the project is run from its root (python main.py), so tests import it the same way
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+FIXTURES = os.path.join(ROOT, "tests", "fixtures")
+
+def load_fixture(name: str = "candles_5m.csv") -> pd.DataFrame:
+    # fixture bars shaped like HistoricalData.fetch(): timestamp index, open/high/low/close/volume columns
+    # and, for signal_bars.csv, the TechnicalIndicators columns
+    df = pd.read_csv(os.path.join(FIXTURES, name))
+    df.index = pd.to_datetime(df.pop("time"), unit="ms")
+    df.index.name = "timestamp"
+    return df
+
+@pytest.fixture
+def candles() -> pd.DataFrame:
+    return load_fixture()
+
+@pytest.fixture
+def signal_bars() -> pd.DataFrame:
+    # indicator bars with buy and sell setups, some of them missing one condition exactly at its boundary
+    return load_fixture("signal_bars.csv")
+
+@pytest.fixture
+def logs_folder(tmp_path, monkeypatch):
+    # keep trade logs, journals and exit traces out of the tracked logs folder
+    import utils.logging_utils as logging_utils
+    logging_utils.Logger.shutdown()
+    monkeypatch.setattr(logging_utils.Logger, "LOGS_FOLDER", str(tmp_path))
+    monkeypatch.setattr(logging_utils, "TRADE_JOURNAL_PATH", str(tmp_path / "trades.db"))
+    yield tmp_path
+    logging_utils.Logger.shutdown()
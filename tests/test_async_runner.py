@@ -0,0 +1,35 @@
+import asyncio
+import threading
+from types import SimpleNamespace
+from core.async_runner import AsyncTradingRunner
+from core.trading_logic import TradingLogic
+from utils.market_data import MarketData
+
+def test_runner_shares_the_trading_logic_positions(monkeypatch):
+    trading_logic = TradingLogic()
+    runner = AsyncTradingRunner(["BTCINR"], 1000.0, trading_logic=trading_logic)
+    assert runner.positions is trading_logic.positions
+
+    lookups = []
+
+    def get_market_details(trading_pair):
+        lookups.append(threading.current_thread())
+        return {"balance": 5000.0}
+
+    monkeypatch.setattr(MarketData, "get_market_details", staticmethod(get_market_details))
+    monkeypatch.setattr(trading_logic, "place_order", lambda *args: SimpleNamespace(total_quantity=0.5))
+    # no price feed thread for this test; the runner's own cycle checks exits
+    monkeypatch.setattr(trading_logic.positions, "price_feed", None)
+
+    loop_threads = []
+
+    async def open_position():
+        loop_threads.append(threading.current_thread())
+        await runner._open_position("BTCINR", 100.0)
+
+    asyncio.run(open_position())
+
+    # the market details lookup ran in a worker thread, not on the event loop
+    assert lookups and lookups[0] is not loop_threads[0]
+    position, = trading_logic.positions.positions("BTCINR")
+    assert (position.entry_price, position.quantity) == (100.0, 0.5)
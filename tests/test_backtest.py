@@ -0,0 +1,108 @@
+import numpy as np
+import pandas as pd
+import pytest
+from core.backtest import Backtester
+from core.risk_management import RiskManagement
+from core.signal_generator import SignalGenerator
+
+def per_bar_trades(df, buy, sell, stop_loss_percentage, risk_reward_ratio, trailing_stop_percentage=None):
+    # reference simulation, one bar at a time: enter at the close of a buy bar, then on each later bar
+    # check the stop (static or trailing from the highs of earlier bars), the target and the sell signal
+    trades = []
+    position = None
+    for t in range(len(df)):
+        high, low, close = df["high"].iloc[t], df["low"].iloc[t], df["close"].iloc[t]
+        if position is None:
+            if buy[t]:
+                levels = RiskManagement.calculate(close, stop_loss_percentage, risk_reward_ratio)
+                position = {"bar": t, "price": close, "highest": close, **levels}
+            continue
+        stop = position["stop_loss_price"]
+        trailing = None
+        if trailing_stop_percentage:
+            trailing = position["highest"] * (1 - trailing_stop_percentage)
+            stop = max(stop, trailing)
+        exit_ = None
+        if low <= stop:
+            trailed = (trailing is not None and position["highest"] > position["price"]
+                       and trailing > position["stop_loss_price"])
+            exit_ = (stop, Backtester.EXIT_TRAILING_STOP if trailed else Backtester.EXIT_STOP_LOSS)
+        elif high >= position["take_profit_price"]:
+            exit_ = (position["take_profit_price"], Backtester.EXIT_TAKE_PROFIT)
+        elif sell[t]:
+            exit_ = (close, Backtester.EXIT_SELL_SIGNAL)
+        position["highest"] = max(position["highest"], high)
+        if exit_:
+            trades.append((position["bar"], t, position["price"], exit_[0], exit_[1]))
+            position = None
+    return trades
+
+def trade_tuples(result):
+    trades = result.trades
+    return list(zip(trades["entry_bar"], trades["exit_bar"], trades["entry_price"], trades["exit_price"],
+                    trades["exit_reason"]))
+
+@pytest.mark.parametrize("trailing_stop_percentage", [None, 0.004])
+def test_trades_match_per_bar_simulation(signal_bars, trailing_stop_percentage):
+    backtester = Backtester()
+    signals = backtester.signals(signal_bars)
+    result = backtester.run(signal_bars, stop_loss_percentage=0.01, risk_reward_ratio=2,
+                            trailing_stop_percentage=trailing_stop_percentage)
+    expected = per_bar_trades(signal_bars, signals["buy"].to_numpy(), signals["sell"].to_numpy(), 0.01, 2,
+                              trailing_stop_percentage)
+    assert len(expected) > 5
+    assert trade_tuples(result) == expected
+
+def test_signals_match_per_bar_analyze_indicators(signal_bars):
+    backtester = Backtester()
+    signals = backtester.signals(signal_bars)
+    assert signals["buy"].sum() > 0 and signals["sell"].sum() > 0
+    assert backtester.verify_against_per_bar(signal_bars) == []
+
+def test_per_bar_check_sees_the_bars_lagged_rules_reach(signal_bars):
+    rules = {"buy": "close > prev(close, 3) and RSI < 45", "sell": "close < prev(close, 2) and RSI > 55"}
+    backtester = Backtester(SignalGenerator(rules))
+    signals = backtester.signals(signal_bars)
+    assert signals["buy"].sum() > 0 and signals["sell"].sum() > 0
+    assert backtester.verify_against_per_bar(signal_bars) == []
+
+def bars(rows, buy_bars=(0,), sell_bars=()):
+    # hand-made (high, low, close) bars with explicit signals
+    df = pd.DataFrame(rows, columns=["high", "low", "close"],
+                      index=pd.date_range("2024-01-01", periods=len(rows), freq="5min"))
+    buy = np.zeros(len(rows), dtype=bool)
+    sell = np.zeros(len(rows), dtype=bool)
+    buy[list(buy_bars)] = True
+    sell[list(sell_bars)] = True
+    return df, pd.DataFrame({"buy": buy, "sell": sell}, index=df.index)
+
+def test_stop_wins_when_stop_and_target_hit_on_same_bar():
+    # entry 100, stop 99, target 102; bar 2 spans both
+    df, signals = bars([(100, 100, 100), (100.5, 99.5, 100), (102.5, 98.5, 101)])
+    trades = Backtester().run(df, 0.01, 2, signals=signals).trades
+    assert list(trades["exit_bar"]) == [2]
+    assert list(trades["exit_reason"]) == [Backtester.EXIT_STOP_LOSS]
+    assert trades["exit_price"].iloc[0] == pytest.approx(99.0)
+
+def test_trailing_stop_follows_earlier_highs():
+    # the high of bar 1 lifts the stop to 101 * 0.99 = 99.99; bar 2's own high does not count for bar 2
+    df, signals = bars([(100, 100, 100), (101, 100.2, 100.8), (101.9, 99.9, 100)])
+    trades = Backtester().run(df, 0.01, 2, trailing_stop_percentage=0.01, signals=signals).trades
+    assert list(trades["exit_reason"]) == [Backtester.EXIT_TRAILING_STOP]
+    assert trades["exit_price"].iloc[0] == pytest.approx(99.99)
+    assert list(trades["exit_bar"]) == [2]
+
+def test_take_profit_and_sell_signal():
+    df, signals = bars([(100, 100, 100), (100.5, 99.5, 100.2), (102.1, 100, 101),
+                        (100, 100, 100), (100.4, 99.6, 100.3)], buy_bars=(0, 3), sell_bars=(4,))
+    trades = Backtester().run(df, 0.01, 2, signals=signals).trades
+    assert list(trades["exit_reason"]) == [Backtester.EXIT_TAKE_PROFIT, Backtester.EXIT_SELL_SIGNAL]
+    assert list(trades["exit_price"]) == pytest.approx([102.0, 100.3])
+
+def test_position_open_at_end_is_not_a_trade():
+    # the second entry never reaches its stop or target
+    df, signals = bars([(100, 100, 100), (102.5, 100, 102), (102, 102, 102), (102.5, 101.5, 102)],
+                       buy_bars=(0, 2))
+    result = Backtester().run(df, 0.01, 2, signals=signals)
+    assert list(result.trades["entry_bar"]) == [0]
+    assert result.stats["trades"] == 1
@@ -0,0 +1,70 @@
+import os
+from utils import candle_store as candle_store_module
+from utils.candle_store import CandleStore
+from utils.market_data import MarketData
+
+MINUTE = 60_000
+
+def candle(i, close=100.0):
+    return (i * MINUTE, 100.0, 101.0, 99.0, close, 1.0)
+
+class FakeCandles:
+
+    # the candles endpoint: the newest `page_size` candles of the requested range
+
+    def __init__(self, candles, page_size=5):
+        self.candles = candles
+        self.page_size = page_size
+        self.requests = []
+
+    def download(self, api_pair, interval, start_time=None, end_time=None, limit=None):
+        self.requests.append((start_time, end_time))
+        in_range = [c for c in self.candles if (start_time is None or c[0] >= start_time)
+                    and (end_time is None or c[0] <= end_time)]
+        return in_range[-self.page_size:]
+
+def store_with(monkeypatch, tmp_path, exchange, max_pages=50):
+    monkeypatch.setattr(MarketData, "get_market_details", staticmethod(lambda pair: {"pair": "I-BTC_INR"}))
+    monkeypatch.setattr(CandleStore, "download", staticmethod(exchange.download))
+    monkeypatch.setattr(candle_store_module, "CANDLE_PAGE_SIZE", exchange.page_size)
+    monkeypatch.setattr(candle_store_module, "CANDLE_SYNC_MAX_PAGES", max_pages)
+    return CandleStore(str(tmp_path))
+
+def test_sync_pages_back_to_the_stored_candles(monkeypatch, tmp_path):
+    exchange = FakeCandles([candle(i) for i in range(3)])
+    store = store_with(monkeypatch, tmp_path, exchange)
+    assert store.sync("BTCINR", "1m") == 3
+
+    # downtime: 12 candles arrived, more than two pages; the open candle 2 was revised
+    exchange.candles = [candle(i) for i in range(2)] + [candle(2, close=100.5)] + [candle(i) for i in range(3, 15)]
+    exchange.requests.clear()
+    store.sync("BTCINR", "1m")
+
+    assert store.candles("BTCINR", "1m") == exchange.candles
+    assert exchange.requests == [(2 * MINUTE, None), (2 * MINUTE, 10 * MINUTE - 1), (2 * MINUTE, 5 * MINUTE - 1)]
+    # the file on disk loads back to the same candles
+    assert CandleStore(str(tmp_path)).candles("BTCINR", "1m") == exchange.candles
+
+def test_sync_warns_when_the_gap_is_longer_than_the_page_cap(monkeypatch, tmp_path, capsys):
+    exchange = FakeCandles([candle(0)])
+    store = store_with(monkeypatch, tmp_path, exchange, max_pages=2)
+    store.sync("BTCINR", "1m")
+    exchange.candles = [candle(i) for i in range(30)]
+    store.sync("BTCINR", "1m")
+
+    assert len(exchange.requests) == 1 + 2
+    assert "are missing" in capsys.readouterr().out
+    assert [c[0] // MINUTE for c in store.candles("BTCINR", "1m")] == [0] + list(range(20, 30))
+
+def test_incomplete_last_line_is_dropped(tmp_path):
+    store = CandleStore(str(tmp_path))
+    store.import_candles("BTCINR", "1m", [candle(0), candle(1)])
+    path = os.path.join(str(tmp_path), "BTCINR_1m.csv")
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(f"{2 * MINUTE},100.0,10")
+
+    reloaded = CandleStore(str(tmp_path))
+    assert reloaded.candles("BTCINR", "1m") == [candle(0), candle(1)]
+    # appends start on a fresh line again
+    reloaded.import_candles("BTCINR", "1m", [candle(2)])
+    assert CandleStore(str(tmp_path)).candles("BTCINR", "1m") == [candle(0), candle(1), candle(2)]
@@ -0,0 +1,62 @@
+import sys
+import threading
+from utils.http_client import HttpClient
+from utils.rate_limiter import RequestScheduler
+
+class _Response:
+
+    def __init__(self, status_code):
+        self.status_code = status_code
+        self.headers = {}
+
+class _Session:
+
+    # answers every request without a network: 503 for /fail, 200 otherwise
+
+    def request(self, method, url, **kwargs):
+        return _Response(503 if url.endswith("/fail") else 200)
+
+    def close(self):
+        pass
+
+def unlimited_client(**kwargs):
+    client = HttpClient(scheduler=RequestScheduler(limits={"default": (1e9, 1e9)}, global_limit=None), **kwargs)
+    client.session = _Session()
+    return client
+
+def test_endpoint_stats_are_consistent_under_concurrency():
+    # a tiny switch interval makes threads interleave inside the counter updates
+    switch_interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    client = unlimited_client(max_retries=1, retry_backoff=0.0, retry_budget=1.0)
+    threads, per_thread = 8, 250
+
+    def worker():
+        for i in range(per_thread):
+            client.get("/exchange/ticker/fail" if i % 2 else "/exchange/ticker", public=True)
+
+    try:
+        workers = [threading.Thread(target=worker) for _ in range(threads)]
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+    finally:
+        sys.setswitchinterval(switch_interval)
+
+    stats = client.stats()["ticker"]
+    calls = threads * per_thread
+    # every failing call was retried once (the budget refills by one per call), and every attempt is counted
+    assert stats["retries"] == calls // 2
+    assert stats["requests"] == calls + stats["retries"]
+    assert stats["errors"] == calls // 2 + stats["retries"]
+
+def test_read_only_order_queries_have_their_own_lower_lane():
+    for path in ("/exchange/v1/orders/create", "/exchange/v1/orders/create_multiple", "/exchange/v1/orders/cancel",
+                 "/exchange/v1/orders/cancel_all", "/exchange/v1/orders/cancel_by_ids"):
+        assert HttpClient.endpoint_class(path) == "orders"
+    for path in ("/exchange/v1/orders/status", "/exchange/v1/orders/active_orders",
+                 "/exchange/v1/orders/trade_history"):
+        assert HttpClient.endpoint_class(path) == "order_queries"
+    scheduler = RequestScheduler()
+    assert scheduler.priority_for("orders") < scheduler.priority_for("order_queries") < scheduler.priority_for("ticker")
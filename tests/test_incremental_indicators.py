@@ -0,0 +1,77 @@
+import numpy as np
+import pandas as pd
+import pytest
+from utils.incremental_indicators import IncrementalIndicators
+
+# largest absolute difference allowed against TechnicalIndicators.calculate, per column
+# the Bollinger bands use a running variance (resynced every 1000 candles), so they drift the most
+TOLERANCES = {
+    "RSI": 1e-9,
+    "MACD": 1e-9,
+    "MACD_Signal": 1e-9,
+    "MACD_Histogram": 1e-9,
+    "EMA_9": 1e-9,
+    "EMA_21": 1e-9,
+    "BBL": 1e-8,
+    "BBM": 1e-9,
+    "BBU": 1e-8,
+    "ATR": 1e-9,
+    "Stoch_%K": 1e-9,
+    "Stoch_%D": 1e-9,
+}
+
+def replay(df: pd.DataFrame) -> pd.DataFrame:
+    engine = IncrementalIndicators()
+    rows = [engine.update(time, high, low, close, volume)
+            for time, high, low, close, volume in zip(df.index, df["high"], df["low"], df["close"], df["volume"])]
+    return pd.DataFrame(rows, index=df.index)
+
+def test_matches_batch_indicators(candles):
+    pytest.importorskip("pandas_ta")
+    from utils.technical_indicators import TechnicalIndicators
+
+    batch = TechnicalIndicators.calculate(candles.copy())
+    incremental = replay(candles)
+    assert set(TOLERANCES) == set(IncrementalIndicators.COLUMNS[2:])
+    for column, tolerance in TOLERANCES.items():
+        # the warm-up NaNs have to line up as well
+        np.testing.assert_allclose(incremental[column].to_numpy(), batch[column].astype(float).to_numpy(),
+                                   rtol=0, atol=tolerance, equal_nan=True, err_msg=column)
+
+def test_revising_the_open_candle_rolls_back(candles):
+    final = candles.iloc[-1]
+    preliminary = (final["high"] * 1.01, final["low"] * 0.98, final["close"] * 0.99, final["volume"] / 3)
+
+    engine = IncrementalIndicators()
+    engine.update_from_frame(candles.iloc[:-1])
+    before = engine.latest
+    engine.update(candles.index[-1], *preliminary)
+    engine.update(candles.index[-1], *preliminary[:2], final["close"] * 1.005, final["volume"] / 2)
+    revised = engine.update(candles.index[-1], final["high"], final["low"], final["close"], final["volume"])
+
+    expected = replay(candles).iloc[-1]
+    for column in IncrementalIndicators.COLUMNS:
+        assert revised[column] == pytest.approx(expected[column], rel=0, abs=1e-9), column
+    assert engine.previous is before
+    assert engine.count == len(candles)
+
+def test_update_from_frame_applies_revised_last_candle(candles):
+    engine = IncrementalIndicators()
+    engine.update_from_frame(candles.iloc[:-1])
+    revised = candles.iloc[-2:].copy()
+    revised.iloc[0, revised.columns.get_loc("close")] *= 1.002
+    engine.update_from_frame(revised)
+
+    expected = replay(pd.concat([candles.iloc[:-2], revised]))
+    assert engine.latest["EMA_9"] == pytest.approx(expected["EMA_9"].iloc[-1], rel=0, abs=1e-9)
+    assert engine.previous["EMA_9"] == pytest.approx(expected["EMA_9"].iloc[-2], rel=0, abs=1e-9)
+
+def test_out_of_order_candle_is_rejected(candles):
+    engine = IncrementalIndicators()
+    engine.update_from_frame(candles.iloc[:50])
+    latest = engine.latest
+    older = candles.iloc[10]
+    with pytest.raises(ValueError, match="older than the last candle"):
+        engine.update(candles.index[10], older["high"], older["low"], older["close"], older["volume"])
+    assert engine.latest is latest
+    assert engine.last_time == candles.index[49]
@@ -0,0 +1,71 @@
+import os
+import pytest
+from utils.metrics import _NOOP_SPAN, MetricsRegistry
+
+def test_render_uses_the_exposition_format():
+    registry = MetricsRegistry(enabled=True, reservoir=100)
+    for ms in range(1, 101):
+        registry.observe("scan", ms / 1000, pair="BTCINR")
+    registry.observe("scan", 0.25, pair='we"ird\\pair\n')
+    registry.increment("orders", side="buy")
+    registry.increment("orders", 2, side="buy")
+
+    lines = registry.render().splitlines()
+    # one HELP/TYPE block per metric, however many label sets it has
+    assert lines.count("# HELP tradingbot_scan_seconds Latency of the scan stage in seconds") == 1
+    assert lines.count("# TYPE tradingbot_scan_seconds summary") == 1
+    assert lines.count("# TYPE tradingbot_orders_total counter") == 1
+    assert lines.index("# TYPE tradingbot_scan_seconds summary") < lines.index(
+        'tradingbot_scan_seconds{pair="BTCINR",quantile="0.5"} 0.051')
+    assert 'tradingbot_scan_seconds{pair="BTCINR",quantile="0.95"} 0.096' in lines
+    assert 'tradingbot_scan_seconds{pair="BTCINR",quantile="0.99"} 0.1' in lines
+    assert 'tradingbot_scan_seconds_count{pair="BTCINR"} 100' in lines
+    sums = [line for line in lines if line.startswith('tradingbot_scan_seconds_sum{pair="BTCINR"}')]
+    assert float(sums[0].split()[-1]) == pytest.approx(5.05)
+    # quotes, backslashes and newlines in label values are escaped
+    assert 'tradingbot_scan_seconds_count{pair="we\\"ird\\\\pair\\n"} 1' in lines
+    assert 'tradingbot_orders_total{side="buy"} 3.0' in lines
+
+def test_spans_count_errors():
+    registry = MetricsRegistry(enabled=True)
+    with registry.span("submit", pair="BTCINR"):
+        pass
+    with pytest.raises(RuntimeError):
+        with registry.span("submit", pair="BTCINR"):
+            raise RuntimeError("rejected")
+
+    # both are timed; only the failed one is an error
+    assert registry.snapshot()['submit{pair="BTCINR"}']["count"] == 2
+    assert 'tradingbot_submit_errors_total{pair="BTCINR"} 1.0' in registry.render().splitlines()
+
+def test_disabled_registry_records_nothing():
+    registry = MetricsRegistry(enabled=False)
+    span = registry.span("scan", pair="BTCINR")
+    assert span is _NOOP_SPAN is registry.span("submit")
+    with pytest.raises(ValueError):
+        with span:
+            raise ValueError("not swallowed")
+    registry.observe("scan", 1.0)
+    registry.increment("orders")
+
+    assert registry.snapshot() == {}
+    assert registry.render() == "\n"
+
+def test_write_replaces_the_file_atomically(tmp_path, monkeypatch):
+    registry = MetricsRegistry(enabled=True)
+    registry.increment("orders")
+    path = str(tmp_path / "textfile" / "bot.prom")
+    registry.write(path)
+    with open(path, encoding="utf-8") as f:
+        assert f.read() == registry.render()
+    assert os.listdir(tmp_path / "textfile") == ["bot.prom"]
+
+    # a failed export leaves the previous file for the collector to read
+    def render():
+        raise OSError("disk full")
+
+    monkeypatch.setattr(registry, "render", render)
+    with pytest.raises(OSError):
+        registry.write(path)
+    with open(path, encoding="utf-8") as f:
+        assert "tradingbot_orders_total 1.0" in f.read()
@@ -0,0 +1,134 @@
+import numpy as np
+import pandas as pd
+import pytest
+from core.optimizer import ParameterSweep
+from utils.candle_store import CandleStore
+from utils.ohlcv_archive import HEADER, MAGIC, VERSION, OhlcvArchive
+
+STEP = 300_000
+
+def candles_from(start_index, n):
+    # 5m candles whose prices encode their index, so slices are easy to check
+    times = np.arange(start_index, start_index + n, dtype=np.int64) * STEP
+    prices = np.arange(start_index, start_index + n, dtype=np.float64)
+    return times, prices, prices + 1.0, prices - 1.0, prices + 0.5, prices * 10.0
+
+def test_append_skips_old_candles_and_revises_the_last_one(tmp_path):
+    archive = OhlcvArchive.create(str(tmp_path / "BTCINR_5m.ohlcv"), "5m")
+    assert archive.append(*candles_from(0, 5)) == 5
+
+    # the open candle is revised and one new candle closes; older ones are ignored
+    times, o, h, l, c, v = candles_from(2, 4)
+    c[2] = 99.0
+    assert archive.append(times, o, h, l, c, v) == 1
+    assert len(archive) == 6
+    assert archive.column("close")[4] == 99.0
+    assert archive.column("close")[3] == 3.5
+    assert archive.last_time() == 5 * STEP
+
+    with pytest.raises(ValueError):
+        archive.append(*[column[::-1] for column in candles_from(10, 3)])
+    with pytest.raises(ValueError):
+        OhlcvArchive(archive.path).append(*candles_from(20, 1))
+
+def test_append_grows_the_file_past_its_capacity(tmp_path):
+    archive = OhlcvArchive.create(str(tmp_path / "BTCINR_5m.ohlcv"), "5m", capacity=4)
+    archive.append(*candles_from(0, 3))
+    assert archive.append(*candles_from(3, 7)) == 7
+
+    assert archive.capacity == 10 and len(archive) == 10
+    # every column moved to its new offset intact
+    expected = candles_from(0, 10)
+    for name, column in zip(("time", "open", "high", "low", "close", "volume"), expected):
+        assert np.array_equal(archive.column(name), column)
+    # a later append doubles the capacity
+    archive.append(*candles_from(10, 1))
+    assert archive.capacity == 20
+    assert np.array_equal(OhlcvArchive(archive.path).times, candles_from(0, 11)[0])
+
+def test_range_edges(tmp_path):
+    archive = OhlcvArchive.create(str(tmp_path / "BTCINR_5m.ohlcv"), "5m")
+    assert archive.index_range() == slice(0, 0)
+    archive.append(*candles_from(10, 10))
+
+    # start inclusive, end exclusive, between candles rounds up
+    assert archive.index_range(12 * STEP, 15 * STEP) == slice(2, 5)
+    assert archive.index_range(12 * STEP + 1, 15 * STEP + 1) == slice(3, 6)
+    # before the first and past the last candle
+    assert archive.index_range(0, 11 * STEP) == slice(0, 1)
+    assert archive.index_range(19 * STEP, 100 * STEP) == slice(9, 10)
+    assert archive.index_range(None, None) == slice(0, 10)
+    # empty windows
+    assert archive.index_range(0, 10 * STEP) == slice(0, 0)
+    assert archive.index_range(20 * STEP, None) == slice(10, 10)
+    assert archive.index_range(15 * STEP, 15 * STEP) == slice(5, 5)
+
+    columns = archive.range(13 * STEP, 16 * STEP)
+    assert list(columns["open"]) == [13.0, 14.0, 15.0]
+    assert len(archive.range(30 * STEP)["time"]) == 0
+
+    df = archive.to_dataframe(13 * STEP, 16 * STEP)
+    assert list(df.columns) == ["open", "high", "low", "close", "volume"]
+    assert df.index.name == "timestamp"
+    assert df.index[0] == pd.Timestamp(13 * STEP, unit="ms")
+
+def test_reopening_reads_the_header(tmp_path):
+    path = str(tmp_path / "BTCINR_1h.ohlcv")
+    archive = OhlcvArchive.create(path, "1h", capacity=8)
+    archive.append(*candles_from(0, 5))
+
+    reopened = OhlcvArchive(path)
+    assert (reopened.interval, len(reopened), reopened.capacity) == ("1h", 5, 8)
+    assert reopened.first_time() == 0 and reopened.last_time() == 4 * STEP
+    with open(path, "rb") as f:
+        magic, version, _, capacity, count, interval = HEADER.unpack(f.read(HEADER.size))
+    assert (magic, version, capacity, count, interval.rstrip(b"\0")) == (MAGIC, VERSION, 8, 5, b"1h")
+
+    with open(path, "r+b") as f:
+        f.write(b"NOTOHLCV")
+    with pytest.raises(ValueError):
+        OhlcvArchive(path)
+
+def test_import_csv_reads_a_candle_store_file(tmp_path):
+    store = CandleStore(str(tmp_path / "candles"))
+    store.import_candles("BTCINR", "5m", [(t * STEP, 1.0, 2.0, 0.5, 1.5, 10.0) for t in range(5)])
+    # a revision of the last candle is appended as another line
+    store.import_candles("BTCINR", "5m", [(4 * STEP, 1.0, 3.0, 0.5, 2.5, 20.0)])
+
+    archive = OhlcvArchive.for_pair("BTCINR", "5m", writable=True, root=str(tmp_path / "archive"))
+    assert archive.import_csv(str(tmp_path / "candles" / "BTCINR_5m.csv")) == 5
+    assert list(archive.column("close")) == [1.5, 1.5, 1.5, 1.5, 2.5]
+    assert archive.column("volume")[-1] == 20.0
+    # importing again adds nothing
+    assert archive.import_csv(str(tmp_path / "candles" / "BTCINR_5m.csv")) == 0
+
+def test_sweeps_load_a_time_range_from_the_archive(tmp_path, monkeypatch):
+    root = str(tmp_path)
+    OhlcvArchive.for_pair("BTCINR", "5m", writable=True, root=root).append(*candles_from(0, 50))
+    assert OhlcvArchive.load("ETHINR", "5m", root=root) is None
+    assert OhlcvArchive.load("BTCINR", "5m", 60 * STEP, None, root=root) is None
+    assert len(OhlcvArchive.load("BTCINR", "5m", root=root)) == 50
+
+    prepared = {}
+    sweep = ParameterSweep()
+    monkeypatch.setattr(sweep, "prepare", prepared.update)
+    sweep.prepare_from_archive(["BTCINR", "ETHINR"], "5m", 10 * STEP, 40 * STEP, root=root)
+    assert list(prepared) == ["BTCINR"]
+    assert list(prepared["BTCINR"]["open"]) == [float(i) for i in range(10, 40)]
+
+def test_backtests_run_on_archived_candles(tmp_path, candles):
+    pytest.importorskip("pandas_ta")
+    from core.backtest import Backtester
+    from utils.technical_indicators import TechnicalIndicators
+
+    root = str(tmp_path)
+    times = ((candles.index - pd.Timestamp(0)) // pd.Timedelta(milliseconds=1)).to_numpy()
+    archive = OhlcvArchive.for_pair("BTCINR", "5m", writable=True, root=root)
+    archive.append(times, *(candles[name].to_numpy() for name in ("open", "high", "low", "close", "volume")))
+
+    backtester = Backtester()
+    assert backtester.run_archive("BTCINR", "5m", end_ms=0, root=root) is None
+    result = backtester.run_archive("BTCINR", "5m", root=root)
+    expected = backtester.run(TechnicalIndicators.calculate(candles.astype("float64")))
+    assert result.stats == expected.stats
+    pd.testing.assert_frame_equal(result.trades, expected.trades, check_index_type=False)
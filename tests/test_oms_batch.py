@@ -0,0 +1,150 @@
+import json
+import threading
+import pytest
+from core.OMS import BATCH_REJECTED_STATUSES, OrderManagementSystem
+from utils.request_signer import RequestSigner
+
+class _Response:
+
+    def __init__(self, status_code, body):
+        self.status_code = status_code
+        self.body = body
+        self.text = json.dumps(body)
+
+    def json(self):
+        return self.body
+
+class _ExchangeClient:
+
+    # stands in for HttpClient: answers signed requests from per-endpoint handlers and records them
+    # a handler returns (status, body) or raises, like a request that timed out
+
+    def __init__(self, **handlers):
+        self.handlers = handlers
+        self.sent = []
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def url(path, public=False):
+        return f"https://exchange.test{path}"
+
+    def request(self, method, path, headers=None, data=None, **kwargs):
+        payload = json.loads(data)
+        payload.pop("timestamp", None)
+        endpoint = path.rsplit("/", 1)[1]
+        with self._lock:
+            self.sent.append((endpoint, payload))
+        status, body = self.handlers.get(endpoint, _default)(payload)
+        return _Response(status, body)
+
+    def endpoints(self):
+        return [endpoint for endpoint, _ in self.sent]
+
+def _default(payload):
+    if "total_quantity" in payload:
+        # single creates run concurrently; the leg number keeps the ids predictable (ex_1 for leg 0)
+        leg = int(payload["client_order_id"].rsplit("_", 1)[1])
+        return 200, {"orders": [{"id": f"ex_{leg + 1}", "status": "open"}]}
+    return 200, {"status": "SUCCESS"}
+
+def _oms(client):
+    return OrderManagementSystem(http_client=client, signer=RequestSigner(api_key="key", api_secret="secret"))
+
+SPECS = [
+    {"market": "BTCINR", "side": "buy", "order_type": "limit_order", "total_quantity": 0.01, "price_per_unit": 100.0},
+    {"market": "ETHINR", "side": "sell", "order_type": "limit_order", "total_quantity": 0.5, "price_per_unit": 50.0},
+    {"market": "BTCINR", "side": "sell", "order_type": "limit_order", "total_quantity": 0.02, "price_per_unit": 110.0},
+]
+
+def test_batch_legs_are_matched_by_client_order_id():
+    def create_multiple(payload):
+        # acknowledged out of order, the second leg rejected
+        legs = payload["orders"]
+        return 200, {"orders": [{"id": "ex_c", "status": "open", "client_order_id": legs[2]["client_order_id"]},
+                                {"id": "ex_a", "status": "open", "client_order_id": legs[0]["client_order_id"]}]}
+
+    client = _ExchangeClient(create_multiple=create_multiple)
+    oms = _oms(client)
+    results = oms.place_orders(SPECS)
+
+    assert client.endpoints() == ["create_multiple"]
+    assert [result.order.order_id if result.ok else None for result in results] == ["ex_a", None, "ex_c"]
+    assert results[1].error == "order not acknowledged"
+    client_ids = [payload["client_order_id"] for payload in client.sent[0][1]["orders"]]
+    assert len(set(client_ids)) == 3
+    assert set(oms.orders_by_market) == {"BTCINR"}
+    assert set(oms.orders_by_market["BTCINR"]) == {"ex_a", "ex_c"}
+    assert set(oms.orders_by_status["OPEN"]) == {"ex_a", "ex_c"}
+
+@pytest.mark.parametrize("status", BATCH_REJECTED_STATUSES)
+def test_rejected_batches_fall_back_to_single_orders(status):
+    client = _ExchangeClient(create_multiple=lambda payload: (status, {"message": "rejected"}))
+    oms = _oms(client)
+    results = oms.place_orders(SPECS)
+
+    assert sorted(client.endpoints()) == ["create", "create", "create", "create_multiple"]
+    assert all(result.ok for result in results)
+    assert len(oms.active_orders) == 3
+    # a missing endpoint is not tried again; a rejected payload is
+    assert oms.multi_order_endpoints == (status not in (404, 405))
+
+def _timeout(payload):
+    raise TimeoutError("read timed out")
+
+@pytest.mark.parametrize("handler", [lambda payload: (502, {"message": "bad gateway"}), _timeout])
+def test_batches_that_may_have_reached_the_exchange_are_not_resent(handler):
+    client = _ExchangeClient(create_multiple=handler)
+    oms = _oms(client)
+    results = oms.place_orders(SPECS)
+
+    assert client.endpoints() == ["create_multiple"]
+    assert not any(result.ok for result in results)
+    assert all(result.error.startswith("batch request failed") for result in results)
+    assert oms.active_orders == {} and oms.orders_by_market == {} and oms.orders_by_status == {}
+    assert oms.multi_order_endpoints
+
+def test_cancel_orders_falls_back_to_single_cancels():
+    def cancel(payload):
+        return (200, {"status": "SUCCESS"}) if payload["order_id"] != "ex_2" else (400, {"message": "unknown"})
+
+    client = _ExchangeClient(cancel_by_ids=lambda payload: (404, {}), cancel=cancel)
+    oms = _oms(client)
+    oms.multi_order_endpoints = False
+    oms.place_orders(SPECS)
+    oms.multi_order_endpoints = True
+
+    assert oms.cancel_orders(["ex_1", "ex_2", "ex_3"]) == {"ex_1": True, "ex_2": False, "ex_3": True}
+    assert client.endpoints()[3:].count("cancel") == 3
+    assert not oms.multi_order_endpoints
+    assert set(oms.active_orders) == {"ex_2"}
+    assert oms.orders_by_market == {"ETHINR": {"ex_2": oms.active_orders["ex_2"]}}
+    assert set(oms.orders_by_status) == {"OPEN"}
+    assert {order.order_id: order.status for order in oms.order_history} == {"ex_1": "CANCELLED",
+                                                                             "ex_3": "CANCELLED"}
+
+def test_batch_cancel_closes_every_order():
+    client = _ExchangeClient()
+    oms = _oms(client)
+    oms.multi_order_endpoints = False
+    oms.place_orders(SPECS)
+    oms.multi_order_endpoints = True
+
+    assert oms.cancel_orders(["ex_1", "ex_3"]) == {"ex_1": True, "ex_3": True}
+    assert client.sent[-1] == ("cancel_by_ids", {"ids": ["ex_1", "ex_3"]})
+    assert list(oms.orders_by_market) == ["ETHINR"]
+
+def test_cancel_all_updates_the_indexes():
+    client = _ExchangeClient(cancel_all=lambda payload: (200, {"message": "ok"}))
+    oms = _oms(client)
+    oms.multi_order_endpoints = False
+    oms.place_orders(SPECS)
+
+    # one side of one market
+    assert oms.cancel_all("BTCINR", side="sell") == {"BTCINR": True}
+    assert client.sent[-1] == ("cancel_all", {"market": "BTCINR", "side": "sell"})
+    assert [order.order_id for order in oms.orders_for_market("BTCINR")] == ["ex_1"]
+
+    # every market with tracked orders, one request each
+    assert oms.cancel_all() == {"BTCINR": True, "ETHINR": True}
+    assert oms.active_orders == {} and oms.orders_by_market == {} and oms.orders_by_status == {}
+    assert sorted(order.order_id for order in oms.order_history) == ["ex_1", "ex_2", "ex_3"]
@@ -0,0 +1,89 @@
+import core.trading_logic
+from core.OMS import Order, OrderManagementSystem
+from core.order_reconciler import OrderReconciler
+from core.trading_logic import TradingLogic
+
+class FakeExchange:
+
+    # active_orders and trade_history over an in-memory list of trades, recording every request
+
+    def __init__(self, trades, active=()):
+        self.trades = list(trades)
+        self.active = list(active)
+        self.requests = []
+
+    def fetch_active_orders(self, market=None):
+        self.requests.append(("active_orders",))
+        return list(self.active)
+
+    def fetch_trade_history(self, market=None, from_id=None, limit=500, sort="asc"):
+        self.requests.append(("trade_history", from_id, limit, sort))
+        trades = sorted(self.trades, key=lambda trade: trade["id"], reverse=sort == "desc")
+        if from_id is not None:
+            trades = [trade for trade in trades if trade["id"] >= from_id]
+        return trades[:limit]
+
+def trade(trade_id, order_id, quantity=1.0, price=100.0):
+    return {"id": trade_id, "order_id": order_id, "quantity": quantity, "price": price}
+
+def exchange_oms(monkeypatch, exchange, orders):
+    oms = OrderManagementSystem()
+    monkeypatch.setattr(oms, "fetch_active_orders", exchange.fetch_active_orders)
+    monkeypatch.setattr(oms, "fetch_trade_history", exchange.fetch_trade_history)
+    oms.apply_reconciliation([], orders, [])
+    return oms
+
+def order(order_id, total_quantity):
+    return Order(order_id=order_id, market="BTCINR", side="buy", order_type="limit_order", status="open",
+                 price_per_unit=100.0, total_quantity=total_quantity, filled_quantity=0.0,
+                 remaining_quantity=total_quantity, avg_price=0.0, fee=0.0, timestamp=0)
+
+def test_first_cycle_reads_the_newest_page_then_pages_forward(monkeypatch):
+    exchange = FakeExchange([trade(i, "old") for i in range(1, 8)])
+    oms = exchange_oms(monkeypatch, exchange, [])
+    reconciler = OrderReconciler(oms, grace=0.0, history_limit=3)
+
+    reconciler.reconcile()
+    # the newest trades place the cursor; nothing older is read
+    assert exchange.requests == [("active_orders",), ("trade_history", None, 3, "desc")]
+    assert reconciler._last_trade_id == 7
+
+    # more than a page of trades arrived since: read oldest first until a short page
+    exchange.trades += [trade(i, "filled", quantity=0.5) for i in range(8, 15)]
+    exchange.requests.clear()
+    reconciler.reconcile()
+    assert exchange.requests == [("active_orders",), ("trade_history", 8, 3, "asc"),
+                                 ("trade_history", 11, 3, "asc"), ("trade_history", 14, 3, "asc")]
+    assert reconciler._traded["filled"][0] == 3.5
+    assert reconciler.requests == 2 + 4
+
+def test_missing_orders_are_closed_from_the_trades(monkeypatch):
+    active = [{"id": order_id, "market": "BTCINR", "status": "open", "total_quantity": quantity,
+               "remaining_quantity": quantity} for order_id, quantity in (("filled", 1.0), ("cancelled", 2.0))]
+    exchange = FakeExchange([trade(1, "before")], active)
+    oms = exchange_oms(monkeypatch, exchange, [order("filled", 1.0), order("cancelled", 2.0)])
+    reconciler = OrderReconciler(oms, grace=0.0)
+    assert reconciler.reconcile() == []
+
+    # both leave the active list; the trades tell a fill from a cancel
+    exchange.active = []
+    exchange.trades += [trade(2, "filled", quantity=0.4, price=100.0), trade(3, "filled", quantity=0.6, price=105.0),
+                        trade(4, "cancelled", quantity=0.5)]
+    events = {event.order.order_id: event for event in reconciler.reconcile()}
+
+    assert (events["filled"].kind, events["cancelled"].kind) == ("fill", "cancel")
+    assert events["cancelled"].filled_delta == 0.5
+    assert oms.snapshot_orders() == {}
+    closed = {closed_order.order_id: closed_order for closed_order in oms.order_history}
+    assert (closed["filled"].status, closed["cancelled"].status) == ("COMPLETED", "CANCELLED")
+    assert closed["filled"].avg_price == 0.4 * 100.0 + 0.6 * 105.0
+
+def test_trading_logic_wires_the_reconciler(monkeypatch):
+    trading_logic = TradingLogic()
+    assert trading_logic.reconciler.oms is trading_logic.oms
+    assert trading_logic.reconciler._handlers == [trading_logic.on_order_event]
+    # not started until the first order goes through
+    assert trading_logic.reconciler._thread is None
+
+    monkeypatch.setattr(core.trading_logic, "ORDER_RECONCILER_ENABLED", False)
+    assert TradingLogic().reconciler is None
@@ -0,0 +1,100 @@
+import os
+import pytest
+import paper_trading
+from config.settings import EXIT_TRACE_FILE
+from core.position_manager import PositionManager
+from utils.exit_traces import ExitTraceStore
+from utils.http_client import HttpClient
+from utils.price_feed import PriceReplayServer, StreamingPriceFeed
+from utils.tick_store import TickWriter
+
+MARKET_DETAILS = {"symbol": "BTCINR", "pair": "I-BTC_INR", "step": 0.0001, "target_currency_precision": 4,
+                  "min_quantity": 0.0001, "max_quantity": 1_000_000.0}
+
+# entry at 100; the high of 101 lifts the 0.5% trailing stop to 100.495, which 100.4 crosses
+# the 40 s gap before the exit is longer than the monitor's timeout, so the replay reports missed updates
+TICKS = [(1_700_000_000.0, 100.0), (1_700_000_005.0, 100.5), (1_700_000_010.0, 101.0),
+         (1_700_000_015.0, 100.7), (1_700_000_055.0, 100.4), (1_700_000_060.0, 99.0)]
+
+@pytest.fixture
+def no_http(monkeypatch):
+    calls = []
+
+    def request(self, method, path, *args, **kwargs):
+        calls.append((method, path))
+        raise AssertionError(f"unexpected HTTP request: {method} {path}")
+
+    monkeypatch.setattr(HttpClient, "request", request)
+    return calls
+
+@pytest.fixture
+def tick_file(tmp_path):
+    path = str(tmp_path / "btc.ticks")
+    writer = TickWriter(path)
+    for timestamp, price in TICKS:
+        writer.write("BTCINR", price, timestamp)
+        # another pair in the same file must not leak into the BTCINR replay
+        writer.write("ETHINR", price / 2, timestamp)
+    writer.close()
+    return path
+
+def exit_traces(logs_folder):
+    return ExitTraceStore(os.path.join(str(logs_folder), EXIT_TRACE_FILE)).traces()
+
+def test_replay_exits_on_trailing_stop_without_network(logs_folder, tick_file, no_http):
+    paper_oms = paper_trading.replay_paper_trade(tick_file, "BTCINR", 1000.0, market_details=MARKET_DETAILS)
+
+    buy, sell = paper_oms.order_history
+    assert (buy.side, buy.avg_price) == ("buy", 100.0)
+    assert (sell.side, sell.avg_price, sell.total_quantity) == ("sell", 100.4, buy.total_quantity)
+    # fills carry the virtual time of the tick that caused them
+    assert sell.timestamp == int(TICKS[4][0] * 1000)
+    trace, = exit_traces(logs_folder)
+    assert trace.reason == PositionManager.EXIT_TRAILING_STOP
+    assert trace.trigger_price == pytest.approx(101.0 * 0.995)
+    assert trace.paper
+    # the paper position is numbered after its buy order
+    assert (buy.order_id, trace.position_id) == ("PAPER_ORDER_1", 1)
+    assert no_http == []
+
+def test_replay_matches_real_time_mode(logs_folder, tick_file, no_http):
+    replayed = paper_trading.replay_paper_trade(tick_file, "BTCINR", 1000.0, market_details=MARKET_DETAILS)
+
+    # the same prices pushed through the live streaming feed on the system clock
+    server = PriceReplayServer([{"market": "BTCINR", "last_price": repr(price)} for _, price in TICKS[1:]]).start()
+    feed = StreamingPriceFeed(host=server.host, port=server.port, poll_interval=0.05, reconnect_delay=0.5)
+    feed._publish_snapshot = lambda: {}
+    live = paper_trading.PaperTradingOMS(initial_balance=1000.0)
+    try:
+        quantity, risk = paper_trading.enter_paper_position(live, "BTCINR", 1000.0, TICKS[0][1], MARKET_DETAILS)
+        paper_trading.simulate_monitor_position(
+            "BTCINR", TICKS[0][1], quantity, initial_stop_loss=risk["stop_loss_price"],
+            take_profit_price=risk["take_profit_price"], paper_oms=live, investment_amount=1000.0,
+            trailing_stop_percentage=0.005, polling_interval=5, price_feed=feed)
+    finally:
+        feed.stop()
+        server.stop()
+
+    assert [(order.side, order.avg_price, order.total_quantity) for order in replayed.order_history] == \
+        [(order.side, order.avg_price, order.total_quantity) for order in live.order_history]
+    assert replayed.wallet_balance == pytest.approx(live.wallet_balance)
+    replay_trace, live_trace = exit_traces(logs_folder)
+    assert (replay_trace.reason, replay_trace.trigger_price) == (live_trace.reason, live_trace.trigger_price)
+    assert no_http == []
+
+def test_paper_exit_traces_number_each_position(logs_folder, no_http):
+    # two positions on one paper account: each exit trace carries its own position's id
+    paper_oms = paper_trading.PaperTradingOMS(initial_balance=1000.0)
+    for _ in range(2):
+        server = PriceReplayServer([{"market": "BTCINR", "last_price": "102.0"}]).start()
+        feed = StreamingPriceFeed(host=server.host, port=server.port, poll_interval=0.05, reconnect_delay=0.5)
+        feed._publish_snapshot = lambda: {}
+        paper_oms.place_market_order(market="BTCINR", side="buy", total_quantity=1.0, execution_price=100.0)
+        try:
+            paper_trading.simulate_monitor_position(
+                "BTCINR", 100.0, 1.0, initial_stop_loss=99.0, take_profit_price=101.0, paper_oms=paper_oms,
+                investment_amount=100.0, polling_interval=1, price_feed=feed)
+        finally:
+            feed.stop()
+            server.stop()
+    assert [trace.position_id for trace in exit_traces(logs_folder)] == [1, 3]
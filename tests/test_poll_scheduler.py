@@ -0,0 +1,110 @@
+import asyncio
+import pytest
+from core.async_runner import AsyncTradingRunner
+from core.poll_scheduler import AdaptivePollScheduler
+from core.position_manager import PositionManager
+from core.trading_logic import TradingLogic
+from utils.clock import VirtualClock
+from utils.historical_data import HistoricalData
+from utils.incremental_indicators import IncrementalIndicators
+
+def scheduler_with(*positions, clock=None):
+    # positions: (pair, stop-loss, take-profit); no trailing stop so the distances stay put
+    manager = PositionManager()
+    for trading_pair, stop_loss_price, take_profit_price in positions:
+        manager.open(trading_pair, 100.0, 1.0, stop_loss_price, take_profit_price, 100.0,
+                     trailing_stop_percentage=None)
+    return AdaptivePollScheduler(manager, min_interval=1.0, max_interval=30.0, safety=0.25,
+                                 baseline_interval=5.0, candle_seconds=300.0, clock=clock or VirtualClock(0.0))
+
+def test_interval_for_stays_within_bounds():
+    scheduler = scheduler_with(("BTCINR", 90.0, 110.0))
+    # no open position: nothing to watch closely
+    assert scheduler.interval_for("ETHINR", 100.0) == 30.0
+    # no ATR yet: the fixed baseline
+    assert scheduler.interval_for("BTCINR", 100.0) == 5.0
+
+    scheduler.set_atr("BTCINR", 1.0)
+    # 10 ATRs from the nearest exit: capped at the maximum
+    assert scheduler.interval_for("BTCINR", 100.0) == 30.0
+    # at or past an exit level: the minimum
+    assert scheduler.interval_for("BTCINR", 90.0) == 1.0
+    assert scheduler.interval_for("BTCINR", 111.0) == 1.0
+    # 0.5 ATR away: 0.25 * 300 s * 0.5 ** 2 (the random-walk regime)
+    assert scheduler.interval_for("BTCINR", 90.5) == pytest.approx(18.75)
+    # NaN (too few candles) clears the ATR again
+    scheduler.set_atr("BTCINR", float("nan"))
+    assert scheduler.interval_for("BTCINR", 90.5) == 5.0
+
+def test_next_interval_takes_the_tightest_pair():
+    clock = VirtualClock(0.0)
+    scheduler = scheduler_with(("BTCINR", 90.0, 110.0), ("ETHINR", 99.5, 110.0), clock=clock)
+    scheduler.set_atr("BTCINR", 1.0)
+    scheduler.set_atr("ETHINR", 1.0)
+
+    # ETHINR is 0.3 ATR from its stop: 0.25 * 300 * 0.09
+    assert scheduler.next_interval({"BTCINR": 100.0, "ETHINR": 99.8}) == pytest.approx(6.75)
+    # a pair missing from the poll does not set the interval
+    assert scheduler.next_interval({"BTCINR": 100.0}) == 30.0
+    # a pair without an open position is ignored
+    assert scheduler.next_interval({"BTCINR": 100.0, "XRPINR": 1.0}) == 30.0
+    assert scheduler.polls == 3
+
+def test_trigger_delay_and_saved_requests():
+    clock = VirtualClock(0.0)
+    scheduler = scheduler_with(("BTCINR", 90.0, 110.0), clock=clock)
+    scheduler.set_atr("BTCINR", 1.0)
+    for _ in range(4):
+        clock.sleep(scheduler.next_interval({"BTCINR": 100.0}))
+    # the exit fired on a poll 30 s after the previous one
+    scheduler.next_interval({"BTCINR": 100.0})
+    clock.sleep(12.0)
+    scheduler.record_trigger("BTCINR")
+
+    stats = scheduler.stats()
+    # 120 s monitored in 5 polls, where a fixed 5 s interval would have polled 1 + 120 / 5 times
+    assert (stats["polls"], stats["baseline_polls"], stats["saved_requests"]) == (5, 25, 20)
+    assert stats["avg_interval"] == pytest.approx(24.0)
+    assert (stats["triggers"], stats["worst_trigger_delay"]) == (1, 12.0)
+
+    # a poll with no open positions ends the stretch: the idle time is not counted
+    clock.sleep(1000.0)
+    assert scheduler.next_interval({}) == 30.0
+    assert scheduler.stats()["baseline_polls"] == 25
+
+def test_positions_seed_the_atr_from_stored_candles(monkeypatch, candles):
+    monkeypatch.setattr(HistoricalData, "load", staticmethod(lambda trading_pair: candles))
+    expected = IncrementalIndicators()
+    expected.update_from_frame(candles)
+
+    trading_logic = TradingLogic()
+    monkeypatch.setattr(trading_logic.positions, "price_feed", None)
+    monkeypatch.setattr(trading_logic.positions, "wait_closed", lambda position: True)
+    reports = []
+    monkeypatch.setattr(trading_logic.poll_scheduler, "report", lambda: reports.append(True))
+    trading_logic.poll_scheduler.polls = 1
+
+    assert trading_logic.monitor_position("BTCINR", 100.0, 1.0, 99.0, 101.5, 100.0, 1000.0)
+    assert trading_logic.poll_scheduler._atr["BTCINR"] == expected.latest["ATR"]
+    # the polling report is printed when monitoring ends
+    assert reports == [True]
+
+def test_runner_scans_refresh_the_atr(monkeypatch, candles):
+    trading_logic = TradingLogic()
+    runner = AsyncTradingRunner(["BTCINR"], 1000.0, trading_logic=trading_logic)
+    assert runner.engines is trading_logic.indicator_engines
+    monkeypatch.setattr(HistoricalData, "fetch", staticmethod(lambda trading_pair: candles.iloc[:300]))
+    runner._evaluate("BTCINR")
+    first = trading_logic.poll_scheduler._atr["BTCINR"]
+
+    monkeypatch.setattr(HistoricalData, "fetch", staticmethod(lambda trading_pair: candles))
+    runner._evaluate("BTCINR")
+    assert trading_logic.poll_scheduler._atr["BTCINR"] == runner.engines["BTCINR"].latest["ATR"] != first
+
+    # the runner prints the polling report when it stops
+    reports = []
+    monkeypatch.setattr(trading_logic, "report_polling", lambda: reports.append(True))
+    monkeypatch.setattr(runner, "run_cycle", lambda: asyncio.sleep(0))
+    runner.cycle_interval = 0
+    asyncio.run(runner.run(cycles=1))
+    assert reports == [True]
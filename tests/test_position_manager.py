@@ -0,0 +1,133 @@
+import threading
+import time
+import pytest
+from core.position_manager import PositionManager
+
+class RecordingFeed:
+
+    # records subscriptions instead of streaming prices
+
+    def __init__(self):
+        self.calls = []
+
+    def subscribe(self, trading_pair, callback):
+        self.calls.append(("subscribe", trading_pair))
+
+    def unsubscribe(self, trading_pair, callback):
+        self.calls.append(("unsubscribe", trading_pair))
+
+def open_position(manager, trading_pair="BTCINR", stop_loss_price=95.0, take_profit_price=110.0,
+                  trailing_stop_percentage=0.05):
+    return manager.open(trading_pair, 100.0, 1.0, stop_loss_price, take_profit_price, 100.0,
+                        trailing_stop_percentage=trailing_stop_percentage)
+
+def reasons(manager, prices):
+    # the exit reason each price triggers (None when it triggers nothing); positions stay taken
+    return [[exit_.reason for exit_ in manager.evaluate("BTCINR", price)] or None for price in prices]
+
+def test_exit_precedence_and_trailing_ratchet():
+    manager = PositionManager()
+    position = open_position(manager)
+    # the trailing stop follows the highest price up and never back down
+    assert reasons(manager, [104.0, 106.0, 103.0]) == [None, None, None]
+    assert position.highest_price == 106.0
+    assert position.trailing_stop_price == pytest.approx(100.7)
+    exit_, = manager.evaluate("BTCINR", 100.5)
+    assert (exit_.reason, exit_.trigger_price) == (PositionManager.EXIT_TRAILING_STOP, pytest.approx(100.7))
+
+    # below both stops: the static stop wins
+    manager = PositionManager()
+    open_position(manager)
+    manager.evaluate("BTCINR", 106.0)
+    exit_, = manager.evaluate("BTCINR", 94.0)
+    assert (exit_.reason, exit_.trigger_price) == (PositionManager.EXIT_STOP_LOSS, 95.0)
+
+    # a jump to the target is a take-profit, not a trailing stop below the new high
+    manager = PositionManager()
+    open_position(manager)
+    exit_, = manager.evaluate("BTCINR", 111.0)
+    assert (exit_.reason, exit_.trigger_price) == (PositionManager.EXIT_TAKE_PROFIT, 110.0)
+
+    # without a trailing stop only the static levels apply
+    manager = PositionManager()
+    position = open_position(manager, trailing_stop_percentage=None)
+    assert reasons(manager, [108.0, 96.0]) == [None, None]
+    assert position.trailing_stop_price is None
+
+def test_racing_price_updates_exit_once():
+    sold = []
+
+    def exit_handler(exit_):
+        sold.append(exit_.position.position_id)
+        time.sleep(0.01)
+        return True
+
+    for _ in range(20):
+        sold.clear()
+        manager = PositionManager(exit_handler)
+        position = open_position(manager)
+        barrier = threading.Barrier(4)
+
+        def tick():
+            barrier.wait()
+            manager.on_price("BTCINR", 90.0, time.time())
+
+        threads = [threading.Thread(target=tick) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert sold == [position.position_id]
+        assert len(manager) == 0
+
+@pytest.mark.parametrize("failure", ["rejected", "raised"])
+def test_failed_sell_returns_the_position(failure):
+    attempts = []
+
+    def exit_handler(exit_):
+        attempts.append(exit_.price)
+        if len(attempts) == 1:
+            if failure == "raised":
+                raise RuntimeError("exchange down")
+            return False
+        return True
+
+    manager = PositionManager(exit_handler)
+    position = open_position(manager)
+    manager.on_price("BTCINR", 94.0, time.time())
+    assert manager.positions("BTCINR") == [position]
+    assert not position.closed.is_set()
+
+    # the next tick tries again
+    manager.on_price("BTCINR", 93.5, time.time())
+    assert attempts == [94.0, 93.5]
+    assert manager.positions() == [] and position.closed.is_set()
+
+def test_wait_closed_and_unsubscribe_after_the_last_position():
+    feed = RecordingFeed()
+    manager = PositionManager(lambda exit_: True, feed)
+    first = open_position(manager, stop_loss_price=95.0, trailing_stop_percentage=None)
+    second = open_position(manager, stop_loss_price=90.0, trailing_stop_percentage=None)
+    assert feed.calls == [("subscribe", "BTCINR")]
+
+    waited = []
+    waiter = threading.Thread(target=lambda: waited.append(manager.wait_closed(second, timeout=5.0)))
+    waiter.start()
+    assert not manager.wait_closed(first, timeout=0.01)
+
+    # the first position exits; the pair still has the second one
+    manager.on_price("BTCINR", 94.0, time.time())
+    assert manager.wait_closed(first, timeout=0)
+    assert feed.calls == [("subscribe", "BTCINR")]
+
+    manager.on_price("BTCINR", 89.0, time.time())
+    waiter.join(5.0)
+    assert waited == [True]
+    assert feed.calls == [("subscribe", "BTCINR"), ("unsubscribe", "BTCINR")]
+
+    # a sell signal takes every position of a pair at once
+    manager = PositionManager(lambda exit_: True, RecordingFeed())
+    positions = [open_position(manager), open_position(manager)]
+    manager.dispatch(manager.exit_pair("BTCINR", 101.0))
+    assert all(position.closed.is_set() for position in positions)
+    assert manager.price_feed.calls[-1] == ("unsubscribe", "BTCINR")
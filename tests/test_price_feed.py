@@ -0,0 +1,92 @@
+import threading
+import time
+import pytest
+import paper_trading
+from utils.price_feed import PriceFeed, PriceReplayServer, StreamingPriceFeed
+
+RECORDED = [
+    {"market": "BTCINR", "last_price": "100.0"},
+    {"market": "ETHINR", "last_price": "50.0"},
+    [{"market": "BTCINR", "last_price": "101.5"}, {"market": "ETHINR", "last_price": "49.5"}],
+    {"market": "BTCINR"},                                   # no price: ignored
+    {"market": "BTCINR", "last_price": "99.25"},
+]
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError("timed out")
+        time.sleep(0.01)
+
+def streaming_feed(server):
+    feed = StreamingPriceFeed(host=server.host, port=server.port, poll_interval=0.05, reconnect_delay=0.5)
+    # the REST fallback after the recording ends must not reach the network
+    feed._publish_snapshot = lambda: {}
+    return feed
+
+def test_price_feed_is_abstract():
+    with pytest.raises(TypeError):
+        PriceFeed()
+
+def test_stream_delivers_recorded_prices_to_subscribers():
+    server = PriceReplayServer(RECORDED).start()
+    feed = streaming_feed(server)
+    received = {"BTCINR": [], "ETHINR": []}
+    lock = threading.Lock()
+
+    def callback(pair, price, timestamp):
+        with lock:
+            received[pair].append(price)
+
+    try:
+        feed.subscribe("BTCINR", callback)
+        feed.subscribe("ETHINR", callback)
+        wait_for(lambda: len(received["BTCINR"]) == 3 and len(received["ETHINR"]) == 2)
+    finally:
+        feed.stop()
+        server.stop()
+    assert received == {"BTCINR": [100.0, 101.5, 99.25], "ETHINR": [50.0, 49.5]}
+
+def test_monitoring_stops_the_feed_it_created(monkeypatch, logs_folder):
+    # take-profit at 101.5 on the replayed stream; the feed built inside the monitor is stopped afterwards
+    server = PriceReplayServer(RECORDED).start()
+    feeds = []
+
+    def create_price_feed(poll_interval):
+        feeds.append(streaming_feed(server))
+        return feeds[-1]
+
+    monkeypatch.setattr(paper_trading, "create_price_feed", create_price_feed)
+    paper_oms = paper_trading.PaperTradingOMS(initial_balance=1000.0)
+    try:
+        sell_order = paper_trading.simulate_monitor_position(
+            "BTCINR", 100.0, 1.0, initial_stop_loss=99.0, take_profit_price=101.0, paper_oms=paper_oms,
+            investment_amount=100.0, polling_interval=1)
+    finally:
+        server.stop()
+    assert sell_order.avg_price == 101.5
+    feed, = feeds
+    assert feed._stop_event.is_set()
+    assert feed.subscribed_pairs() == []
+
+def test_monitoring_unsubscribes_when_the_sell_fails(monkeypatch, logs_folder):
+    server = PriceReplayServer(RECORDED).start()
+    feed = streaming_feed(server)
+    paper_oms = paper_trading.PaperTradingOMS(initial_balance=1000.0)
+
+    def broken_sell(**kwargs):
+        raise RuntimeError("exchange down")
+
+    monkeypatch.setattr(paper_oms, "place_market_order", broken_sell)
+    try:
+        with pytest.raises(RuntimeError):
+            paper_trading.simulate_monitor_position(
+                "BTCINR", 100.0, 1.0, initial_stop_loss=99.0, take_profit_price=101.0, paper_oms=paper_oms,
+                investment_amount=100.0, polling_interval=1, price_feed=feed)
+        assert feed.subscribed_pairs() == []
+        # a feed passed in by the caller stays the caller's to stop
+        assert not feed._stop_event.is_set()
+    finally:
+        feed.stop()
+        server.stop()
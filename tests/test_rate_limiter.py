@@ -0,0 +1,66 @@
+import threading
+import time
+import pytest
+from utils.rate_limiter import RequestScheduler, TokenBucket
+
+def test_token_bucket_refills_at_its_rate():
+    bucket = TokenBucket(rate=4.0, burst=2.0)
+    bucket.updated = 100.0
+    bucket.tokens = 0.0
+    assert not bucket.ready(100.0)
+    assert bucket.wait_time(100.0) == pytest.approx(0.25)
+
+    bucket.refill(100.125)
+    assert bucket.tokens == pytest.approx(0.5)
+    assert bucket.wait_time(100.125) == pytest.approx(0.125)
+    bucket.refill(100.25)
+    assert bucket.ready(100.25)
+    # never more than the burst, however long it sat idle
+    bucket.refill(200.0)
+    assert bucket.tokens == 2.0
+
+    # a 429 block outlasts the tokens
+    bucket.blocked_until = 203.0
+    assert not bucket.ready(200.0)
+    assert bucket.wait_time(200.0) == 3.0
+
+def test_scheduler_spaces_requests_once_the_burst_is_spent():
+    scheduler = RequestScheduler(limits={"ticker": (20.0, 2.0)}, global_limit=None)
+    assert scheduler.acquire("ticker") < 0.01
+    assert scheduler.acquire("ticker") < 0.01
+    # one token every 50 ms from here on
+    waited = scheduler.acquire("ticker")
+    assert 0.03 <= waited < 0.5
+    with pytest.raises(TimeoutError):
+        scheduler.acquire("ticker", timeout=0.0)
+
+    stats = scheduler.metrics()["ticker"]
+    assert (stats["granted"], stats["waited"]) == (3, 1)
+
+def test_orders_are_served_before_queued_order_queries():
+    scheduler = RequestScheduler(limits={"orders": (100.0, 100.0), "order_queries": (100.0, 100.0)},
+                                 global_limit=(5.0, 1.0))
+    with scheduler._condition:
+        # the shared budget is spent: the next token comes in 0.4 s
+        scheduler.global_bucket.refill(time.monotonic())
+        scheduler.global_bucket.tokens = -1.0
+    served = []
+
+    def request(endpoint_class):
+        scheduler.acquire(endpoint_class, timeout=5.0)
+        served.append(endpoint_class)
+
+    def start(endpoint_class, depth):
+        thread = threading.Thread(target=request, args=(endpoint_class,))
+        thread.start()
+        while sum(scheduler.queue_depth().values()) < depth:
+            time.sleep(0.001)
+        return thread
+
+    threads = [start("order_queries", depth) for depth in (1, 2, 3)]
+    threads.append(start("orders", 4))
+    for thread in threads:
+        thread.join()
+
+    # the order arrived last but goes first; the queries keep their arrival order
+    assert served == ["orders", "order_queries", "order_queries", "order_queries"]
@@ -0,0 +1,72 @@
+import hashlib
+import hmac
+import math
+import pytest
+from core.OMS import OrderManagementSystem
+from utils.request_signer import RequestSigner
+
+# (secret, body, expected hex signature)
+#   RFC 4231 test case 2, and a payload with a quote and a None that the old str() signing mangled
+REFERENCE_SIGNATURES = [
+    (b"Jefe", b"what do ya want for nothing?",
+     "5bdcc146bf60754e6a042426089575c75a003f089d2739839dec58b964ec3843"),
+    (b"test-secret",
+     b'{"market":"BTCINR","side":"buy","order_type":"market_order","total_quantity":0.001,'
+     b'"client_order_id":"bot\'s order","stop_loss":null,"timestamp":1700000000000}',
+     "0ae4fd9c77be45b109e63937014880b1ea6b5bdab93cf9bc30df68791b9e9010"),
+]
+REFERENCE_PAYLOAD = {"market": "BTCINR", "side": "buy", "order_type": "market_order", "total_quantity": 0.001,
+                     "client_order_id": "bot's order", "stop_loss": None, "timestamp": 1700000000000}
+
+@pytest.mark.parametrize("secret, body, expected", REFERENCE_SIGNATURES)
+def test_reference_signatures(secret, body, expected):
+    signer = RequestSigner(api_key="key", api_secret=secret.decode("utf-8"))
+    assert signer.sign(body) == expected
+    # the pre-keyed HMAC is reusable
+    assert signer.sign(body) == expected
+
+def test_canonical_body_keeps_key_order_and_json_values():
+    assert RequestSigner.canonical_body(dict(REFERENCE_PAYLOAD)) == REFERENCE_SIGNATURES[1][1]
+
+@pytest.mark.parametrize("value", [math.nan, math.inf, -math.inf])
+def test_non_finite_numbers_are_rejected(value):
+    signer = RequestSigner(api_key="key", api_secret="secret")
+    with pytest.raises(ValueError):
+        signer.sign_payload({"market": "BTCINR", "total_quantity": value, "timestamp": 1700000000000})
+
+class _Response:
+    status_code = 200
+
+    @staticmethod
+    def json():
+        return {"orders": []}
+
+class _RecordingClient:
+
+    # stands in for HttpClient and keeps what would have gone over the wire
+
+    def __init__(self):
+        self.sent = []
+
+    @staticmethod
+    def url(path, public=False):
+        return f"https://exchange.test{path}"
+
+    def request(self, method, path, headers=None, data=None, **kwargs):
+        self.sent.append((method, path, headers, data))
+        return _Response()
+
+def test_send_signed_sends_the_signed_bytes():
+    client = _RecordingClient()
+    signer = RequestSigner(api_key="test-key", api_secret="test-secret")
+    oms = OrderManagementSystem(http_client=client, signer=signer)
+
+    status, _ = oms._send_signed("/exchange/v1/orders/create", dict(REFERENCE_PAYLOAD))
+
+    assert status == 200
+    (method, path, headers, body), = client.sent
+    assert (method, path) == ("POST", "/exchange/v1/orders/create")
+    assert body == REFERENCE_SIGNATURES[1][1]
+    assert headers["X-AUTH-APIKEY"] == "test-key"
+    assert headers["X-AUTH-SIGNATURE"] == REFERENCE_SIGNATURES[1][2]
+    assert headers["X-AUTH-SIGNATURE"] == hmac.new(b"test-secret", body, hashlib.sha256).hexdigest()
@@ -0,0 +1,136 @@
+import numpy as np
+import pandas as pd
+import pytest
+from config.settings import SIGNAL_RULES
+from core.signal_generator import SignalGenerator
+from core.signal_rules import SignalRules
+from core.trading_logic import TradingLogic
+
+NAN = np.nan
+
+def evaluate(rule, **columns):
+    values = {name: np.asarray(column, dtype=np.float64) for name, column in columns.items()}
+    return SignalRules({"signal": rule}).evaluate(values)["signal"].tolist()
+
+@pytest.mark.parametrize("rule, expected", [
+    # and binds tighter than or
+    ("a > 0 or a < 0 and b > 0", [True, False, True]),
+    ("(a > 0 or a < 0) and b > 0", [True, False, False]),
+    # not binds tighter than and
+    ("not a > 0 and b > 0", [False, True, False]),
+    ("not (a > 0 and b > 0)", [False, True, True]),
+    # * before +, unary minus on a value
+    ("a + b * 2 == 3", [True, False, False]),
+    ("(a + b) * 2 == 4", [True, False, False]),
+    ("-a + b >= 0", [True, True, False]),
+    ("a - b - 1 == -1", [True, False, False]),
+])
+def test_operator_precedence(rule, expected):
+    assert evaluate(rule, a=[1, 0, 2], b=[1, 1, -1]) == expected
+
+def test_prev_and_crosses():
+    a = [1, 3, 2, 2, 4]
+    b = [2, 2, 2, 2, 2]
+    assert evaluate("a > prev(a)", a=a) == [False, True, False, False, True]
+    assert evaluate("a > prev(a, 2)", a=a) == [False, False, True, False, True]
+    assert evaluate("a crosses_above b", a=a, b=b) == [False, True, False, False, True]
+    assert evaluate("a crosses_below b", a=a, b=b) == [False, False, False, False, False]
+    assert SignalRules({"signal": "a crosses_above prev(b, 2)"}).lookback == 3
+
+def test_nan_comparisons_are_false():
+    a = [NAN, 1, NAN, 2]
+    b = [1, NAN, NAN, 1]
+    assert evaluate("a < b", a=a, b=b) == [False, False, False, False]
+    assert evaluate("a >= b", a=a, b=b) == [False, False, False, True]
+    assert evaluate("a != b", a=a, b=b) == [False, False, False, True]
+    # a bar before the first one is missing too
+    assert evaluate("a > prev(a)", a=[1, 2, NAN, 3]) == [False, True, False, False]
+    assert evaluate("a crosses_above b", a=[NAN, 2, 0, 2], b=[1, 1, 1, 1]) == [False, False, False, True]
+    # not negates the comparison's False, as ~(x < y) does in pandas
+    assert evaluate("not a < b", a=a, b=b) == [True, True, True, True]
+
+@pytest.mark.parametrize("rule, message", [
+    ("RSI <", "ended early"),
+    ("RSI < 30 and", "ended early"),
+    ("RSI =< 30", "Unexpected character"),
+    ("RSI 30", "Expected a comparison"),
+    ("RSI + 1", "Expected a comparison"),
+    ("(RSI < 30", "ended early"),
+    ("RSI < 30)", r"Unexpected '\)'"),
+    ("RSI < 30 adn close > 1", "Unexpected 'adn'"),
+    ("RSI < 30 and and close > 1", "Unexpected 'and'"),
+    ("3 < 4", "does not use any indicator"),
+    ("prev(RSI, 1.5) > 30", "whole number of bars"),
+    ("prev(RSI, 0) > 30", "whole number of bars"),
+    ("(RSI < 30) * 2 > 1", "takes values"),
+    ("not RSI", "Expected a comparison"),
+    ("RSI crosses_above (MACD > 1)", "takes values"),
+])
+def test_malformed_rules_raise(rule, message):
+    with pytest.raises(ValueError, match=message):
+        SignalRules({"signal": rule})
+
+def test_unknown_columns(signal_bars):
+    rules = SignalRules({"buy": "RSI < 30 and RSII > 1"})
+    assert rules.columns == ["RSI", "RSII"]
+    with pytest.raises(ValueError, match="unknown columns: RSII"):
+        rules.evaluate_frame(signal_bars)
+    with pytest.raises(ValueError, match="unknown columns: RSII"):
+        rules.evaluate_latest(signal_bars)
+    with pytest.raises(ValueError, match="unknown columns: RSII"):
+        rules.evaluate({"RSI": np.zeros(3)})
+    # the generator checks its columns first and holds
+    assert SignalGenerator({"buy": "RSI < 30 and RSII > 1"}).analyze_indicators(signal_bars) == (False, "hold")
+
+def test_first_rule_takes_the_bar():
+    rules = SignalRules({"buy": "a > 0", "sell": "a > 1"})
+    signals = rules.evaluate({"a": np.array([0.0, 1.0, 2.0])})
+    assert signals["buy"].tolist() == [False, True, True]
+    assert signals["sell"].tolist() == [False, False, False]
+
+def reference_signal(latest, previous):
+    # the buy/sell conditions analyze_indicators used before they became SIGNAL_RULES expressions
+    volume_increasing = latest["Volume"] > previous["Volume"] * 1.2
+    if (latest["EMA_9"] > latest["EMA_21"] and latest["close"] > latest["EMA_9"] and volume_increasing
+            and latest["RSI"] < 30
+            and latest["MACD"] > latest["MACD_Signal"] and previous["MACD"] <= previous["MACD_Signal"]
+            and latest["close"] <= latest["BBL"] and latest["Stoch_%K"] < 20):
+        return "buy"
+    if (latest["EMA_9"] < latest["EMA_21"] and latest["close"] < latest["EMA_9"] and volume_increasing
+            and latest["RSI"] > 70
+            and latest["MACD"] < latest["MACD_Signal"] and previous["MACD"] >= previous["MACD_Signal"]
+            and latest["close"] >= latest["BBU"] and latest["Stoch_%K"] > 80):
+        return "sell"
+    return "hold"
+
+def test_default_rules_vectorized_match_per_bar(signal_bars):
+    assert SignalGenerator().rules.sources == SIGNAL_RULES
+    generator = SignalGenerator()
+    buy, sell = generator.analyze_indicators_vectorized(signal_bars)
+    vectorized = np.where(buy, "buy", np.where(sell, "sell", "hold"))
+    assert buy.sum() > 10 and sell.sum() > 10
+
+    rows = signal_bars.to_dict("records")
+    for i in range(1, len(signal_bars)):
+        # the live path converts only the tail rows of whatever history it is given
+        _, signal = generator.analyze_indicators(signal_bars.iloc[:i + 1])
+        assert signal == vectorized[i], i
+        assert signal == reference_signal(rows[i], rows[i - 1]), i
+
+def test_lagged_rules_fire_live_as_in_backtests(candles):
+    # the live engines keep lookback + 1 rows, so prev(x, n) with n >= 2 sees the same bars as a backtest
+    rules = {"buy": "close > prev(close, 2) and RSI < 45", "sell": "close < prev(close, 3) and RSI > 55"}
+    trading_logic = TradingLogic()
+    trading_logic.signal_gen = SignalGenerator(rules)
+    engine = trading_logic.indicator_engine("BTCINR")
+
+    live, rows = [], []
+    for time, candle in candles.iterrows():
+        rows.append(engine.update(time, candle["high"], candle["low"], candle["close"], candle["volume"]))
+        live.append(trading_logic.signal_gen.analyze_indicators(engine.tail_frame())[1])
+    assert len(engine.tail_frame()) == 4
+
+    buy, sell = SignalGenerator(rules).analyze_indicators_vectorized(pd.DataFrame(rows))
+    vectorized = np.where(buy, "buy", np.where(sell, "sell", "hold"))
+    assert "buy" in live and "sell" in live
+    assert live == vectorized.tolist()
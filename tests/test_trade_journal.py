@@ -0,0 +1,53 @@
+import csv
+import threading
+from utils.logging_utils import LOG_COLUMNS, TradeLogWriter
+from utils.trade_journal import TradeJournal
+
+ROWS = [
+    ["2024-01-02 10:00:00", "BTCINR", "Buy", "100.0", "100.0", "1.0", "1000.0", "99.0", "102.0", "100.0", "", "", ""],
+    ["2024-01-02 11:00:00", "BTCINR", "Sell", "102.0", "100.0", "1.0", "1002.0", "", "", "100.0", "100.0", "102.0",
+     "2.0"],
+]
+
+def write_log(path, rows):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(LOG_COLUMNS)
+        writer.writerows(rows)
+
+def test_forced_import_replaces_the_earlier_one(tmp_path):
+    log = str(tmp_path / "trades.csv")
+    write_log(log, ROWS)
+    journal = TradeJournal(":memory:")
+    assert journal.import_csv(log) == 2
+    assert journal.import_csv(log) == 0
+
+    # the file grew since; a forced import replaces the earlier rows instead of doubling them
+    write_log(log, ROWS + [ROWS[0]])
+    assert journal.import_csv(log, force=True) == 3
+    assert len(journal) == 3
+    summary = journal.summary()["BTCINR"]
+    assert (summary["realized_pnl"], summary["closed_trades"], summary["open_quantity"]) == (2.0, 1, 1.0)
+    # whole-day totals come from the daily summary table
+    assert journal.realized_pnl(start=0) == {"BTCINR": 2.0}
+
+class _BrokenJournal:
+
+    def insert_many(self, rows):
+        raise OSError("disk full")
+
+    def close(self):
+        pass
+
+def test_failed_write_releases_flush_and_counts_the_lost_rows(tmp_path):
+    writer = TradeLogWriter(None, journal=_BrokenJournal(), flush_interval=60.0)
+    writer.put((1_700_000_000.0, "BTCINR", "Buy") + (None,) * 10)
+    writer.put((1_700_000_001.0, "BTCINR", "Sell") + (None,) * 10)
+    try:
+        assert writer.flush(timeout=5.0)
+        assert (writer.rows_written, writer.rows_lost) == (0, 2)
+    finally:
+        closer = threading.Thread(target=writer.close)
+        closer.start()
+        closer.join(5.0)
+    assert not closer.is_alive()
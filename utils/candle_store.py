@@ -0,0 +1,187 @@
+from __future__ import annotations
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from config.settings import CANDLE_STORE_DIR, CANDLE_PAGE_SIZE, CANDLE_SYNC_MAX_PAGES, DEBUG_MODE
+from utils.http_client import get_client
+from utils.market_data import MarketData
+from utils.lazy_imports import lazy_import
+pd = lazy_import("pandas")
+
+CANDLES_ENDPOINT = "/market_data/candles"
+COLUMNS = ["time", "open", "high", "low", "close", "volume"]
+
+# (time in ms, open, high, low, close, volume)
+Candle = Tuple[int, float, float, float, float, float]
+
+class _Series:
+
+    # candles of one pair/interval held in time order, backed by an append-only CSV file
+    # a revision of the open candle is appended as a new line; the last line for a time wins on load
+    # a last line cut short by a crash mid-write is dropped from the file on load
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.candles: List[Candle] = []
+        self.lock = threading.Lock()
+        self._load()
+
+    def _load(self) -> None:
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "rb") as f:
+            data = f.read()
+        complete = data[:data.rfind(b"\n") + 1]
+        if len(complete) < len(data):
+            # truncate so the next append starts on a fresh line; sync() downloads the candle again
+            print(f"⚠️ Dropping an incomplete last line from {self.path}")
+            with open(self.path, "r+b") as f:
+                f.truncate(len(complete))
+        by_time: Dict[int, Candle] = {}
+        lines = 0
+        for line in complete.decode("utf-8").splitlines():
+            if not line.strip() or line.startswith("time"):
+                continue
+            fields = line.split(",")
+            candle = (int(fields[0]), float(fields[1]), float(fields[2]),
+                      float(fields[3]), float(fields[4]), float(fields[5]))
+            by_time[candle[0]] = candle
+            lines += 1
+        self.candles = sorted(by_time.values())
+        # rewrite the file once revisions outnumber distinct candles
+        if lines > 2 * len(self.candles):
+            self._rewrite()
+
+    def _rewrite(self) -> None:
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(",".join(COLUMNS) + "\n")
+            f.writelines(self._format(candle) for candle in self.candles)
+        os.replace(tmp_path, self.path)
+
+    @staticmethod
+    def _format(candle: Candle) -> str:
+        return f"{candle[0]},{candle[1]!r},{candle[2]!r},{candle[3]!r},{candle[4]!r},{candle[5]!r}\n"
+
+    def last_time(self) -> Optional[int]:
+        return self.candles[-1][0] if self.candles else None
+
+    def merge(self, candles: List[Candle]) -> int:
+        # append candles newer than the last stored one and replace a revised last candle
+        # returns the number of candles written
+
+        written: List[Candle] = []
+        for candle in sorted(candles):
+            last = self.candles[-1] if self.candles else None
+            if last is None or candle[0] > last[0]:
+                self.candles.append(candle)
+                written.append(candle)
+            elif candle[0] == last[0] and candle != last:
+                self.candles[-1] = candle
+                written.append(candle)
+        if written:
+            new_file = not os.path.exists(self.path)
+            with open(self.path, "a", encoding="utf-8") as f:
+                if new_file:
+                    f.write(",".join(COLUMNS) + "\n")
+                f.writelines(self._format(candle) for candle in written)
+        return len(written)
+
+class CandleStore:
+
+    # persistent local store of OHLCV candles per pair and interval
+    # sync() downloads only what is newer than the stored data; window() serves candles without network I/O
+
+    def __init__(self, root: str = CANDLE_STORE_DIR) -> None:
+        self.root = root
+        self._series: Dict[Tuple[str, str], _Series] = {}
+        self._lock = threading.Lock()
+
+    def _get_series(self, trading_pair: str, interval: str) -> _Series:
+        key = (trading_pair, interval)
+        series = self._series.get(key)
+        if series is None:
+            with self._lock:
+                series = self._series.get(key)
+                if series is None:
+                    os.makedirs(self.root, exist_ok=True)
+                    series = _Series(os.path.join(self.root, f"{trading_pair}_{interval}.csv"))
+                    self._series[key] = series
+        return series
+
+    @staticmethod
+    def _parse(data: List[Dict[str, Any]]) -> List[Candle]:
+        return [(int(row["time"]), float(row["open"]), float(row["high"]),
+                 float(row["low"]), float(row["close"]), float(row["volume"])) for row in data]
+
+    @staticmethod
+    def download(api_pair: str, interval: str, start_time: Optional[int] = None,
+                 end_time: Optional[int] = None, limit: Optional[int] = None) -> List[Candle]:
+        # download candles from the public candles endpoint
+
+        params: Dict[str, Any] = {"pair": api_pair, "interval": interval}
+        if start_time is not None:
+            params["startTime"] = start_time
+            params["endTime"] = end_time if end_time is not None else int(time.time() * 1000)
+        if limit is not None:
+            params["limit"] = limit
+        if DEBUG_MODE:
+            print(f"🔍 Fetching candles: {params}")
+        response = get_client().get(CANDLES_ENDPOINT, public=True, params=params)
+        if response.status_code != 200:
+            raise Exception(f"Failed to fetch historical data: {response.status_code}")
+        return CandleStore._parse(response.json())
+
+    def sync(self, trading_pair: str, interval: str) -> int:
+        # fetch candles from the last stored one onwards (so the open candle gets revised) and persist them
+        # the exchange returns the newest page of a range, so after a long downtime older pages are read
+        # backwards until they reach the stored data (at most CANDLE_SYNC_MAX_PAGES, warning if a gap remains)
+
+        market_details = MarketData.get_market_details(trading_pair)
+        api_pair = market_details.get("pair")
+        if not api_pair:
+            raise ValueError(f"❌ No API pair found for trading pair: {trading_pair}.")
+        series = self._get_series(trading_pair, interval)
+        with series.lock:
+            last_time = series.last_time()
+            candles = page = self.download(api_pair, interval, start_time=last_time)
+            pages = 1
+            while last_time is not None and len(page) >= CANDLE_PAGE_SIZE and min(page)[0] > last_time:
+                if pages >= CANDLE_SYNC_MAX_PAGES:
+                    print(f"⚠️ Candle store {trading_pair} {interval}: stopped after {pages} pages, candles "
+                          f"between {last_time} and {min(candles)[0]} are missing")
+                    break
+                page = self.download(api_pair, interval, start_time=last_time, end_time=min(page)[0] - 1)
+                candles = page + candles
+                pages += 1
+            written = series.merge(candles)
+        if DEBUG_MODE:
+            print(f"🔍 Candle store {trading_pair} {interval}: {written} new/revised, {len(series.candles)} stored")
+        return written
+
+    def import_candles(self, trading_pair: str, interval: str, candles: List[Candle]) -> int:
+        # merge candles obtained elsewhere (e.g. a bulk history download) into the store
+
+        series = self._get_series(trading_pair, interval)
+        with series.lock:
+            return series.merge(candles)
+
+    def candles(self, trading_pair: str, interval: str, limit: Optional[int] = None) -> List[Candle]:
+        series = self._get_series(trading_pair, interval)
+        with series.lock:
+            return series.candles[-limit:] if limit else list(series.candles)
+
+    def window(self, trading_pair: str, interval: str, limit: Optional[int] = None) -> Optional[pd.DataFrame]:
+        # the last `limit` stored candles as a time-indexed DataFrame, oldest first
+
+        candles = self.candles(trading_pair, interval, limit)
+        if not candles:
+            return None
+        df = pd.DataFrame.from_records(candles, columns=COLUMNS)
+        df["timestamp"] = pd.to_datetime(df["time"], unit="ms", errors="coerce")
+        df.set_index("timestamp", inplace=True)
+        df.drop(columns=["time"], inplace=True)
+        return df
+
+candle_store = CandleStore()
@@ -0,0 +1,32 @@
+import time
+
+class SystemClock:
+
+    # wall-clock time; the default for live and paper trading
+
+    @staticmethod
+    def time() -> float:
+        return time.time()
+
+    @staticmethod
+    def sleep(seconds: float) -> None:
+        time.sleep(seconds)
+
+class VirtualClock:
+
+    # simulated time for replays: sleep() advances the clock instead of blocking, and the replay
+    # sets it to each recorded tick's timestamp
+
+    def __init__(self, start: float = 0.0) -> None:
+        self.now = start
+
+    def time(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.now += max(0.0, seconds)
+
+    def advance_to(self, timestamp: float) -> None:
+        # never moves backwards, so out-of-order ticks cannot rewind time
+        if timestamp > self.now:
+            self.now = timestamp
@@ -0,0 +1,206 @@
+import argparse
+import math
+import os
+import struct
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Optional
+from config.settings import DEBUG_MODE, EXIT_TRACE_ENABLED, EXIT_TRACE_FILE
+from utils.logging_utils import Logger
+
+# file layout: MAGIC, then one record per exit:
+#   header: pair length (uint8), reason length (uint8), flags (uint8), position id (uint32),
+#           observed, decided, sent, acknowledged (float64 unix seconds),
+#           trigger price, observed price, fill price, quantity (float64)
+#   then the pair and reason names (ascii)
+# unknown values (a request that never got an answer, a fill price the exchange did not report) are NaN
+MAGIC = b"EXITS1\n"
+_TRACE = struct.Struct("<BBBIdddddddd")
+_OK = 1
+_PAPER = 2
+
+NAN = float("nan")
+
+@dataclass
+class ExitTrace:
+
+    # timeline of one exit, from the price that triggered it to the exchange acknowledging the sell
+
+    trading_pair: str
+    reason: str
+    position_id: int
+    observed_at: float        # when the triggering price was observed
+    decided_at: float         # when the exit was decided
+    sent_at: float            # when the sell request went out
+    acknowledged_at: float    # when the exchange answered
+    trigger_price: float      # exit level that was crossed (the observed price for discretionary exits)
+    observed_price: float
+    fill_price: float = NAN
+    quantity: float = NAN
+    ok: bool = True
+    paper: bool = False
+
+    @property
+    def decision_latency(self) -> float:
+        return self.decided_at - self.observed_at
+
+    @property
+    def submit_latency(self) -> float:
+        # order preparation (market details, quantity) before the request
+        return self.sent_at - self.decided_at
+
+    @property
+    def exchange_latency(self) -> float:
+        # round trip, including rate-limit waits and retries
+        return self.acknowledged_at - self.sent_at
+
+    @property
+    def tick_to_ack(self) -> float:
+        return self.acknowledged_at - self.observed_at
+
+    @property
+    def execution_price(self) -> float:
+        return self.fill_price if not math.isnan(self.fill_price) else self.observed_price
+
+    @property
+    def slippage_bps(self) -> float:
+        # execution price against the trigger level in basis points; negative means sold below it
+        if not self.trigger_price:
+            return NAN
+        return (self.execution_price - self.trigger_price) / self.trigger_price * 10_000
+
+    def pack(self) -> bytes:
+        pair = self.trading_pair.encode("ascii")
+        reason = self.reason.encode("ascii")
+        flags = (_OK if self.ok else 0) | (_PAPER if self.paper else 0)
+        return _TRACE.pack(len(pair), len(reason), flags, self.position_id, self.observed_at, self.decided_at,
+                           self.sent_at, self.acknowledged_at, self.trigger_price, self.observed_price,
+                           self.fill_price, self.quantity) + pair + reason
+
+class ExitTraceStore:
+
+    # append-only exit trace file (about 80 bytes per exit); each trace is written and flushed on its own,
+    # so a crash loses at most the trace being written, and a truncated last record is ignored on read
+
+    def __init__(self, path: Optional[str] = None) -> None:
+        self.path = path or os.path.join(Logger.LOGS_FOLDER, EXIT_TRACE_FILE)
+        self._lock = threading.Lock()
+
+    def append(self, trace: ExitTrace) -> None:
+        with self._lock:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            new_file = not os.path.exists(self.path) or os.path.getsize(self.path) == 0
+            with open(self.path, "ab") as f:
+                if new_file:
+                    f.write(MAGIC)
+                f.write(trace.pack())
+
+    def __iter__(self) -> Iterator[ExitTrace]:
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "rb") as f:
+            data = f.read()
+        if not data.startswith(MAGIC):
+            raise ValueError(f"{self.path} is not an exit trace file")
+        offset, size = len(MAGIC), len(data)
+        while offset + _TRACE.size <= size:
+            (pair_length, reason_length, flags, position_id, observed_at, decided_at, sent_at,
+             acknowledged_at, trigger_price, observed_price, fill_price, quantity) = _TRACE.unpack_from(data, offset)
+            offset += _TRACE.size
+            if offset + pair_length + reason_length > size:
+                break
+            pair = data[offset:offset + pair_length].decode("ascii")
+            offset += pair_length
+            reason = data[offset:offset + reason_length].decode("ascii")
+            offset += reason_length
+            yield ExitTrace(pair, reason, position_id, observed_at, decided_at, sent_at, acknowledged_at,
+                            trigger_price, observed_price, fill_price, quantity,
+                            ok=bool(flags & _OK), paper=bool(flags & _PAPER))
+
+    def traces(self, trading_pair: Optional[str] = None, paper: Optional[bool] = None) -> List[ExitTrace]:
+        return [trace for trace in self
+                if (trading_pair is None or trace.trading_pair == trading_pair)
+                and (paper is None or trace.paper == paper)]
+
+def record_exit_trace(trace: ExitTrace, store: Optional[ExitTraceStore] = None) -> None:
+    # persist one trace; tracing must never break an exit, so write errors are only reported
+    if not EXIT_TRACE_ENABLED:
+        return
+    try:
+        (store or ExitTraceStore()).append(trace)
+    except (OSError, UnicodeEncodeError, struct.error) as e:
+        print(f"❌ Failed to record exit trace: {e}")
+        return
+    if DEBUG_MODE and trace.ok:
+        print(f"🔍 Exit trace: tick-to-ack {trace.tick_to_ack * 1000:.1f} ms | "
+              f"slippage {trace.slippage_bps:.1f} bps")
+
+# latency stages of the report, in pipeline order
+STAGES = ("decision_latency", "submit_latency", "exchange_latency", "tick_to_ack")
+
+def _distribution(values: List[float]) -> Dict[str, float]:
+    ordered = sorted(value for value in values if not math.isnan(value))
+    if not ordered:
+        return {"count": 0, "mean": NAN, "min": NAN, "p50": NAN, "p95": NAN, "max": NAN}
+
+    def quantile(q: float) -> float:
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    return {"count": len(ordered), "mean": sum(ordered) / len(ordered), "min": ordered[0],
+            "p50": quantile(0.5), "p95": quantile(0.95), "max": ordered[-1]}
+
+def exit_trace_report(traces: List[ExitTrace]) -> Dict[str, Dict[str, Any]]:
+    # per pair: exits, failed exits, the distribution of each latency stage and of the slippage
+    # failed exits count towards the totals only; their timings stop before an acknowledgement
+
+    by_pair: Dict[str, List[ExitTrace]] = {}
+    for trace in traces:
+        by_pair.setdefault(trace.trading_pair, []).append(trace)
+    report = {}
+    for pair, pair_traces in sorted(by_pair.items()):
+        filled = [trace for trace in pair_traces if trace.ok]
+        entry: Dict[str, Any] = {"exits": len(pair_traces), "failed": len(pair_traces) - len(filled)}
+        for stage in STAGES:
+            entry[stage] = _distribution([getattr(trace, stage) for trace in filled])
+        entry["slippage_bps"] = _distribution([trace.slippage_bps for trace in filled])
+        reasons: Dict[str, int] = {}
+        for trace in pair_traces:
+            reasons[trace.reason] = reasons.get(trace.reason, 0) + 1
+        entry["reasons"] = reasons
+        report[pair] = entry
+    return report
+
+def print_exit_trace_report(report: Dict[str, Dict[str, Any]]) -> None:
+    if not report:
+        print("⚠️ No exit traces recorded.")
+        return
+    for pair, entry in report.items():
+        reasons = ", ".join(f"{reason}: {count}" for reason, count in sorted(entry["reasons"].items()))
+        print(f"\n📊 {pair}: {entry['exits']} exits ({entry['failed']} failed) | {reasons}")
+        for stage in STAGES:
+            stats = entry[stage]
+            if stats["count"]:
+                print(f"➡️ {stage:<17} p50 {stats['p50'] * 1000:9.1f} ms | p95 {stats['p95'] * 1000:9.1f} ms | "
+                      f"max {stats['max'] * 1000:9.1f} ms")
+        stats = entry["slippage_bps"]
+        if stats["count"]:
+            # sells: the lowest value is the worst fill
+            print(f"➡️ {'slippage':<17} p50 {stats['p50']:9.1f} bps | mean {stats['mean']:8.1f} bps | "
+                  f"worst {stats['min']:9.1f} bps")
+
+def trace_main() -> None:
+    # python -m utils.exit_traces [--pair BTCINR] [--paper | --live] [--path FILE]
+
+    parser = argparse.ArgumentParser(description="Tick-to-order latency and slippage of recorded exits")
+    parser.add_argument("--path", help="exit trace file (default: the logs folder)")
+    parser.add_argument("--pair", help="only this trading pair")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--paper", action="store_true", help="only paper trading exits")
+    mode.add_argument("--live", action="store_true", help="only live exits")
+    args = parser.parse_args()
+    paper = True if args.paper else False if args.live else None
+    store = ExitTraceStore(args.path)
+    print_exit_trace_report(exit_trace_report(store.traces(args.pair, paper)))
+
+if __name__ == "__main__":
+    trace_main()
@@ -0,0 +1,231 @@
+from __future__ import annotations
+import random
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+from config.settings import (API_BASE_URL, PUBLIC_BASE_URL, HTTP_POOL_SIZE, HTTP_TIMEOUTS,
+                             HTTP_MAX_RETRIES, HTTP_RETRY_BACKOFF, HTTP_RETRY_BUDGET, DEBUG_MODE,
+                             RATE_LIMIT_ENABLED)
+from utils.metrics import metrics
+from utils.rate_limiter import RequestScheduler
+from utils.lazy_imports import lazy_import
+requests = lazy_import("requests")
+
+# status codes worth retrying for idempotent requests
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+# order endpoints that only read state
+ORDER_QUERY_PATHS = ("/orders/status", "/orders/active_orders", "/orders/trade_history")
+
+class EndpointStats:
+
+    # latency and error counters for one endpoint class; updated and read under the HttpClient's lock
+
+    def __init__(self) -> None:
+        self.requests = 0
+        self.errors = 0
+        self.retries = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+
+    def record(self, elapsed: float, ok: bool) -> None:
+        self.requests += 1
+        self.total_seconds += elapsed
+        if elapsed > self.max_seconds:
+            self.max_seconds = elapsed
+        if not ok:
+            self.errors += 1
+
+    def as_dict(self) -> Dict[str, float]:
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "retries": self.retries,
+            "avg_ms": (self.total_seconds / self.requests * 1000) if self.requests else 0.0,
+            "max_ms": self.max_seconds * 1000,
+        }
+
+class HttpClient:
+
+    # shared HTTP layer for every CoinDCX call: one pooled keep-alive session, per-endpoint
+    # connect/read timeouts, client-side rate limiting with priority lanes, bounded jittered retries
+    # for GETs (and for any request the exchange rejected with 429) and latency counters
+    # base URLs are injectable so the whole bot can be pointed at a local stand-in server
+
+    def __init__(self, api_base_url: str = API_BASE_URL, public_base_url: str = PUBLIC_BASE_URL,
+                 pool_size: int = HTTP_POOL_SIZE, timeouts: Optional[Dict[str, Tuple[float, float]]] = None,
+                 max_retries: int = HTTP_MAX_RETRIES, retry_backoff: float = HTTP_RETRY_BACKOFF,
+                 retry_budget: float = HTTP_RETRY_BUDGET,
+                 scheduler: Optional[RequestScheduler] = None) -> None:
+        self.api_base_url = api_base_url.rstrip("/")
+        self.public_base_url = public_base_url.rstrip("/")
+        self.timeouts = dict(HTTP_TIMEOUTS if timeouts is None else timeouts)
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self._stats: Dict[str, EndpointStats] = {}
+        self._lock = threading.Lock()
+        self.scheduler = scheduler or (RequestScheduler() if RATE_LIMIT_ENABLED else None)
+        # retry budget: every request earns a fraction of a retry, every retry spends one,
+        # so a failing exchange cannot multiply our own traffic
+        self._retry_budget_ratio = retry_budget
+        self._retry_tokens = 10.0
+
+    @staticmethod
+    def endpoint_class(path: str) -> str:
+        # group endpoints that share timeout and rate characteristics
+        # read-only order queries get their own class so polling never competes with creates and cancels
+
+        if "/orders" in path:
+            if any(query in path for query in ORDER_QUERY_PATHS):
+                return "order_queries"
+            return "orders"
+        if "/users" in path:
+            return "account"
+        if "candles" in path:
+            return "candles"
+        if "markets_details" in path:
+            return "markets"
+        if "ticker" in path:
+            return "ticker"
+        return "default"
+
+    def url(self, path: str, public: bool = False) -> str:
+        return f"{self.public_base_url if public else self.api_base_url}{path}"
+
+    def _stats_for(self, endpoint_class: str) -> EndpointStats:
+        stats = self._stats.get(endpoint_class)
+        if stats is None:
+            with self._lock:
+                stats = self._stats.setdefault(endpoint_class, EndpointStats())
+        return stats
+
+    def _record(self, stats: EndpointStats, elapsed: float, ok: bool) -> None:
+        with self._lock:
+            stats.record(elapsed, ok)
+
+    def _record_retry(self, stats: EndpointStats) -> None:
+        with self._lock:
+            stats.retries += 1
+
+    def _take_retry_token(self) -> bool:
+        with self._lock:
+            if self._retry_tokens >= 1.0:
+                self._retry_tokens -= 1.0
+                return True
+            return False
+
+    def _earn_retry_tokens(self) -> None:
+        with self._lock:
+            self._retry_tokens = min(10.0, self._retry_tokens + self._retry_budget_ratio)
+
+    @staticmethod
+    def _retry_after(response: requests.Response) -> Optional[float]:
+        try:
+            return float(response.headers.get("Retry-After"))
+        except (TypeError, ValueError):
+            return None
+
+    def request(self, method: str, path: str, public: bool = False, priority: Optional[int] = None,
+                **kwargs: Any) -> requests.Response:
+        # send a request through the rate limiter and the pooled session; only GETs are retried on
+        # errors, but a 429 is retried for any method since the exchange did not process the request
+        # priority overrides the endpoint class lane (lower goes first)
+
+        endpoint_class = self.endpoint_class(path)
+        stats = self._stats_for(endpoint_class)
+        kwargs.setdefault("timeout", self.timeouts.get(endpoint_class, self.timeouts["default"]))
+        url = self.url(path, public)
+        is_get = method.upper() == "GET"
+        retries_left = self.max_retries
+        attempt = 0
+        self._earn_retry_tokens()
+        while True:
+            if self.scheduler is not None:
+                waited = self.scheduler.acquire(endpoint_class, priority)
+                metrics.observe("rate_limit_wait", waited, endpoint_class=endpoint_class)
+            start = time.perf_counter()
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                self._record(stats, time.perf_counter() - start, ok=False)
+                metrics.increment("http_errors", endpoint_class=endpoint_class, status="network")
+                if not is_get or retries_left <= 0 or not self._take_retry_token():
+                    raise
+            else:
+                ok = response.status_code < 400
+                elapsed = time.perf_counter() - start
+                self._record(stats, elapsed, ok=ok)
+                metrics.observe("http_request", elapsed, endpoint_class=endpoint_class)
+                if not ok:
+                    metrics.increment("http_errors", endpoint_class=endpoint_class, status=response.status_code)
+                throttled = response.status_code == 429
+                if self.scheduler is not None:
+                    if throttled:
+                        self.scheduler.throttled(endpoint_class, self._retry_after(response))
+                    else:
+                        self.scheduler.succeeded(endpoint_class)
+                if (ok or response.status_code not in RETRY_STATUS_CODES or (not is_get and not throttled)
+                        or retries_left <= 0 or not self._take_retry_token()):
+                    return response
+                if throttled and self.scheduler is not None:
+                    # the scheduler holds the class back for the backoff; no extra sleep needed
+                    retries_left -= 1
+                    self._record_retry(stats)
+                    metrics.increment("http_retries", endpoint_class=endpoint_class)
+                    attempt += 1
+                    continue
+            retries_left -= 1
+            self._record_retry(stats)
+            metrics.increment("http_retries", endpoint_class=endpoint_class)
+            # full jitter keeps several bots from retrying in lockstep
+            delay = random.uniform(0, self.retry_backoff * (2 ** attempt))
+            attempt += 1
+            if DEBUG_MODE:
+                print(f"🔁 Retrying {method} {path} in {delay:.2f}s")
+            time.sleep(delay)
+
+    def get(self, path: str, public: bool = False, **kwargs: Any) -> requests.Response:
+        return self.request("GET", path, public, **kwargs)
+
+    def post(self, path: str, public: bool = False, **kwargs: Any) -> requests.Response:
+        return self.request("POST", path, public, **kwargs)
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        # latency counters per endpoint class
+
+        with self._lock:
+            return {name: stats.as_dict() for name, stats in self._stats.items()}
+
+    def rate_limits(self) -> Dict[str, Dict[str, float]]:
+        # queue depth, waits and 429s per endpoint class
+
+        return self.scheduler.metrics() if self.scheduler is not None else {}
+
+    def close(self) -> None:
+        self.session.close()
+
+_client: Optional[HttpClient] = None
+_client_lock = threading.Lock()
+
+def get_client() -> HttpClient:
+    # return the process-wide client, creating it on first use
+
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = HttpClient()
+    return _client
+
+def set_client(client: HttpClient) -> None:
+    # replace the process-wide client, e.g. with one pointed at a local stand-in server
+
+    global _client
+    with _client_lock:
+        previous, _client = _client, client
+    if previous is not None and previous is not client:
+        previous.close()
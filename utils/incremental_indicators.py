@@ -0,0 +1,305 @@
+from __future__ import annotations
+import math
+import sys
+from collections import deque
+from typing import Any, Dict, Optional
+from utils.lazy_imports import lazy_import
+pd = lazy_import("pandas")
+
+NAN = float("nan")
+
+class _AdjustedEWM:
+
+    # running form of pandas' ewm(alpha, min_periods).mean() with adjust=True (pandas_ta's rma)
+
+    __slots__ = ("decay", "min_periods", "numerator", "denominator", "count")
+
+    def __init__(self, alpha: float, min_periods: int) -> None:
+        self.decay = 1.0 - alpha
+        self.min_periods = min_periods
+        self.numerator = 0.0
+        self.denominator = 0.0
+        self.count = 0
+
+    def copy(self) -> "_AdjustedEWM":
+        clone = _AdjustedEWM.__new__(_AdjustedEWM)
+        clone.decay, clone.min_periods = self.decay, self.min_periods
+        clone.numerator, clone.denominator, clone.count = self.numerator, self.denominator, self.count
+        return clone
+
+    def update(self, value: float) -> float:
+        self.numerator = value + self.decay * self.numerator
+        self.denominator = 1.0 + self.decay * self.denominator
+        self.count += 1
+        return self.numerator / self.denominator if self.count >= self.min_periods else NAN
+
+class _EMA:
+
+    # pandas_ta ema: seeded with the SMA of the first `length` values, then ewm(span, adjust=False)
+
+    __slots__ = ("length", "alpha", "seed_sum", "count", "value")
+
+    def __init__(self, length: int) -> None:
+        self.length = length
+        self.alpha = 2.0 / (length + 1)
+        self.seed_sum = 0.0
+        self.count = 0
+        self.value = NAN
+
+    def copy(self) -> "_EMA":
+        clone = _EMA.__new__(_EMA)
+        clone.length, clone.alpha = self.length, self.alpha
+        clone.seed_sum, clone.count, clone.value = self.seed_sum, self.count, self.value
+        return clone
+
+    def update(self, value: float) -> float:
+        self.count += 1
+        if self.count < self.length:
+            self.seed_sum += value
+        elif self.count == self.length:
+            self.value = (self.seed_sum + value) / self.length
+        else:
+            self.value = self.alpha * value + (1.0 - self.alpha) * self.value
+        return self.value
+
+class _RollingMean:
+
+    # simple moving average over the last `length` values
+
+    __slots__ = ("length", "window", "total")
+
+    def __init__(self, length: int) -> None:
+        self.length = length
+        self.window: deque = deque()
+        self.total = 0.0
+
+    def copy(self) -> "_RollingMean":
+        clone = _RollingMean.__new__(_RollingMean)
+        clone.length, clone.window, clone.total = self.length, deque(self.window), self.total
+        return clone
+
+    def update(self, value: float) -> float:
+        self.window.append(value)
+        self.total += value
+        if len(self.window) > self.length:
+            self.total -= self.window.popleft()
+        return self.total / self.length if len(self.window) == self.length else NAN
+
+class _RollingBands:
+
+    # Bollinger Bands from rolling sums of x and x^2; the sums are rebuilt from the window
+    # every `resync` updates so floating-point drift cannot accumulate
+
+    __slots__ = ("length", "num_std", "ddof", "resync", "window", "total", "total_sq", "updates")
+
+    def __init__(self, length: int, num_std: float, ddof: int = 0, resync: int = 1000) -> None:
+        self.length = length
+        self.num_std = num_std
+        self.ddof = ddof
+        self.resync = resync
+        self.window: deque = deque()
+        self.total = 0.0
+        self.total_sq = 0.0
+        self.updates = 0
+
+    def copy(self) -> "_RollingBands":
+        clone = _RollingBands.__new__(_RollingBands)
+        clone.length, clone.num_std, clone.ddof, clone.resync = self.length, self.num_std, self.ddof, self.resync
+        clone.window, clone.total, clone.total_sq = deque(self.window), self.total, self.total_sq
+        clone.updates = self.updates
+        return clone
+
+    def update(self, value: float) -> tuple:
+        self.window.append(value)
+        self.total += value
+        self.total_sq += value * value
+        if len(self.window) > self.length:
+            dropped = self.window.popleft()
+            self.total -= dropped
+            self.total_sq -= dropped * dropped
+        self.updates += 1
+        if self.updates % self.resync == 0:
+            self.total = math.fsum(self.window)
+            self.total_sq = math.fsum(x * x for x in self.window)
+        if len(self.window) < self.length:
+            return NAN, NAN, NAN
+        mean = self.total / self.length
+        variance = max(self.total_sq - self.length * mean * mean, 0.0) / (self.length - self.ddof)
+        band = self.num_std * math.sqrt(variance)
+        return mean - band, mean, mean + band
+
+class _RollingExtreme:
+
+    # rolling max (or min) over the last `length` values with a monotonic deque: amortised O(1)
+
+    __slots__ = ("length", "is_max", "items", "index")
+
+    def __init__(self, length: int, is_max: bool) -> None:
+        self.length = length
+        self.is_max = is_max
+        self.items: deque = deque()  # (index, value), values monotonic
+        self.index = 0
+
+    def copy(self) -> "_RollingExtreme":
+        clone = _RollingExtreme.__new__(_RollingExtreme)
+        clone.length, clone.is_max, clone.items, clone.index = self.length, self.is_max, deque(self.items), self.index
+        return clone
+
+    def update(self, value: float) -> float:
+        items = self.items
+        if self.is_max:
+            while items and items[-1][1] <= value:
+                items.pop()
+        else:
+            while items and items[-1][1] >= value:
+                items.pop()
+        items.append((self.index, value))
+        if items[0][0] <= self.index - self.length:
+            items.popleft()
+        self.index += 1
+        return items[0][1] if self.index >= self.length else NAN
+
+class _IndicatorState:
+
+    # running state for every indicator produced by TechnicalIndicators.calculate
+
+    __slots__ = ("prev_close", "rsi_gain", "rsi_loss", "ema_fast", "ema_slow", "ema_signal",
+                 "ema_9", "ema_21", "bands", "atr", "highest", "lowest", "stoch_k", "stoch_d")
+
+    def __init__(self) -> None:
+        self.prev_close: Optional[float] = None
+        self.rsi_gain = _AdjustedEWM(1.0 / 14, 14)
+        self.rsi_loss = _AdjustedEWM(1.0 / 14, 14)
+        self.ema_fast = _EMA(12)
+        self.ema_slow = _EMA(26)
+        self.ema_signal = _EMA(9)
+        self.ema_9 = _EMA(9)
+        self.ema_21 = _EMA(21)
+        self.bands = _RollingBands(20, 2.0)
+        self.atr = _AdjustedEWM(1.0 / 14, 14)
+        self.highest = _RollingExtreme(14, is_max=True)
+        self.lowest = _RollingExtreme(14, is_max=False)
+        self.stoch_k = _RollingMean(3)
+        self.stoch_d = _RollingMean(3)
+
+    def copy(self) -> "_IndicatorState":
+        clone = _IndicatorState.__new__(_IndicatorState)
+        clone.prev_close = self.prev_close
+        for name in self.__slots__[1:]:
+            setattr(clone, name, getattr(self, name).copy())
+        return clone
+
+    def update(self, high: float, low: float, close: float, volume: float) -> Dict[str, float]:
+        row: Dict[str, float] = {"close": close, "Volume": volume}
+
+        # RSI (Wilder averages of gains and losses)
+        rsi = NAN
+        if self.prev_close is not None:
+            change = close - self.prev_close
+            gain = self.rsi_gain.update(change if change > 0 else 0.0)
+            loss = self.rsi_loss.update(-change if change < 0 else 0.0)
+            if not math.isnan(gain):
+                rsi = 100.0 * gain / (gain + loss) if gain + loss else NAN
+        row["RSI"] = rsi
+
+        # MACD
+        fast = self.ema_fast.update(close)
+        slow = self.ema_slow.update(close)
+        macd = fast - slow
+        signal = self.ema_signal.update(macd) if not math.isnan(macd) else NAN
+        row["MACD"] = macd
+        row["MACD_Signal"] = signal
+        row["MACD_Histogram"] = macd - signal
+
+        # EMAs
+        row["EMA_9"] = self.ema_9.update(close)
+        row["EMA_21"] = self.ema_21.update(close)
+
+        # Bollinger Bands
+        row["BBL"], row["BBM"], row["BBU"] = self.bands.update(close)
+
+        # ATR
+        atr = NAN
+        if self.prev_close is not None:
+            true_range = max(high - low, abs(high - self.prev_close), abs(self.prev_close - low))
+            atr = self.atr.update(true_range)
+        row["ATR"] = atr
+
+        # Stochastic %K / %D
+        highest = self.highest.update(high)
+        lowest = self.lowest.update(low)
+        stoch_k = stoch_d = NAN
+        if not math.isnan(highest):
+            price_range = (highest - lowest) or sys.float_info.epsilon
+            stoch_k = self.stoch_k.update(100.0 * (close - lowest) / price_range)
+            if not math.isnan(stoch_k):
+                stoch_d = self.stoch_d.update(stoch_k)
+        row["Stoch_%K"] = stoch_k
+        row["Stoch_%D"] = stoch_d
+
+        self.prev_close = close
+        return row
+
+class IncrementalIndicators:
+
+    # stateful counterpart of TechnicalIndicators.calculate for a single pair
+    # each new candle, or a revision of the still-open last candle, costs O(1): revisions roll the
+    # state back to the checkpoint taken before that candle and re-apply it
+    # values follow the pandas implementations used by pandas_ta (not its TA-Lib mode)
+
+    COLUMNS = ["close", "Volume", "RSI", "MACD", "MACD_Signal", "MACD_Histogram", "EMA_9", "EMA_21",
+               "BBL", "BBM", "BBU", "ATR", "Stoch_%K", "Stoch_%D"]
+
+    def __init__(self, history: int = 2) -> None:
+        # history: indicator rows kept for tail_frame (at least the previous and latest); signal rules
+        # with prev(x, n) need their lookback + 1
+        self._state = _IndicatorState()
+        self._checkpoint: Optional[_IndicatorState] = None
+        self.last_time: Any = None
+        self.rows: deque = deque(maxlen=max(2, history))
+        self.count = 0
+
+    @property
+    def latest(self) -> Dict[str, float]:
+        return self.rows[-1] if self.rows else {}
+
+    @property
+    def previous(self) -> Dict[str, float]:
+        return self.rows[-2] if len(self.rows) > 1 else {}
+
+    def update(self, time: Any, high: float, low: float, close: float, volume: float) -> Dict[str, float]:
+        # apply one candle; a candle with the same time as the last one replaces it
+
+        revision = self.last_time is not None and time == self.last_time
+        if revision:
+            self._state = self._checkpoint.copy()
+        elif self.last_time is not None and time < self.last_time:
+            raise ValueError(f"❌ Candle at {time} is older than the last candle at {self.last_time}")
+        else:
+            self._checkpoint = self._state.copy()
+            self.count += 1
+        latest = self._state.update(float(high), float(low), float(close), float(volume))
+        if revision:
+            self.rows[-1] = latest
+        else:
+            self.rows.append(latest)
+        self.last_time = time
+        return latest
+
+    def update_from_frame(self, df: pd.DataFrame) -> Dict[str, float]:
+        # apply every candle in a time-indexed OHLCV DataFrame that is not older than the last one seen
+
+        df = df.sort_index()
+        if self.last_time is not None:
+            df = df[df.index >= self.last_time]
+        for time, high, low, close, volume in zip(df.index, df["high"], df["low"], df["close"], df["volume"]):
+            self.update(time, high, low, close, volume)
+        return self.latest
+
+    def tail_frame(self, rows: Optional[int] = None) -> pd.DataFrame:
+        # the last `rows` kept rows (all of them by default), shaped like the tail of
+        # TechnicalIndicators.calculate's output
+
+        kept = list(self.rows)
+        return pd.DataFrame(kept[-rows:] if rows else kept, columns=self.COLUMNS)
+
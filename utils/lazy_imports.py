@@ -0,0 +1,59 @@
+import importlib
+import sys
+import threading
+import time
+from types import ModuleType
+from typing import Dict, Tuple
+
+# module name -> (seconds its deferred import took, thread that triggered it)
+LAZY_IMPORT_TIMES: Dict[str, Tuple[float, str]] = {}
+_lock = threading.Lock()
+
+class LazyModule(ModuleType):
+
+    # placeholder for a heavy module (pandas, numpy, pandas_ta, requests) that imports it on first attribute
+    # access; the real module's namespace is then copied in, so later lookups cost the same as on the module
+    # annotations that name the module (pd.DataFrame) need `from __future__ import annotations` in the user
+
+    def __init__(self, name: str) -> None:
+        super().__init__(name)
+        self.__dict__["_lazy_loaded"] = False
+
+    def _load(self) -> ModuleType:
+        module = _timed_import(self.__name__)
+        with _lock:
+            if not self.__dict__["_lazy_loaded"]:
+                self.__dict__.update(module.__dict__)
+                self.__dict__["_lazy_loaded"] = True
+        return module
+
+    def __getattr__(self, attr: str) -> object:
+        return getattr(self._load(), attr)
+
+    def __repr__(self) -> str:
+        state = "loaded" if self.__dict__["_lazy_loaded"] else "not loaded"
+        return f"<lazy module {self.__name__!r} ({state})>"
+
+def _timed_import(name: str) -> ModuleType:
+    # import_module, recording how long the first import of the module took and which thread paid for it
+    module = sys.modules.get(name)
+    if module is not None and not isinstance(module, LazyModule):
+        return module
+    start = time.perf_counter()
+    module = importlib.import_module(name)
+    with _lock:
+        LAZY_IMPORT_TIMES.setdefault(name, (time.perf_counter() - start, threading.current_thread().name))
+    return module
+
+def lazy_import(name: str) -> ModuleType:
+    # the module itself when something already imported it, otherwise a LazyModule for it
+    module = sys.modules.get(name)
+    return module if module is not None else LazyModule(name)
+
+def preload(name: str) -> bool:
+    # import a module ahead of its first use (startup warm-up); False when it is not installed
+    try:
+        _timed_import(name)
+    except ImportError:
+        return False
+    return True
@@ -1,28 +1,154 @@
+import atexit
+import csv
 import os
-import pandas as pd
+import queue
+import threading
+import time
 from datetime import datetime
-from typing import Any, Dict
+from typing import Any, List, Optional
+from config.settings import (TRADE_LOG_QUEUE_SIZE, TRADE_LOG_BATCH_SIZE, TRADE_LOG_FLUSH_INTERVAL,
+                             TRADE_LOG_BACKEND, TRADE_JOURNAL_PATH)
+from utils.trade_journal import TradeJournal
+
+LOG_COLUMNS = ["Time", "Trading Pair", "Order Type", "Current Price", "Investment", "Quantity",
+               "Wallet Balance", "Stop-Loss Price", "Take-Profit Price", "Initial Price",
+               "Buy Price", "Sell Price", "Profit"]
+
+class TradeLogWriter:
+
+    # background trade writer: callers enqueue row tuples, one thread batches them into the CSV file
+    # and/or the SQLite journal; the file stays open; rows are flushed when a batch fills, when the
+    # oldest pending row is flush_interval seconds old, and on shutdown; a full queue blocks the
+    # caller instead of dropping rows; a batch that fails to write is reported and counted in rows_lost
+
+    _STOP = object()
+
+    def __init__(self, path: Optional[str], journal: Optional[TradeJournal] = None,
+                 queue_size: int = TRADE_LOG_QUEUE_SIZE, batch_size: int = TRADE_LOG_BATCH_SIZE,
+                 flush_interval: float = TRADE_LOG_FLUSH_INTERVAL) -> None:
+        self.path = path
+        self.journal = journal
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.rows_written = 0
+        self.rows_lost = 0
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=queue_size)
+        self._file = self._csv = None
+        if path:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            new_file = not os.path.exists(path) or os.path.getsize(path) == 0
+            self._file = open(path, "a", newline="", encoding="utf-8")
+            self._csv = csv.writer(self._file)
+            if new_file:
+                self._csv.writerow(LOG_COLUMNS)
+                self._file.flush()
+        self._thread = threading.Thread(target=self._run, name="trade-log-writer", daemon=True)
+        self._thread.start()
+
+    def put(self, row: tuple) -> None:
+        # row: (unix time, trading pair, order type, current price, ...) in LOG_COLUMNS order
+        self._queue.put(row)
+
+    @staticmethod
+    def _format(row: tuple) -> tuple:
+        return (datetime.fromtimestamp(row[0]).strftime("%Y-%m-%d %H:%M:%S"),) + row[1:]
+
+    def _write(self, pending: List[tuple]) -> None:
+        if pending:
+            if self._csv:
+                self._csv.writerows(self._format(row) for row in pending)
+            if self.journal:
+                self.journal.insert_many(pending)
+            self.rows_written += len(pending)
+            pending.clear()
+        if self._file:
+            self._file.flush()
+
+    def _run(self) -> None:
+        pending: List[tuple] = []
+        deadline = None
+        while True:
+            timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+            try:
+                if item is self._STOP or isinstance(item, threading.Event):
+                    # shutdown or flush request
+                    self._write(pending)
+                    deadline = None
+                else:
+                    if item is not None:
+                        if not pending:
+                            deadline = time.monotonic() + self.flush_interval
+                        pending.append(item)
+                    if len(pending) >= self.batch_size or (pending and time.monotonic() >= deadline):
+                        self._write(pending)
+                        deadline = None
+            except Exception as e:
+                self.rows_lost += len(pending)
+                print(f"❌ Error writing trade log, {len(pending)} trade(s) may be missing from it: {e}")
+                pending.clear()
+                deadline = None
+            finally:
+                # a waiting flush() is released even when the write failed
+                if isinstance(item, threading.Event):
+                    item.set()
+            if item is self._STOP:
+                return
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        # block until every row queued so far is on disk
+        done = threading.Event()
+        self._queue.put(done)
+        return done.wait(timeout)
+
+    def close(self) -> None:
+        if self._thread.is_alive():
+            self._queue.put(self._STOP)
+            self._thread.join()
+        if self._file:
+            self._file.close()
+        if self.journal:
+            self.journal.close()
 
 class Logger:
-    
-    # logger class to record trade details to a CSV file
-    
+
+    # logger class to record trade details to a CSV file and/or the SQLite trade journal
+
     LOGS_FOLDER = "logs"
     LOG_FILE = "trades.csv"
 
+    _writer: Optional[TradeLogWriter] = None
+    _writer_lock = threading.Lock()
+
     @staticmethod
     def _get_log_file_path() -> str:
-        os.makedirs(Logger.LOGS_FOLDER, exist_ok=True)
         return os.path.join(Logger.LOGS_FOLDER, Logger.LOG_FILE)
 
+    @staticmethod
+    def _get_writer() -> TradeLogWriter:
+        writer = Logger._writer
+        if writer is None:
+            with Logger._writer_lock:
+                if Logger._writer is None:
+                    csv_path = Logger._get_log_file_path() if TRADE_LOG_BACKEND in ("csv", "both") else None
+                    journal = TradeJournal(TRADE_JOURNAL_PATH) if TRADE_LOG_BACKEND in ("sqlite", "both") else None
+                    Logger._writer = TradeLogWriter(csv_path, journal)
+                    atexit.register(Logger.shutdown)
+                writer = Logger._writer
+        return writer
+
     @staticmethod
     def log_trade(trading_pair: str, current_price: float, investment_amount: float,
                   quantity: float, wallet_balance: float, order_type: str,
                   stop_loss_price: Any, take_profit_price: Any,
                   initial_price: Any = None, profit: Any = None,
-                  buy_price: Any = None, sell_price: Any = None) -> None:
-        
-        # log trade details
+                  buy_price: Any = None, sell_price: Any = None,
+                  timestamp: Optional[float] = None) -> None:
+
+        # log trade details (queued; written by the background writer to the TRADE_LOG_BACKEND)
         # parameters:
         #  - trading_pair: Trading pair (e.g., BTCINR)
         #  - current_price: Price at time of trade logging
@@ -35,24 +161,25 @@ class Logger:
         #  - profit: Realized profit (if applicable)
         #  - buy_price: The price at which asset was bought
         #  - sell_price: The price at which asset was sold
-        
-        log_entry: Dict[str, Any] = {
-            "Time": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-            "Trading Pair": trading_pair,
-            "Order Type": order_type.capitalize(),
-            "Current Price": current_price,
-            "Investment": investment_amount,
-            "Quantity": quantity,
-            "Wallet Balance": wallet_balance,
-            "Stop-Loss Price": stop_loss_price,
-            "Take-Profit Price": take_profit_price,
-            "Initial Price": initial_price,
-            "Buy Price": buy_price,
-            "Sell Price": sell_price,
-            "Profit": profit
-        }
-        df = pd.DataFrame([log_entry])
-        log_file_path = Logger._get_log_file_path()
-        df.to_csv(log_file_path, mode='a' if os.path.exists(log_file_path) else 'w',
-                  header=not os.path.exists(log_file_path), index=False)
+        #  - timestamp: Unix time of the trade (defaults to now; replays pass their virtual time)
+
+        Logger._get_writer().put((
+            time.time() if timestamp is None else timestamp, trading_pair, order_type.capitalize(), current_price, investment_amount,
+            quantity, wallet_balance, stop_loss_price, take_profit_price, initial_price,
+            buy_price, sell_price, profit
+        ))
         print(f"✅ {order_type.capitalize()} trade logged successfully!")
+
+    @staticmethod
+    def flush(timeout: Optional[float] = None) -> bool:
+        # wait until every logged trade is written
+        writer = Logger._writer
+        return writer.flush(timeout) if writer else True
+
+    @staticmethod
+    def shutdown() -> None:
+        # write out queued trades and close the file; the next log_trade starts a new writer
+        with Logger._writer_lock:
+            writer, Logger._writer = Logger._writer, None
+        if writer:
+            writer.close()
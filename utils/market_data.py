@@ -1,63 +1,221 @@
-import requests
+import time
+import threading
 import json
-from typing import Any, Dict
-from config.settings import DEBUG_MODE
+from typing import Any, Dict, List, Optional
+from utils.http_client import get_client
+from config.settings import DEBUG_MODE, MARKET_DETAILS_TTL, MARKET_DETAILS_BACKGROUND_REFRESH, TICKER_MAX_AGE
+from utils.lazy_imports import lazy_import
+requests = lazy_import("requests")
 
-class MarketData:
-    
-    # provides methods to retrieve market details and real-time price data
-    
+MARKETS_DETAILS_ENDPOINT = "/exchange/v1/markets_details"
+TICKER_ENDPOINT = "/exchange/ticker"
+
+class MarketDetailsCache:
+
+    # process-wide cache of the markets_details list, indexed once by symbol and by pair
+    # entries expire after `ttl` seconds; a daemon thread can keep them fresh in the background
+
+    def __init__(self, ttl: float = MARKET_DETAILS_TTL,
+                 background_refresh: bool = MARKET_DETAILS_BACKGROUND_REFRESH) -> None:
+        self.ttl = ttl
+        self.background_refresh = background_refresh
+        self._by_symbol: Dict[str, Dict[str, Any]] = {}
+        self._by_pair: Dict[str, Dict[str, Any]] = {}
+        self._loaded_at = 0.0
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._refresh_thread: Optional[threading.Thread] = None
 
     @staticmethod
-    def get_market_details(trading_pair: str) -> Dict[str, Any]:
+    def _download() -> List[Dict[str, Any]]:
+        # download the full markets_details list
         
-        # retrieve detailed market information for the specified trading pair
-        
-        url = "https://api.coindcx.com/exchange/v1/markets_details"
+        client = get_client()
         if DEBUG_MODE:
-            print(f"🔍 Fetching market details from URL: {url}")
+            print(f"🔍 Fetching market details from URL: {client.url(MARKETS_DETAILS_ENDPOINT)}")
         try:
-            response = requests.get(url)
+            response = client.get(MARKETS_DETAILS_ENDPOINT)
             if DEBUG_MODE:
                 print(f"➡️ Response Status Code: {response.status_code}")
             if response.status_code == 200:
                 markets = response.json()
                 if DEBUG_MODE:
                     print(f"🔍 Total Markets Fetched: {len(markets)}")
-                for market in markets:
-                    if market.get('symbol') == trading_pair:
-                        if DEBUG_MODE:
-                            print(f"🔍 Market details found for {trading_pair}: {market}")
-                        return market
-                raise ValueError(f"❌ Trading pair {trading_pair} not found.")
-            else:
-                raise Exception(f"❌ Failed to fetch market details: {response.status_code}")
+                return markets
+            raise Exception(f"❌ Failed to fetch market details: {response.status_code}")
         except requests.exceptions.RequestException as e:
             raise Exception(f"❌ Request failed: {e}")
 
-    @staticmethod
-    def fetch_real_time_price(trading_pair: str) -> float:   
-        # retrieve the current market price for the specified trading pair
+    def _load(self) -> None:
+        # download the markets list and rebuild both indexes, swapping them in atomically
+        
+        markets = self._download()
+        by_symbol = {market["symbol"]: market for market in markets if market.get("symbol")}
+        by_pair = {market["pair"]: market for market in markets if market.get("pair")}
+        with self._lock:
+            self._by_symbol = by_symbol
+            self._by_pair = by_pair
+            self._loaded_at = time.monotonic()
+
+    def refresh(self) -> None:
+        # reload now and, if enabled, keep the cache warm from then on
+        
+        self._load()
+        if self.background_refresh:
+            self.start_background_refresh()
+
+    def is_stale(self) -> bool:
+        return not self._by_symbol or (time.monotonic() - self._loaded_at) >= self.ttl
+
+    def get(self, trading_pair: str) -> Optional[Dict[str, Any]]:
+        # return the market entry for a symbol (e.g. BTCINR) or an API pair (e.g. I-BTC_INR)
+        
+        self.warm()
+        market = self._by_symbol.get(trading_pair) or self._by_pair.get(trading_pair)
+        if DEBUG_MODE and market:
+            print(f"🔍 Market details found for {trading_pair}: {market}")
+        return market
+
+    def warm(self) -> None:
+        # download the markets list unless it is fresh; safe from several threads (startup warm-up, lookups)
+        
+        if self.is_stale():
+            with self._refresh_lock:
+                # only one caller downloads; the rest reuse its result
+                if self.is_stale():
+                    self.refresh()
+
+    def invalidate(self) -> None:
+        # force the next lookup to download the markets list again
+        
+        with self._lock:
+            self._loaded_at = 0.0
+
+    def start_background_refresh(self) -> None:
+        if self._refresh_thread and self._refresh_thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._refresh_thread = threading.Thread(target=self._refresh_loop, name="market-details-refresh", daemon=True)
+        self._refresh_thread.start()
+
+    def stop_background_refresh(self) -> None:
+        self._stop_event.set()
+
+    def _refresh_loop(self) -> None:
+        # refresh slightly before expiry so foreground lookups never block on a download
+        
+        while not self._stop_event.wait(self.ttl * 0.9):
+            try:
+                self._load()
+            except Exception as e:
+                if DEBUG_MODE:
+                    print(f"❌ Background market details refresh failed: {e}")
+
+market_details_cache = MarketDetailsCache()
+
+class TickerSnapshot:
+
+    # a single download of the ticker endpoint, indexed by market so any number of pairs can be priced from it
+
+    def __init__(self, tickers: List[Dict[str, Any]], fetched_at: Optional[float] = None) -> None:
+        self.fetched_at = time.monotonic() if fetched_at is None else fetched_at
+        self._tickers: Dict[str, Dict[str, Any]] = {}
+        self._prices: Dict[str, float] = {}
+        for ticker in tickers:
+            market = ticker.get("market")
+            if market:
+                self._tickers[market] = ticker
+                self._prices[market] = float(ticker.get("last_price", 0.0))
+
+    @classmethod
+    def fetch(cls) -> "TickerSnapshot":
+        # download the full ticker list once and index it
         
-        url = "https://api.coindcx.com/exchange/ticker"
         if DEBUG_MODE:
-            print("🔍 Fetching real-time price from Ticker API.")
+            print("🔍 Fetching ticker snapshot from Ticker API.")
         try:
-            response = requests.get(url)
+            response = get_client().get(TICKER_ENDPOINT)
             if DEBUG_MODE:
                 print(f"➡️ Response Status Code: {response.status_code}")
             if response.status_code == 200:
-                ticker_data = response.json()
+                snapshot = cls(response.json())
                 if DEBUG_MODE:
-                    print(f"🔍 Ticker Data Fetched: {ticker_data}")
-                for ticker in ticker_data:
-                    if ticker.get("market") == trading_pair:
-                        latest_price = float(ticker.get("last_price", 0.0))
-                        if DEBUG_MODE:
-                            print(f"🔍 Real-Time Price of {trading_pair}: {latest_price}")
-                        return latest_price
-                raise ValueError(f"❌ Trading pair {trading_pair} not found in Ticker API data.")
-            else:
-                raise Exception(f"❌ Failed to fetch price: {response.status_code}")
+                    print(f"🔍 Ticker Snapshot Markets: {len(snapshot)}")
+                return snapshot
+            raise Exception(f"❌ Failed to fetch price: {response.status_code}")
         except requests.exceptions.RequestException as e:
             raise Exception(f"❌ Request failed: {e}")
+
+    def __len__(self) -> int:
+        return len(self._prices)
+
+    def __contains__(self, trading_pair: str) -> bool:
+        return trading_pair in self._prices
+
+    def age(self) -> float:
+        return time.monotonic() - self.fetched_at
+
+    def is_stale(self, max_age: float = TICKER_MAX_AGE) -> bool:
+        return self.age() > max_age
+
+    def price(self, trading_pair: str) -> float:
+        # last traded price of a single market
+        
+        try:
+            return self._prices[trading_pair]
+        except KeyError:
+            raise ValueError(f"❌ Trading pair {trading_pair} not found in Ticker API data.")
+
+    def prices(self, trading_pairs: List[str]) -> Dict[str, float]:
+        # last traded prices for several markets; pairs missing from the ticker are left out
+        
+        return {pair: self._prices[pair] for pair in trading_pairs if pair in self._prices}
+
+    def ticker(self, trading_pair: str) -> Optional[Dict[str, Any]]:
+        # raw ticker entry (bid, ask, volume, ...) for a market
+        
+        return self._tickers.get(trading_pair)
+
+_snapshot_lock = threading.Lock()
+_latest_snapshot: Optional[TickerSnapshot] = None
+
+class MarketData:
+    
+    # provides methods to retrieve market details and real-time price data
+    
+
+    @staticmethod
+    def get_market_details(trading_pair: str) -> Dict[str, Any]:
+        
+        # retrieve detailed market information for the specified trading pair
+        
+        market = market_details_cache.get(trading_pair)
+        if market is None:
+            raise ValueError(f"❌ Trading pair {trading_pair} not found.")
+        return market
+
+    @staticmethod
+    def invalidate_market_details() -> None:
+        # drop cached market metadata, e.g. after a listing change
+        
+        market_details_cache.invalidate()
+
+    @staticmethod
+    def get_ticker_snapshot(max_age: float = TICKER_MAX_AGE) -> TickerSnapshot:
+        # return the shared ticker snapshot, downloading a new one if it is older than max_age seconds
+        
+        global _latest_snapshot
+        with _snapshot_lock:
+            if _latest_snapshot is None or _latest_snapshot.is_stale(max_age):
+                _latest_snapshot = TickerSnapshot.fetch()
+            return _latest_snapshot
+
+    @staticmethod
+    def fetch_real_time_price(trading_pair: str, max_age: float = TICKER_MAX_AGE) -> float:   
+        # retrieve the current market price for the specified trading pair
+        
+        latest_price = MarketData.get_ticker_snapshot(max_age).price(trading_pair)
+        if DEBUG_MODE:
+            print(f"🔍 Real-Time Price of {trading_pair}: {latest_price}")
+        return latest_price
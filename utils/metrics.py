@@ -0,0 +1,238 @@
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Optional, Tuple
+from config.settings import (METRICS_ENABLED, METRICS_PORT, METRICS_FILE, METRICS_FILE_INTERVAL,
+                             METRICS_RESERVOIR, DEBUG_MODE)
+from utils.lazy_imports import lazy_import
+# only needed once the endpoint is served
+http_server = lazy_import("http.server")
+
+QUANTILES = (0.5, 0.95, 0.99)
+PREFIX = "tradingbot_"
+
+# (metric name, sorted label items)
+_Key = Tuple[str, Tuple[Tuple[str, str], ...]]
+
+class _LatencySummary:
+
+    # count and sum of every observation plus a ring of the latest ones for quantiles
+
+    __slots__ = ("count", "total", "samples")
+
+    def __init__(self, reservoir: int) -> None:
+        self.count = 0
+        self.total = 0.0
+        self.samples: Deque[float] = deque(maxlen=reservoir)
+
+    def observe(self, seconds: float) -> None:
+        self.count += 1
+        self.total += seconds
+        self.samples.append(seconds)
+
+    def quantiles(self) -> Dict[float, float]:
+        ordered = sorted(self.samples)
+        if not ordered:
+            return {q: 0.0 for q in QUANTILES}
+        return {q: ordered[min(len(ordered) - 1, int(q * len(ordered)))] for q in QUANTILES}
+
+class _Span:
+
+    # times one stage; an exception inside the span is counted as an error for that stage
+
+    __slots__ = ("registry", "key", "start")
+
+    def __init__(self, registry: "MetricsRegistry", key: _Key) -> None:
+        self.registry = registry
+        self.key = key
+
+    def __enter__(self) -> "_Span":
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type: Any, exc: Any, tb: Any) -> None:
+        self.registry._observe(self.key, time.perf_counter() - self.start, exc_type is not None)
+
+class _NoopSpan:
+
+    # shared span used while metrics are disabled: entering and leaving it costs two method calls
+
+    __slots__ = ()
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, exc_type: Any, exc: Any, tb: Any) -> None:
+        return None
+
+_NOOP_SPAN = _NoopSpan()
+
+class MetricsRegistry:
+
+    # stage latencies and counters for the trading loop, exported in Prometheus text format
+    # span("stage", label=value) times a block; while disabled it returns a shared no-op span, so
+    # instrumented code pays one attribute check per stage
+    # latencies become summaries: <name>_seconds{quantile="0.5|0.95|0.99"} over the last
+    # `reservoir` observations, plus _count and _sum over the whole run
+
+    def __init__(self, enabled: bool = METRICS_ENABLED, reservoir: int = METRICS_RESERVOIR) -> None:
+        self.enabled = enabled
+        self.reservoir = reservoir
+        self._summaries: Dict[_Key, _LatencySummary] = {}
+        self._counters: Dict[_Key, float] = {}
+        self._lock = threading.Lock()
+        self._server: Optional[Any] = None
+        self._writer_stop = threading.Event()
+        self._writer: Optional[threading.Thread] = None
+
+    @staticmethod
+    def _key(name: str, labels: Dict[str, Any]) -> _Key:
+        return name, tuple(sorted((label, str(value)) for label, value in labels.items()))
+
+    def span(self, name: str, **labels: Any) -> Any:
+        if not self.enabled:
+            return _NOOP_SPAN
+        return _Span(self, self._key(name, labels))
+
+    def observe(self, name: str, seconds: float, **labels: Any) -> None:
+        # record a latency measured elsewhere (e.g. from timestamps carried with a price update)
+        if self.enabled:
+            self._observe(self._key(name, labels), seconds, False)
+
+    def increment(self, name: str, amount: float = 1.0, **labels: Any) -> None:
+        if self.enabled:
+            key = self._key(name, labels)
+            with self._lock:
+                self._counters[key] = self._counters.get(key, 0.0) + amount
+
+    def _observe(self, key: _Key, seconds: float, failed: bool) -> None:
+        with self._lock:
+            summary = self._summaries.get(key)
+            if summary is None:
+                summary = self._summaries[key] = _LatencySummary(self.reservoir)
+            summary.observe(seconds)
+            if failed:
+                error_key = (f"{key[0]}_errors", key[1])
+                self._counters[error_key] = self._counters.get(error_key, 0.0) + 1
+
+    def reset(self) -> None:
+        with self._lock:
+            self._summaries.clear()
+            self._counters.clear()
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        # {"stage{label=value}": {"count", "sum", "p50", "p95", "p99"}} for printing and tests
+
+        with self._lock:
+            items = [(key, summary.count, summary.total, summary.quantiles())
+                     for key, summary in self._summaries.items()]
+        return {_series(name, labels): {"count": count, "sum": total, "p50": quantiles[0.5],
+                                        "p95": quantiles[0.95], "p99": quantiles[0.99]}
+                for (name, labels), count, total, quantiles in items}
+
+    def render(self) -> str:
+        # Prometheus text exposition format 0.0.4
+
+        with self._lock:
+            summaries = [(key, summary.count, summary.total, summary.quantiles())
+                         for key, summary in sorted(self._summaries.items())]
+            counters = sorted(self._counters.items())
+        lines = []
+        declared = set()
+        for (name, labels), count, total, quantiles in summaries:
+            metric = f"{PREFIX}{name}_seconds"
+            if metric not in declared:
+                declared.add(metric)
+                lines.append(f"# HELP {metric} Latency of the {name} stage in seconds")
+                lines.append(f"# TYPE {metric} summary")
+            for q, value in quantiles.items():
+                lines.append(f"{_series(metric, labels + (('quantile', str(q)),))} {value!r}")
+            lines.append(f"{_series(metric + '_sum', labels)} {total!r}")
+            lines.append(f"{_series(metric + '_count', labels)} {count}")
+        for (name, labels), value in counters:
+            metric = f"{PREFIX}{name}_total"
+            if metric not in declared:
+                declared.add(metric)
+                lines.append(f"# TYPE {metric} counter")
+            lines.append(f"{_series(metric, labels)} {value!r}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, path: str) -> None:
+        # atomic write for the node_exporter textfile collector
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(self.render())
+        os.replace(tmp_path, path)
+
+    def serve(self, port: int, host: str = "127.0.0.1") -> int:
+        # expose /metrics on a local port; returns the bound port (0 picks a free one)
+
+        registry = self
+
+        class _Handler(http_server.BaseHTTPRequestHandler):
+            def log_message(self, format: str, *args: Any) -> None:
+                pass
+
+            def do_GET(self) -> None:
+                if self.path.split("?")[0] not in ("/metrics", "/"):
+                    self.send_error(404)
+                    return
+                data = registry.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+        self._server = http_server.ThreadingHTTPServer((host, port), _Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name="metrics-endpoint", daemon=True).start()
+        return self._server.server_address[1]
+
+    def start_file_writer(self, path: str, interval: float = METRICS_FILE_INTERVAL) -> None:
+        def _run() -> None:
+            while not self._writer_stop.wait(interval):
+                try:
+                    self.write(path)
+                except OSError as e:
+                    print(f"❌ Failed to write metrics file: {e}")
+            self.write(path)
+
+        self._writer_stop.clear()
+        self._writer = threading.Thread(target=_run, name="metrics-file", daemon=True)
+        self._writer.start()
+
+    def start_exporters(self, port: Optional[int] = METRICS_PORT, path: Optional[str] = METRICS_FILE) -> None:
+        # enable collection and start the configured exporters (endpoint and/or file)
+
+        self.enabled = True
+        if port is not None and self._server is None:
+            bound = self.serve(port)
+            print(f"📈 Metrics available at http://127.0.0.1:{bound}/metrics")
+        if path and self._writer is None:
+            self.start_file_writer(path)
+            if DEBUG_MODE:
+                print(f"🔍 Writing metrics to {path} every {METRICS_FILE_INTERVAL}s")
+
+    def stop_exporters(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+        if self._writer is not None:
+            self._writer_stop.set()
+            self._writer.join()
+            self._writer = None
+
+def _series(name: str, labels: Tuple[Tuple[str, str], ...]) -> str:
+    if not labels:
+        return name
+    escaped = ",".join(f'{label}="{_escape(value)}"' for label, value in labels)
+    return f"{name}{{{escaped}}}"
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+metrics = MetricsRegistry()
@@ -0,0 +1,214 @@
+from __future__ import annotations
+import os
+import struct
+from typing import Dict, Optional
+from config.settings import OHLCV_ARCHIVE_DIR, DEBUG_MODE
+from utils.candle_store import CandleStore
+from utils.market_data import MarketData
+from utils.lazy_imports import lazy_import
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+# file layout: a 64-byte header followed by six fixed-width columns of `capacity` slots each
+#   header: magic (8s), version (I), padding (I), capacity (q), count (q), interval (16s), reserved (16x)
+#   columns: time (int64 ms), open, high, low, close, volume (float64)
+MAGIC = b"OHLCVARC"
+VERSION = 1
+HEADER = struct.Struct("<8sIIqq16s16x")
+HEADER_SIZE = 64
+COLUMNS = ("time", "open", "high", "low", "close", "volume")
+DTYPES = {"time": "int64", "open": "float64", "high": "float64",
+          "low": "float64", "close": "float64", "volume": "float64"}
+ITEM_SIZE = 8
+
+INTERVAL_MS = {
+    "1m": 60_000, "5m": 300_000, "15m": 900_000, "30m": 1_800_000,
+    "1h": 3_600_000, "2h": 7_200_000, "4h": 14_400_000, "6h": 21_600_000, "8h": 28_800_000,
+    "1d": 86_400_000, "3d": 259_200_000, "1w": 604_800_000, "1M": 2_592_000_000,
+}
+
+class OhlcvArchive:
+
+    # memory-mapped columnar OHLCV file for one pair/interval
+    # columns are plain arrays, so a time-range slice is a zero-copy view found by binary search
+
+    def __init__(self, path: str, writable: bool = False) -> None:
+        self.path = path
+        self.writable = writable
+        self._open()
+
+    @staticmethod
+    def path_for(trading_pair: str, interval: str, root: str = OHLCV_ARCHIVE_DIR) -> str:
+        return os.path.join(root, f"{trading_pair}_{interval}.ohlcv")
+
+    @classmethod
+    def create(cls, path: str, interval: str, capacity: int = 1 << 16) -> "OhlcvArchive":
+        # create an empty archive with room for `capacity` candles
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(HEADER.pack(MAGIC, VERSION, 0, capacity, 0, interval.encode("ascii")))
+            f.truncate(HEADER_SIZE + len(COLUMNS) * capacity * ITEM_SIZE)
+        return cls(path, writable=True)
+
+    @classmethod
+    def for_pair(cls, trading_pair: str, interval: str, writable: bool = False,
+                 root: str = OHLCV_ARCHIVE_DIR) -> "OhlcvArchive":
+        # open the archive for a pair/interval, creating it when opened for writing
+
+        path = cls.path_for(trading_pair, interval, root)
+        if writable and not os.path.exists(path):
+            return cls.create(path, interval)
+        return cls(path, writable=writable)
+
+    @classmethod
+    def load(cls, trading_pair: str, interval: str, start_ms: Optional[int] = None, end_ms: Optional[int] = None,
+             root: str = OHLCV_ARCHIVE_DIR) -> Optional[pd.DataFrame]:
+        # candles of a pair/interval in [start_ms, end_ms) as a DataFrame for backtests and sweeps;
+        # None when there is no archive or no candles in the range
+
+        path = cls.path_for(trading_pair, interval, root)
+        if not os.path.exists(path):
+            return None
+        df = cls(path).to_dataframe(start_ms, end_ms)
+        return df if len(df) else None
+
+    def _open(self) -> None:
+        with open(self.path, "rb") as f:
+            magic, version, _, capacity, count, interval = HEADER.unpack(f.read(HEADER.size))
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"❌ {self.path} is not an OHLCV archive")
+        self.capacity = capacity
+        self.count = count
+        self.interval = interval.rstrip(b"\0").decode("ascii")
+        mode = "r+" if self.writable else "r"
+        self._columns: Dict[str, np.memmap] = {
+            name: np.memmap(self.path, dtype=DTYPES[name], mode=mode,
+                            offset=HEADER_SIZE + i * capacity * ITEM_SIZE, shape=(capacity,))
+            for i, name in enumerate(COLUMNS)
+        }
+
+    def __len__(self) -> int:
+        return self.count
+
+    def column(self, name: str) -> np.ndarray:
+        # zero-copy view of the filled part of a column
+
+        return self._columns[name][:self.count]
+
+    @property
+    def times(self) -> np.ndarray:
+        return self.column("time")
+
+    def first_time(self) -> Optional[int]:
+        return int(self._columns["time"][0]) if self.count else None
+
+    def last_time(self) -> Optional[int]:
+        return int(self._columns["time"][self.count - 1]) if self.count else None
+
+    def index_range(self, start_ms: Optional[int] = None, end_ms: Optional[int] = None) -> slice:
+        # binary search on the time column: candles with start_ms <= time < end_ms
+
+        times = self.times
+        lo = 0 if start_ms is None else int(np.searchsorted(times, start_ms, side="left"))
+        hi = self.count if end_ms is None else int(np.searchsorted(times, end_ms, side="left"))
+        return slice(lo, hi)
+
+    def range(self, start_ms: Optional[int] = None, end_ms: Optional[int] = None) -> Dict[str, np.ndarray]:
+        # zero-copy column views for a time range
+
+        window = self.index_range(start_ms, end_ms)
+        return {name: self._columns[name][window] for name in COLUMNS}
+
+    def to_dataframe(self, start_ms: Optional[int] = None, end_ms: Optional[int] = None) -> pd.DataFrame:
+        # copy a time range into a DataFrame shaped like HistoricalData.fetch's output
+
+        columns = self.range(start_ms, end_ms)
+        df = pd.DataFrame({name: np.array(columns[name]) for name in COLUMNS[1:]},
+                          index=pd.to_datetime(np.array(columns["time"]), unit="ms"))
+        df.index.name = "timestamp"
+        return df
+
+    def _grow(self, needed: int) -> None:
+        # rewrite the file with enough capacity; columns are fixed-width so every column moves
+
+        new_capacity = max(self.capacity * 2, needed)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(HEADER.pack(MAGIC, VERSION, 0, new_capacity, self.count, self.interval.encode("ascii")))
+            f.truncate(HEADER_SIZE + len(COLUMNS) * new_capacity * ITEM_SIZE)
+            for i, name in enumerate(COLUMNS):
+                f.seek(HEADER_SIZE + i * new_capacity * ITEM_SIZE)
+                f.write(np.ascontiguousarray(self.column(name)).tobytes())
+        self._columns = {}
+        os.replace(tmp_path, self.path)
+        self._open()
+
+    def _write_count(self) -> None:
+        with open(self.path, "r+b") as f:
+            f.write(HEADER.pack(MAGIC, VERSION, 0, self.capacity, self.count, self.interval.encode("ascii")))
+
+    def append(self, times: np.ndarray, open_: np.ndarray, high: np.ndarray, low: np.ndarray,
+               close: np.ndarray, volume: np.ndarray) -> int:
+        # append candles sorted by time; candles not newer than the last one are skipped, except
+        # that a candle at exactly the last time replaces it (revised open candle)
+        # returns the number of candles appended
+
+        if not self.writable:
+            raise ValueError("❌ Archive opened read-only")
+        times = np.asarray(times, dtype=np.int64)
+        values = [np.asarray(v, dtype=np.float64) for v in (open_, high, low, close, volume)]
+        last = self.last_time()
+        if last is not None and len(times):
+            same = np.nonzero(times == last)[0]
+            if len(same):
+                for name, column in zip(COLUMNS[1:], values):
+                    self._columns[name][self.count - 1] = column[same[-1]]
+            keep = times > last
+            times = times[keep]
+            values = [column[keep] for column in values]
+        n = len(times)
+        if n == 0:
+            return 0
+        if np.any(np.diff(times) <= 0):
+            raise ValueError("❌ Candles must be strictly increasing in time")
+        if self.count + n > self.capacity:
+            self._grow(self.count + n)
+        end = self.count + n
+        self._columns["time"][self.count:end] = times
+        for name, column in zip(COLUMNS[1:], values):
+            self._columns[name][self.count:end] = column
+        for column in self._columns.values():
+            column.flush()
+        self.count = end
+        self._write_count()
+        return n
+
+    def import_csv(self, csv_path: str) -> int:
+        # import a CSV with time (ms), open, high, low, close, volume columns (e.g. a candle store file)
+
+        df = pd.read_csv(csv_path, usecols=list(COLUMNS))
+        df = df.drop_duplicates(subset="time", keep="last").sort_values("time")
+        return self.append(df["time"].to_numpy(), df["open"].to_numpy(), df["high"].to_numpy(),
+                           df["low"].to_numpy(), df["close"].to_numpy(), df["volume"].to_numpy())
+
+    def import_from_api(self, trading_pair: str, start_ms: int, end_ms: int, page_size: int = 1000) -> int:
+        # page through the candles endpoint from start_ms to end_ms and append everything new
+
+        api_pair = MarketData.get_market_details(trading_pair).get("pair")
+        step = INTERVAL_MS[self.interval]
+        cursor = max(start_ms, (self.last_time() or start_ms - step) + step)
+        total = 0
+        while cursor < end_ms:
+            page_end = min(cursor + step * page_size, end_ms)
+            candles = CandleStore.download(api_pair, self.interval, start_time=cursor, end_time=page_end, limit=page_size)
+            if candles:
+                candles = sorted(c for c in candles if cursor <= c[0] < page_end)
+            if candles:
+                batch = np.array(candles, dtype=np.float64)
+                total += self.append(batch[:, 0].astype(np.int64), batch[:, 1], batch[:, 2],
+                                     batch[:, 3], batch[:, 4], batch[:, 5])
+            if DEBUG_MODE:
+                print(f"🔍 Archived {trading_pair} {self.interval} up to {page_end}: {total} candles")
+            cursor = page_end
+        return total
@@ -0,0 +1,212 @@
+import json
+from abc import ABC, abstractmethod
+import queue
+import socket
+import socketserver
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+from config.settings import (DEBUG_MODE, PRICE_FEED, PRICE_STREAM_HOST, PRICE_STREAM_PORT,
+                             PRICE_POLL_INTERVAL, PRICE_STREAM_RECONNECT_DELAY)
+from utils.market_data import MarketData
+
+# callback(trading_pair, price, timestamp)
+PriceCallback = Callable[[str, float, float], None]
+
+class PriceFeed(ABC):
+
+    # pushes price updates to subscribers; concrete feeds decide where the prices come from
+
+    def __init__(self) -> None:
+        self._subscribers: Dict[str, List[PriceCallback]] = {}
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def subscribe(self, trading_pair: str, callback: PriceCallback) -> None:
+        with self._lock:
+            self._subscribers.setdefault(trading_pair, []).append(callback)
+        self.start()
+
+    def unsubscribe(self, trading_pair: str, callback: PriceCallback) -> None:
+        with self._lock:
+            callbacks = self._subscribers.get(trading_pair, [])
+            if callback in callbacks:
+                callbacks.remove(callback)
+            if not callbacks:
+                self._subscribers.pop(trading_pair, None)
+
+    def subscribed_pairs(self) -> List[str]:
+        with self._lock:
+            return list(self._subscribers)
+
+    def _publish(self, trading_pair: str, price: float, timestamp: Optional[float] = None) -> None:
+        with self._lock:
+            callbacks = list(self._subscribers.get(trading_pair, ()))
+        timestamp = time.time() if timestamp is None else timestamp
+        for callback in callbacks:
+            callback(trading_pair, price, timestamp)
+
+    def _publish_snapshot(self) -> Dict[str, float]:
+        # one ticker download for every subscribed pair; returns the published prices
+
+        pairs = self.subscribed_pairs()
+        if not pairs:
+            return {}
+        prices = MarketData.get_ticker_snapshot().prices(pairs)
+        for pair, price in prices.items():
+            self._publish(pair, price)
+        return prices
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name=type(self).__name__, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+
+    @abstractmethod
+    def _run(self) -> None:
+        # feed thread: _publish prices until stop() is called
+        ...
+
+    def ticks(self, trading_pair: str, timeout: Optional[float] = None) -> Iterator[Optional[float]]:
+        # yield every price update for a pair; yields None when nothing arrived within `timeout` seconds
+
+        updates: "queue.Queue[float]" = queue.Queue()
+        callback = lambda pair, price, timestamp: updates.put(price)
+        self.subscribe(trading_pair, callback)
+        try:
+            while True:
+                try:
+                    yield updates.get(timeout=timeout)
+                except queue.Empty:
+                    yield None
+        finally:
+            self.unsubscribe(trading_pair, callback)
+
+class PollingPriceFeed(PriceFeed):
+
+    # polls the shared ticker snapshot every `interval` seconds, or as often as the attached
+    # scheduler says (scheduler.next_interval(prices) -> seconds until the next poll)
+
+    def __init__(self, interval: float = PRICE_POLL_INTERVAL, scheduler: Any = None) -> None:
+        super().__init__()
+        self.interval = interval
+        self.scheduler = scheduler
+        self._wake = threading.Event()
+
+    def subscribe(self, trading_pair: str, callback: PriceCallback) -> None:
+        # a new subscriber gets a price right away instead of after a long adaptive wait
+        super().subscribe(trading_pair, callback)
+        self._wake.set()
+
+    def stop(self) -> None:
+        super().stop()
+        self._wake.set()
+
+    def _run(self) -> None:
+        while not self._stop_event.is_set():
+            interval = self.interval
+            try:
+                prices = self._publish_snapshot()
+                if self.scheduler is not None:
+                    interval = self.scheduler.next_interval(prices)
+            except Exception as e:
+                print(f"\n❌ Failed to poll prices: {e}")
+            self._wake.wait(interval)
+            self._wake.clear()
+
+class StreamingPriceFeed(PriceFeed):
+
+    # reads pushed prices from a socket stream of newline-delimited JSON ticker messages
+    # ({"market": ..., "last_price": ...} or a list of them) and falls back to polling
+    # the REST ticker whenever the stream is unavailable
+
+    def __init__(self, host: str = PRICE_STREAM_HOST, port: int = PRICE_STREAM_PORT,
+                 poll_interval: float = PRICE_POLL_INTERVAL,
+                 reconnect_delay: float = PRICE_STREAM_RECONNECT_DELAY) -> None:
+        super().__init__()
+        self.host = host
+        self.port = port
+        self.poll_interval = poll_interval
+        self.reconnect_delay = reconnect_delay
+        self.streaming = False
+
+    def _handle_message(self, message: Any) -> None:
+        for ticker in (message if isinstance(message, list) else [message]):
+            market = ticker.get("market")
+            if market and "last_price" in ticker:
+                self._publish(market, float(ticker["last_price"]))
+
+    def _stream(self) -> None:
+        with socket.create_connection((self.host, self.port), timeout=self.reconnect_delay) as sock:
+            # without a read timeout a silent stream would never trigger the polling fallback
+            sock.settimeout(max(self.poll_interval, self.reconnect_delay) * 2)
+            self.streaming = True
+            if DEBUG_MODE:
+                print(f"🔍 Price stream connected to {self.host}:{self.port}")
+            with sock.makefile("r", encoding="utf-8") as stream:
+                for line in stream:
+                    if self._stop_event.is_set():
+                        return
+                    if line.strip():
+                        self._handle_message(json.loads(line))
+        raise ConnectionError("price stream closed")
+
+    def _run(self) -> None:
+        while not self._stop_event.is_set():
+            try:
+                self._stream()
+            except (OSError, ValueError) as e:
+                self.streaming = False
+                if DEBUG_MODE:
+                    print(f"\n⚠️ Price stream unavailable ({e}), polling ticker instead")
+                # poll until it is time to try the stream again
+                deadline = time.monotonic() + self.reconnect_delay
+                while not self._stop_event.is_set() and time.monotonic() < deadline:
+                    try:
+                        self._publish_snapshot()
+                    except Exception as poll_error:
+                        print(f"\n❌ Failed to poll prices: {poll_error}")
+                    self._stop_event.wait(self.poll_interval)
+
+def create_price_feed(poll_interval: float = PRICE_POLL_INTERVAL) -> PriceFeed:
+    # build the feed selected by PRICE_FEED in config/settings.py
+
+    if PRICE_FEED == "stream":
+        return StreamingPriceFeed(poll_interval=poll_interval)
+    return PollingPriceFeed(interval=poll_interval)
+
+class PriceReplayServer:
+
+    # local stand-in for a price stream: replays recorded ticker messages to every client
+
+    def __init__(self, messages: Iterable[Dict[str, Any]], host: str = "127.0.0.1", port: int = 0,
+                 interval: float = 0.0) -> None:
+        self.messages = list(messages)
+        self.interval = interval
+        replay = self
+
+        class _Handler(socketserver.StreamRequestHandler):
+            def handle(self) -> None:
+                for message in replay.messages:
+                    self.wfile.write((json.dumps(message) + "\n").encode("utf-8"))
+                    self.wfile.flush()
+                    if replay.interval:
+                        time.sleep(replay.interval)
+
+        self._server = socketserver.ThreadingTCPServer((host, port), _Handler)
+        self._server.daemon_threads = True
+        self.host, self.port = self._server.server_address[:2]
+
+    def start(self) -> "PriceReplayServer":
+        threading.Thread(target=self._server.serve_forever, name="price-replay", daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
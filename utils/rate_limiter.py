@@ -0,0 +1,194 @@
+import heapq
+import itertools
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+from config.settings import (RATE_LIMITS, RATE_LIMIT_GLOBAL, RATE_LIMIT_PRIORITIES,
+                             RATE_LIMIT_BACKOFF, RATE_LIMIT_MAX_BACKOFF, DEBUG_MODE)
+
+class TokenBucket:
+
+    # `rate` tokens per second, holding at most `burst`; not thread-safe, the scheduler locks around it
+
+    def __init__(self, rate: float, burst: float) -> None:
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+
+    def refill(self, now: float) -> None:
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def ready(self, now: float) -> bool:
+        return now >= self.blocked_until and self.tokens >= 1.0
+
+    def wait_time(self, now: float) -> float:
+        # seconds until a token is available
+        if now < self.blocked_until:
+            return self.blocked_until - now
+        return max(0.0, (1.0 - self.tokens) / self.rate) if self.rate > 0 else 1.0
+
+class LaneStats:
+
+    # counters for one endpoint class
+
+    def __init__(self) -> None:
+        self.granted = 0
+        self.waited = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self.throttled = 0
+
+    def record(self, waited: float) -> None:
+        self.granted += 1
+        if waited >= 0.001:
+            self.waited += 1
+            self.wait_seconds += waited
+            self.max_wait_seconds = max(self.max_wait_seconds, waited)
+
+class RequestScheduler:
+
+    # client-side rate limiting for every exchange request
+    # each endpoint class has a token bucket and all classes share a global bucket; callers wait in
+    # one queue ordered by priority lane (order creates and cancels first, then order queries and account,
+    # then market data), so when the global budget is short an order is never stuck behind polling
+    # a 429 blocks the offending class for Retry-After (or an exponential backoff)
+
+    def __init__(self, limits: Optional[Dict[str, Tuple[float, float]]] = None,
+                 global_limit: Optional[Tuple[float, float]] = RATE_LIMIT_GLOBAL,
+                 priorities: Optional[Dict[str, int]] = None) -> None:
+        limits = RATE_LIMITS if limits is None else limits
+        self.buckets: Dict[str, TokenBucket] = {name: TokenBucket(*limit) for name, limit in limits.items()}
+        self.global_bucket = TokenBucket(*global_limit) if global_limit else None
+        self.priorities = dict(RATE_LIMIT_PRIORITIES if priorities is None else priorities)
+        self._waiters: List[tuple] = []
+        self._seq = itertools.count()
+        self._condition = threading.Condition()
+        self._stats: Dict[str, LaneStats] = {}
+        self._consecutive_429: Dict[str, int] = {}
+
+    def priority_for(self, endpoint_class: str) -> int:
+        return self.priorities.get(endpoint_class, self.priorities.get("default", 2))
+
+    def _bucket(self, endpoint_class: str) -> Optional[TokenBucket]:
+        return self.buckets.get(endpoint_class, self.buckets.get("default"))
+
+    def _refill(self, now: float) -> None:
+        for bucket in self.buckets.values():
+            bucket.refill(now)
+        if self.global_bucket is not None:
+            self.global_bucket.refill(now)
+
+    def _can_go(self, entry: tuple, now: float) -> bool:
+        # the caller may proceed if its class has a token and no earlier-lane waiter is owed the
+        # global token; waiters held back only by their own class bucket do not block other classes
+
+        bucket = self._bucket(entry[2])
+        if bucket is not None and not bucket.ready(now):
+            return False
+        if self.global_bucket is None:
+            return True
+        if not self.global_bucket.ready(now):
+            return False
+        for waiter in sorted(self._waiters):
+            if waiter is entry:
+                return True
+            waiter_bucket = self._bucket(waiter[2])
+            if waiter_bucket is None or waiter_bucket.ready(now):
+                return False
+        return True
+
+    def _next_wait(self, entry: tuple, now: float) -> float:
+        bucket = self._bucket(entry[2])
+        wait = bucket.wait_time(now) if bucket is not None else 0.0
+        if self.global_bucket is not None:
+            wait = max(wait, self.global_bucket.wait_time(now))
+        # waiters leaving and new 429 blocks notify the condition, so sleeping until the next token is enough
+        return max(wait, 0.001)
+
+    def acquire(self, endpoint_class: str, priority: Optional[int] = None,
+                timeout: Optional[float] = None) -> float:
+        # block until a request of this class may be sent; returns the seconds spent waiting
+
+        priority = self.priority_for(endpoint_class) if priority is None else priority
+        start = time.monotonic()
+        deadline = None if timeout is None else start + timeout
+        with self._condition:
+            entry = (priority, next(self._seq), endpoint_class)
+            heapq.heappush(self._waiters, entry)
+            try:
+                while True:
+                    now = time.monotonic()
+                    self._refill(now)
+                    bucket = self._bucket(endpoint_class)
+                    if self._can_go(entry, now):
+                        if bucket is not None:
+                            bucket.tokens -= 1.0
+                        if self.global_bucket is not None:
+                            self.global_bucket.tokens -= 1.0
+                        break
+                    if deadline is not None and now >= deadline:
+                        raise TimeoutError(f"rate limiter: no {endpoint_class} slot within {timeout}s")
+                    wait = self._next_wait(entry, now)
+                    if deadline is not None:
+                        wait = min(wait, deadline - now)
+                    self._condition.wait(wait)
+            finally:
+                self._waiters.remove(entry)
+                heapq.heapify(self._waiters)
+                self._condition.notify_all()
+            waited = time.monotonic() - start
+            self._stats.setdefault(endpoint_class, LaneStats()).record(waited)
+        return waited
+
+    def throttled(self, endpoint_class: str, retry_after: Optional[float] = None) -> float:
+        # the exchange answered 429: block the class for Retry-After, or an exponential backoff
+        # returns the block in seconds
+
+        with self._condition:
+            count = self._consecutive_429.get(endpoint_class, 0) + 1
+            self._consecutive_429[endpoint_class] = count
+            delay = retry_after if retry_after is not None else min(
+                RATE_LIMIT_MAX_BACKOFF, RATE_LIMIT_BACKOFF * (2 ** (count - 1)))
+            bucket = self._bucket(endpoint_class)
+            if bucket is not None:
+                bucket.blocked_until = max(bucket.blocked_until, time.monotonic() + delay)
+                bucket.tokens = 0.0
+            self._stats.setdefault(endpoint_class, LaneStats()).throttled += 1
+            self._condition.notify_all()
+        if DEBUG_MODE:
+            print(f"⚠️ Rate limited on {endpoint_class}, pausing it for {delay:.2f}s")
+        return delay
+
+    def succeeded(self, endpoint_class: str) -> None:
+        # a non-429 answer resets the class backoff
+        if self._consecutive_429.get(endpoint_class):
+            with self._condition:
+                self._consecutive_429[endpoint_class] = 0
+
+    def queue_depth(self) -> Dict[str, int]:
+        # callers currently waiting, per endpoint class
+        with self._condition:
+            depth: Dict[str, int] = {}
+            for _, _, endpoint_class in self._waiters:
+                depth[endpoint_class] = depth.get(endpoint_class, 0) + 1
+            return depth
+
+    def metrics(self) -> Dict[str, Dict[str, float]]:
+        depth = self.queue_depth()
+        with self._condition:
+            classes = set(self._stats) | set(depth)
+            metrics = {}
+            for name in sorted(classes):
+                stats = self._stats.get(name, LaneStats())
+                metrics[name] = {
+                    "queue_depth": depth.get(name, 0),
+                    "granted": stats.granted,
+                    "waited": stats.waited,
+                    "avg_wait_ms": stats.wait_seconds / stats.waited * 1000 if stats.waited else 0.0,
+                    "max_wait_ms": stats.max_wait_seconds * 1000,
+                    "throttled": stats.throttled,
+                }
+            return metrics
@@ -0,0 +1,87 @@
+import hashlib
+import hmac
+import json
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+from config.settings import API_KEY, API_SECRET
+
+# compact JSON with the payload's own key order; rejects NaN/Infinity, which are not JSON
+_ENCODER = json.JSONEncoder(separators=(",", ":"), ensure_ascii=False, allow_nan=False)
+
+class RequestSigner:
+
+    # signs CoinDCX private API requests
+    # the payload is serialized once to compact JSON; those exact bytes are both the signed string
+    # and the request body, so the exchange always verifies what was sent
+    # the HMAC is keyed once and copied per request instead of re-deriving the key pads every call
+
+    def __init__(self, api_key: str = API_KEY, api_secret: str = API_SECRET) -> None:
+        self.api_key = api_key
+        self._keyed = hmac.new(api_secret.encode("utf-8"), digestmod=hashlib.sha256)
+
+    @staticmethod
+    def canonical_body(payload: Dict[str, Any]) -> bytes:
+        return _ENCODER.encode(payload).encode("utf-8")
+
+    def sign(self, body: bytes) -> str:
+        mac = self._keyed.copy()
+        mac.update(body)
+        return mac.hexdigest()
+
+    def sign_payload(self, payload: Dict[str, Any]) -> Tuple[bytes, Dict[str, str]]:
+        # add a timestamp if missing; returns (body to send, auth headers)
+
+        if "timestamp" not in payload:
+            payload["timestamp"] = int(time.time() * 1000)
+        body = self.canonical_body(payload)
+        return body, {
+            "Content-Type": "application/json",
+            "X-AUTH-APIKEY": self.api_key,
+            "X-AUTH-SIGNATURE": self.sign(body),
+        }
+
+_signer: Optional[RequestSigner] = None
+_signer_lock = threading.Lock()
+
+def get_signer() -> RequestSigner:
+    # process-wide signer for the configured API credentials
+
+    global _signer
+    if _signer is None:
+        with _signer_lock:
+            if _signer is None:
+                _signer = RequestSigner()
+    return _signer
+
+def benchmark(iterations: int = 100000) -> Dict[str, float]:
+    # microseconds per signed request body: the old path (str()-replace + fresh HMAC, then requests'
+    # own json.dumps of the payload for the body) against one canonical encode + pre-keyed HMAC
+
+    payload = {"market": "BTCINR", "side": "buy", "order_type": "limit_order", "price_per_unit": 8952183.33,
+               "total_quantity": 0.01675, "stop_loss": 8862661.4967, "take_profit": 9086466.07995,
+               "timestamp": 1700000000000}
+    secret = "x" * 64
+    signer = RequestSigner(api_secret=secret)
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        payload_str = str(payload).replace("'", '"')
+        hmac.new(secret.encode("utf-8"), payload_str.encode("utf-8"), hashlib.sha256).hexdigest()
+        json.dumps(payload).encode("utf-8")
+    legacy = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        signer.sign_payload(payload)
+    current = time.perf_counter() - start
+    return {
+        "legacy_us": legacy / iterations * 1e6,
+        "signer_us": current / iterations * 1e6,
+        "speedup": legacy / current,
+    }
+
+if __name__ == "__main__":
+    results = benchmark()
+    print(f"⏱️ Legacy sign + body: {results['legacy_us']:.2f} us | RequestSigner: {results['signer_us']:.2f} us "
+          f"| {results['speedup']:.1f}x faster")
@@ -0,0 +1,94 @@
+import time
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, List, Optional
+from config.settings import DEBUG_MODE, GRANULARITY, LAZY_MODULES, STARTUP_WARMUP_WORKERS
+from utils.lazy_imports import LAZY_IMPORT_TIMES, preload
+
+class StartupWarmup:
+
+    # fills what the first trading cycle needs on worker threads, in parallel with the prompts and authentication:
+    # the lazily imported modules, the market metadata and, once the pairs are known, their candles
+    # every task is best effort: a failure is reported and the trading loop simply loads the data itself
+
+    def __init__(self, max_workers: int = STARTUP_WARMUP_WORKERS) -> None:
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="warmup")
+        self._tasks: Dict[str, Future] = {}
+        self.timings: Dict[str, float] = {}
+        self.errors: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self._market_details: Optional[Future] = None
+
+    def _submit(self, name: str, func: Callable[..., Any], *args: Any) -> Future:
+        def task() -> Any:
+            start = time.perf_counter()
+            try:
+                return func(*args)
+            except Exception as e:
+                with self._lock:
+                    self.errors[name] = str(e)
+                return None
+            finally:
+                with self._lock:
+                    self.timings[name] = time.perf_counter() - start
+
+        future = self._pool.submit(task)
+        self._tasks[name] = future
+        return future
+
+    @staticmethod
+    def _import(name: str) -> None:
+        if not preload(name):
+            raise ImportError(f"{name} is not installed")
+
+    @staticmethod
+    def _market_details_task() -> None:
+        from utils.market_data import market_details_cache
+        market_details_cache.warm()
+
+    def start(self) -> "StartupWarmup":
+        # heavy imports and the markets list; nothing here needs the user's answers
+
+        for name in LAZY_MODULES:
+            self._submit(f"import {name}", self._import, name)
+        self._market_details = self._submit("market details", self._market_details_task)
+        return self
+
+    def _candles_task(self, trading_pair: str, timeframe: str) -> None:
+        from utils.historical_data import HistoricalData
+        # the pair lookup needs the markets list, so let its download finish instead of starting a second one
+        if self._market_details is not None:
+            self._market_details.result()
+        if HistoricalData.fetch(trading_pair, timeframe) is None:
+            raise Exception(f"no candles for {trading_pair}")
+
+    def warm_pairs(self, trading_pairs: List[str], timeframe: str = GRANULARITY) -> None:
+        # sync the candle store for every pair, one task each
+
+        for trading_pair in trading_pairs:
+            self._submit(f"candles {trading_pair}", self._candles_task, trading_pair, timeframe)
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        # block until the submitted tasks are done (True) or the timeout passes (False); the pool is shut down
+        # either way and unfinished tasks keep running in the background
+
+        _, pending = wait(list(self._tasks.values()), timeout=timeout)
+        self._pool.shutdown(wait=False)
+        if DEBUG_MODE:
+            self.print_report()
+        return not pending
+
+    def print_report(self) -> None:
+        with self._lock:
+            timings = dict(self.timings)
+            errors = dict(self.errors)
+        print("\n🔥 Startup Warm-up:")
+        for name in self._tasks:
+            if name not in timings:
+                print(f"⏳ {name}: still running")
+            elif name in errors:
+                print(f"⚠️ {name}: failed after {timings[name] * 1000:.0f} ms ({errors[name]})")
+            else:
+                print(f"✅ {name}: {timings[name] * 1000:.0f} ms")
+        for name, (seconds, thread) in sorted(LAZY_IMPORT_TIMES.items()):
+            print(f"➡️ import {name} took {seconds * 1000:.0f} ms on {thread}")
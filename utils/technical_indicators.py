@@ -1,7 +1,11 @@
-import pandas_ta as ta
-import pandas as pd
+from __future__ import annotations
+import time
 from config.settings import DEBUG_MODE
+from utils.metrics import metrics
 from typing import Any
+from utils.lazy_imports import lazy_import
+ta = lazy_import("pandas_ta")
+pd = lazy_import("pandas")
 
 class TechnicalIndicators:
     
@@ -11,6 +15,7 @@ class TechnicalIndicators:
     def calculate(df: pd.DataFrame) -> pd.DataFrame:
         # compute and add technical indicators (RSI, MACD, EMA, Bollinger Bands, ATR, Stochastic Oscillator)
         
+        start = time.perf_counter()
         try:
             # calculate Relative Strength Index (RSI)
             df["RSI"] = ta.rsi(df["close"], length=14
@@ -49,6 +54,7 @@ class TechnicalIndicators:
             
             # pass through volume data
             df["Volume"] = df["volume"]
+            metrics.observe("indicators_calculate", time.perf_counter() - start)
 
             if DEBUG_MODE:
                 print("🔍 Technical Indicators Calculated:")
@@ -56,4 +62,5 @@ class TechnicalIndicators:
             return df
         except Exception as e:
             print(f"❌ Error calculating indicators: {e}")
+            metrics.increment("indicators_calculate_errors")
             return df
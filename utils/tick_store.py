@@ -0,0 +1,199 @@
+import os
+import struct
+import threading
+import time
+from datetime import datetime
+from typing import BinaryIO, Dict, Iterable, Iterator, List, Optional, Tuple
+from config.settings import DEBUG_MODE, PRICE_POLL_INTERVAL, TICK_DATA_DIR
+from utils.clock import VirtualClock
+from utils.price_feed import PriceCallback, PriceFeed, create_price_feed
+
+# file layout: MAGIC, then records that start with a type byte
+#   pair definition: type 1, pair id (uint16), name length (uint8), name (ascii)
+#   tick:            type 0, pair id (uint16), timestamp (float64 seconds), price (float64)
+# prices and timestamps are stored as the exact doubles the feed produced, so a replay is bit-identical
+MAGIC = b"TICKS1\n"
+_TICK = struct.Struct("<BHdd")
+_PAIR = struct.Struct("<BHB")
+_TICK_RECORD = 0
+_PAIR_RECORD = 1
+
+# (trading pair, price, timestamp), the same order PriceFeed callbacks use
+Tick = Tuple[str, float, float]
+
+class TickWriter:
+
+    # appends ticks to a tick file; reopening an existing file continues its pair table
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.ticks_written = 0
+        self._pairs: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        if os.path.exists(path) and os.path.getsize(path) > 0:
+            for pair in TickReader(path).pairs():
+                self._pairs[pair] = len(self._pairs)
+            self._file: BinaryIO = open(path, "ab")
+        else:
+            self._file = open(path, "wb")
+            self._file.write(MAGIC)
+
+    def write(self, trading_pair: str, price: float, timestamp: float) -> None:
+        with self._lock:
+            pair_id = self._pairs.get(trading_pair)
+            if pair_id is None:
+                pair_id = self._pairs[trading_pair] = len(self._pairs)
+                name = trading_pair.encode("ascii")
+                self._file.write(_PAIR.pack(_PAIR_RECORD, pair_id, len(name)) + name)
+            self._file.write(_TICK.pack(_TICK_RECORD, pair_id, timestamp, price))
+            self.ticks_written += 1
+
+    def flush(self) -> None:
+        with self._lock:
+            self._file.flush()
+
+    def close(self) -> None:
+        with self._lock:
+            self._file.close()
+
+class TickReader:
+
+    # reads a tick file in one pass; a truncated last record (recorder killed mid-write) is ignored
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+
+    def _records(self) -> Iterator[Tuple[int, int, object, float]]:
+        # yields (type, pair id, name or timestamp, price)
+
+        with open(self.path, "rb") as f:
+            data = f.read()
+        if not data.startswith(MAGIC):
+            raise ValueError(f"{self.path} is not a tick file")
+        offset, size = len(MAGIC), len(data)
+        tick_size, pair_size = _TICK.size, _PAIR.size
+        unpack_tick, unpack_pair = _TICK.unpack_from, _PAIR.unpack_from
+        while offset < size:
+            if data[offset] == _TICK_RECORD:
+                if offset + tick_size > size:
+                    break
+                _, pair_id, timestamp, price = unpack_tick(data, offset)
+                offset += tick_size
+                yield _TICK_RECORD, pair_id, timestamp, price
+            else:
+                if offset + pair_size > size:
+                    break
+                _, pair_id, length = unpack_pair(data, offset)
+                offset += pair_size
+                if offset + length > size:
+                    break
+                yield _PAIR_RECORD, pair_id, data[offset:offset + length].decode("ascii"), 0.0
+                offset += length
+
+    def pairs(self) -> List[str]:
+        return [name for kind, _, name, _ in self._records() if kind == _PAIR_RECORD]
+
+    def ticks(self, trading_pairs: Optional[Iterable[str]] = None) -> Iterator[Tick]:
+        # every tick in recorded order, optionally only for some pairs
+
+        wanted = set(trading_pairs) if trading_pairs is not None else None
+        names: Dict[int, str] = {}
+        for kind, pair_id, value, price in self._records():
+            if kind == _PAIR_RECORD:
+                names[pair_id] = value
+            elif wanted is None or names[pair_id] in wanted:
+                yield names[pair_id], price, value
+
+class TickRecorder:
+
+    # subscribes to a PriceFeed and writes every tick of the given pairs to a tick file
+
+    def __init__(self, path: str, trading_pairs: List[str], price_feed: Optional[PriceFeed] = None) -> None:
+        self.writer = TickWriter(path)
+        self.trading_pairs = trading_pairs
+        self.price_feed = price_feed or create_price_feed()
+
+    def start(self) -> None:
+        for trading_pair in self.trading_pairs:
+            self.price_feed.subscribe(trading_pair, self.writer.write)
+
+    def stop(self) -> None:
+        for trading_pair in self.trading_pairs:
+            self.price_feed.unsubscribe(trading_pair, self.writer.write)
+        self.writer.close()
+
+    def record(self, duration: float) -> int:
+        # record for `duration` seconds; returns the number of ticks written
+        self.start()
+        try:
+            deadline = time.monotonic() + duration
+            while time.monotonic() < deadline:
+                time.sleep(min(1.0, deadline - time.monotonic()))
+                self.writer.flush()
+        finally:
+            self.stop()
+        return self.writer.ticks_written
+
+class ReplayPriceFeed(PriceFeed):
+
+    # replays a tick file through the PriceFeed interface on a VirtualClock: no sleeps and no network
+    # ticks() is a pull replay for one pair; run() pushes every tick to the subscribers in order
+
+    def __init__(self, path: str, clock: Optional[VirtualClock] = None) -> None:
+        super().__init__()
+        self.reader = TickReader(path)
+        self.clock = clock or VirtualClock()
+        self.finished = threading.Event()
+
+    def ticks(self, trading_pair: str, timeout: Optional[float] = None) -> Iterator[Optional[float]]:
+        # yields the pair's recorded prices; a gap longer than `timeout` yields None once per timeout,
+        # the way the live feed reports a missed update; ends with the recording
+
+        started = False
+        for _, price, timestamp in self.reader.ticks([trading_pair]):
+            if timeout and started:
+                while timestamp - self.clock.now > timeout:
+                    self.clock.sleep(timeout)
+                    yield None
+            started = True
+            self.clock.advance_to(timestamp)
+            yield price
+
+    def subscribe(self, trading_pair: str, callback: PriceCallback) -> None:
+        # unlike live feeds, subscribing does not start the replay; call run() or start() once every
+        # subscriber is registered
+        with self._lock:
+            self._subscribers.setdefault(trading_pair, []).append(callback)
+
+    def run(self) -> None:
+        # push every tick of the subscribed pairs in recorded order, in the calling thread
+        for trading_pair, price, timestamp in self.reader.ticks(self.subscribed_pairs()):
+            if self._stop_event.is_set():
+                break
+            self.clock.advance_to(timestamp)
+            self._publish(trading_pair, price, timestamp)
+        self.finished.set()
+
+    def _run(self) -> None:
+        self.run()
+
+def record_main() -> None:
+    # prompt for pairs and a duration and record their live ticks to TICK_DATA_DIR
+
+    trading_pairs = [pair.strip() for pair in
+                     input("Enter the trading pairs to record (e.g., BTCINR, ETHINR): ").upper().split(",")
+                     if pair.strip()]
+    duration = float(input("Enter the recording duration in minutes: ").strip()) * 60
+    path = os.path.join(TICK_DATA_DIR, f"{'_'.join(trading_pairs)}_{datetime.now():%Y%m%d_%H%M%S}.ticks")
+    print(f"⏺️ Recording {', '.join(trading_pairs)} every {PRICE_POLL_INTERVAL}s to {path}")
+    try:
+        ticks = TickRecorder(path, trading_pairs).record(duration)
+    except KeyboardInterrupt:
+        ticks = None
+    if DEBUG_MODE and ticks is not None:
+        print(f"🔍 {ticks} ticks recorded ({os.path.getsize(path)} bytes)")
+    print(f"✅ Ticks saved to {path}")
+
+if __name__ == "__main__":
+    record_main()
@@ -0,0 +1,334 @@
+import csv
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Union
+from config.settings import TRADE_JOURNAL_PATH
+
+# a point in time for queries: unix seconds or a datetime
+TimeLike = Union[float, int, datetime, None]
+
+DAY = 86400
+
+# (time, trading pair, order type, current price, investment, quantity, wallet balance,
+#  stop-loss, take-profit, initial price, buy price, sell price, profit) - the Logger row order
+TRADE_FIELDS = ("time", "trading_pair", "order_type", "current_price", "investment", "quantity",
+                "wallet_balance", "stop_loss_price", "take_profit_price", "initial_price",
+                "buy_price", "sell_price", "profit")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS trades (
+    id INTEGER PRIMARY KEY,
+    time REAL NOT NULL,
+    trading_pair TEXT NOT NULL,
+    order_type TEXT NOT NULL,
+    current_price REAL,
+    investment REAL,
+    quantity REAL,
+    wallet_balance REAL,
+    stop_loss_price REAL,
+    take_profit_price REAL,
+    initial_price REAL,
+    buy_price REAL,
+    sell_price REAL,
+    profit REAL,
+    source TEXT
+);
+-- covers the partial-day totals, so edge queries never touch the table rows
+CREATE INDEX IF NOT EXISTS trades_time ON trades (time, trading_pair, order_type, quantity, current_price, profit);
+CREATE INDEX IF NOT EXISTS trades_pair_time ON trades (trading_pair, time);
+CREATE INDEX IF NOT EXISTS trades_type_time ON trades (order_type, time);
+CREATE TABLE IF NOT EXISTS pair_days (
+    day INTEGER NOT NULL,
+    trading_pair TEXT NOT NULL,
+    realized_pnl REAL NOT NULL DEFAULT 0,
+    closed_trades INTEGER NOT NULL DEFAULT 0,
+    wins INTEGER NOT NULL DEFAULT 0,
+    bought_quantity REAL NOT NULL DEFAULT 0,
+    sold_quantity REAL NOT NULL DEFAULT 0,
+    bought_value REAL NOT NULL DEFAULT 0,
+    sold_value REAL NOT NULL DEFAULT 0,
+    PRIMARY KEY (day, trading_pair)
+);
+CREATE TABLE IF NOT EXISTS imported_files (
+    path TEXT PRIMARY KEY,
+    rows INTEGER NOT NULL,
+    imported_at REAL NOT NULL
+);
+"""
+
+# per-pair totals over raw trades or over pair_days; same column order for both
+_TRADE_TOTALS = """
+SELECT trading_pair,
+       TOTAL(CASE WHEN order_type = 'Sell' THEN profit END),
+       COUNT(CASE WHEN order_type = 'Sell' THEN profit END),
+       COUNT(CASE WHEN order_type = 'Sell' AND profit > 0 THEN 1 END),
+       TOTAL(CASE WHEN order_type = 'Buy' THEN quantity END),
+       TOTAL(CASE WHEN order_type = 'Sell' THEN quantity END),
+       TOTAL(CASE WHEN order_type = 'Buy' THEN quantity * current_price END),
+       TOTAL(CASE WHEN order_type = 'Sell' THEN quantity * current_price END)
+FROM trades WHERE time >= ? AND time < ? {pair_filter} GROUP BY trading_pair
+"""
+_DAY_TOTALS = """
+SELECT trading_pair, TOTAL(realized_pnl), TOTAL(closed_trades), TOTAL(wins), TOTAL(bought_quantity),
+       TOTAL(sold_quantity), TOTAL(bought_value), TOTAL(sold_value)
+FROM pair_days WHERE day >= ? AND day < ? {pair_filter} GROUP BY trading_pair
+"""
+_ROLLUP = """
+INSERT INTO pair_days (day, trading_pair, realized_pnl, closed_trades, wins,
+                       bought_quantity, sold_quantity, bought_value, sold_value)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (day, trading_pair) DO UPDATE SET
+    realized_pnl = realized_pnl + excluded.realized_pnl,
+    closed_trades = closed_trades + excluded.closed_trades,
+    wins = wins + excluded.wins,
+    bought_quantity = bought_quantity + excluded.bought_quantity,
+    sold_quantity = sold_quantity + excluded.sold_quantity,
+    bought_value = bought_value + excluded.bought_value,
+    sold_value = sold_value + excluded.sold_value
+"""
+TOTAL_KEYS = ("realized_pnl", "closed_trades", "wins", "bought_quantity", "sold_quantity",
+              "bought_value", "sold_value")
+
+class TradeJournal:
+
+    # SQLite trade journal (WAL mode) with indexes on time, pair and order type
+    # inserts also roll each trade into a per-pair, per-UTC-day summary table; range queries read the
+    # summary for whole days and the indexed trades only for the partial days at either end, so they
+    # stay in milliseconds however many trades the journal holds
+
+    def __init__(self, path: str = TRADE_JOURNAL_PATH) -> None:
+        self.path = path
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        # journals created before imports were tagged with their file have no source column
+        if "source" not in {row[1] for row in self._conn.execute("PRAGMA table_info(trades)")}:
+            self._conn.execute("ALTER TABLE trades ADD COLUMN source TEXT")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS trades_source ON trades (source)")
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    @staticmethod
+    def _timestamp(value: TimeLike, default: float) -> float:
+        if value is None:
+            return default
+        if isinstance(value, datetime):
+            return value.timestamp()
+        return float(value)
+
+    @staticmethod
+    def _rollup(rows: Sequence[tuple], sign: int = 1) -> List[tuple]:
+        # per (day, pair) increments for pair_days (sign=-1 takes the rows back out)
+        totals: Dict[tuple, List[float]] = {}
+        for row in rows:
+            trade_time, trading_pair, order_type, price, _, quantity = row[:6]
+            profit = row[12]
+            entry = totals.setdefault((int(trade_time // DAY), trading_pair), [0.0, 0, 0, 0.0, 0.0, 0.0, 0.0])
+            quantity = quantity or 0.0
+            value = quantity * (price or 0.0)
+            if order_type == "Buy":
+                entry[3] += quantity
+                entry[5] += value
+            elif order_type == "Sell":
+                entry[4] += quantity
+                entry[6] += value
+                if profit is not None:
+                    entry[0] += profit
+                    entry[1] += 1
+                    entry[2] += profit > 0
+        return [key + tuple(sign * value for value in values) for key, values in totals.items()]
+
+    def insert_many(self, rows: Iterable[tuple], source: Optional[str] = None) -> int:
+        # insert trades (tuples in TRADE_FIELDS order, order type "Buy"/"Sell") in one transaction
+        # source tags the rows with the file they were imported from, so a forced re-import can replace them
+
+        rows = [tuple(row) for row in rows]
+        if not rows:
+            return 0
+        placeholders = ", ".join("?" for _ in TRADE_FIELDS + ("source",))
+        with self._lock, self._conn:
+            self._conn.executemany(f"INSERT INTO trades ({', '.join(TRADE_FIELDS)}, source) VALUES ({placeholders})",
+                                   [row + (source,) for row in rows])
+            self._conn.executemany(_ROLLUP, self._rollup(rows))
+        return len(rows)
+
+    def delete_source(self, source: str) -> int:
+        # remove the trades imported from `source` and take them back out of the daily summary
+
+        with self._lock, self._conn:
+            rows = self._conn.execute(f"SELECT {', '.join(TRADE_FIELDS)} FROM trades WHERE source = ?",
+                                      (source,)).fetchall()
+            if rows:
+                self._conn.executemany(_ROLLUP, self._rollup(rows, sign=-1))
+                self._conn.execute("DELETE FROM trades WHERE source = ?", (source,))
+        return len(rows)
+
+    def insert(self, *row: Any) -> None:
+        self.insert_many([row])
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM trades").fetchone()[0]
+
+    def _totals(self, start: TimeLike = None, end: TimeLike = None,
+                trading_pair: Optional[str] = None) -> Dict[str, Dict[str, float]]:
+        # per-pair totals for start <= time < end (open ends mean all time)
+
+        start_ts = self._timestamp(start, 0.0)
+        end_ts = self._timestamp(end, time.time() + DAY)
+        if end_ts <= start_ts:
+            return {}
+        pair_filter = "AND trading_pair = ?" if trading_pair else ""
+        pair_args = (trading_pair,) if trading_pair else ()
+        first_day = -(-start_ts // DAY)          # first whole day inside the range
+        last_day = end_ts // DAY                 # first day not wholly inside it
+        queries = []
+        if first_day < last_day:
+            queries.append((_DAY_TOTALS, (int(first_day), int(last_day))))
+            queries.append((_TRADE_TOTALS, (start_ts, first_day * DAY)))
+            queries.append((_TRADE_TOTALS, (last_day * DAY, end_ts)))
+        else:
+            queries.append((_TRADE_TOTALS, (start_ts, end_ts)))
+        totals: Dict[str, Dict[str, float]] = {}
+        with self._lock:
+            for sql, bounds in queries:
+                if bounds[0] >= bounds[1]:
+                    continue
+                for pair, *values in self._conn.execute(sql.format(pair_filter=pair_filter), bounds + pair_args):
+                    entry = totals.setdefault(pair, dict.fromkeys(TOTAL_KEYS, 0.0))
+                    for key, value in zip(TOTAL_KEYS, values):
+                        entry[key] += value
+        return totals
+
+    def realized_pnl(self, start: TimeLike = None, end: TimeLike = None,
+                     trading_pair: Optional[str] = None) -> Dict[str, float]:
+        return {pair: entry["realized_pnl"] for pair, entry in self._totals(start, end, trading_pair).items()}
+
+    def win_rate(self, start: TimeLike = None, end: TimeLike = None,
+                 trading_pair: Optional[str] = None) -> Dict[str, Dict[str, float]]:
+        # closed trades (sells with a recorded profit), wins and win rate per pair
+        return {
+            pair: {"closed_trades": int(entry["closed_trades"]), "wins": int(entry["wins"]),
+                   "win_rate": entry["wins"] / entry["closed_trades"] if entry["closed_trades"] else 0.0}
+            for pair, entry in self._totals(start, end, trading_pair).items()
+        }
+
+    def exposure(self, start: TimeLike = None, end: TimeLike = None,
+                 trading_pair: Optional[str] = None) -> Dict[str, Dict[str, float]]:
+        # net quantity and value bought minus sold per pair (at trade prices) over the range
+        return {
+            pair: {"bought_quantity": entry["bought_quantity"], "sold_quantity": entry["sold_quantity"],
+                   "open_quantity": entry["bought_quantity"] - entry["sold_quantity"],
+                   "open_value": entry["bought_value"] - entry["sold_value"]}
+            for pair, entry in self._totals(start, end, trading_pair).items()
+        }
+
+    def summary(self, start: TimeLike = None, end: TimeLike = None,
+                trading_pair: Optional[str] = None) -> Dict[str, Dict[str, float]]:
+        # realized P&L, win rate and exposure per pair in one pass
+        summary = {}
+        for pair, entry in self._totals(start, end, trading_pair).items():
+            summary[pair] = {
+                "realized_pnl": entry["realized_pnl"],
+                "closed_trades": int(entry["closed_trades"]),
+                "win_rate": entry["wins"] / entry["closed_trades"] if entry["closed_trades"] else 0.0,
+                "open_quantity": entry["bought_quantity"] - entry["sold_quantity"],
+                "open_value": entry["bought_value"] - entry["sold_value"],
+            }
+        return summary
+
+    def trades(self, start: TimeLike = None, end: TimeLike = None, trading_pair: Optional[str] = None,
+               order_type: Optional[str] = None, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        # raw trades in a range, newest first
+        clauses, args = ["time >= ?", "time < ?"], [self._timestamp(start, 0.0), self._timestamp(end, time.time() + DAY)]
+        if trading_pair:
+            clauses.append("trading_pair = ?")
+            args.append(trading_pair)
+        if order_type:
+            clauses.append("order_type = ?")
+            args.append(order_type.capitalize())
+        sql = f"SELECT {', '.join(TRADE_FIELDS)} FROM trades WHERE {' AND '.join(clauses)} ORDER BY time DESC"
+        if limit:
+            sql += f" LIMIT {int(limit)}"
+        with self._lock:
+            return [dict(zip(TRADE_FIELDS, row)) for row in self._conn.execute(sql, args)]
+
+    @staticmethod
+    def _parse_csv_row(record: Dict[str, str]) -> tuple:
+        def number(value: Optional[str]) -> Optional[float]:
+            return float(value) if value not in (None, "") else None
+
+        # Logger writes local time without a zone
+        trade_time = datetime.strptime(record["Time"], "%Y-%m-%d %H:%M:%S").timestamp()
+        return (trade_time, record["Trading Pair"], record["Order Type"].capitalize(),
+                number(record["Current Price"]), number(record["Investment"]), number(record["Quantity"]),
+                number(record["Wallet Balance"]), number(record["Stop-Loss Price"]),
+                number(record["Take-Profit Price"]), number(record["Initial Price"]),
+                number(record["Buy Price"]), number(record["Sell Price"]), number(record["Profit"]))
+
+    def import_csv(self, csv_path: str, force: bool = False, batch_size: int = 10000) -> int:
+        # one-shot import of a Logger CSV; a file already imported is skipped unless force=True, which
+        # replaces the trades of the earlier import instead of adding them a second time
+        # older logs wrote every monitored sell twice (without and then with profit); the profit-less
+        # copy is dropped so quantities are not counted twice
+
+        key = os.path.abspath(csv_path)
+        with self._lock:
+            done = self._conn.execute("SELECT rows FROM imported_files WHERE path = ?", (key,)).fetchone()
+        if done and not force:
+            print(f"⚠️ {csv_path} was already imported ({done[0]} trades), skipping.")
+            return 0
+        if done:
+            removed = self.delete_source(key)
+            if removed < done[0]:
+                # imports made before rows were tagged with their file cannot be told apart
+                print(f"⚠️ Only {removed} of the {done[0]} earlier trades from {csv_path} could be replaced.")
+        total = 0
+        batch: List[tuple] = []
+        previous: Optional[tuple] = None
+        with open(csv_path, newline="", encoding="utf-8") as f:
+            for record in csv.DictReader(f):
+                row = self._parse_csv_row(record)
+                if (previous is not None and previous[2] == "Sell" and previous[12] is None
+                        and row[2] == "Sell" and row[12] is not None and previous[:2] == row[:2]
+                        and previous[5] == row[5] and batch and batch[-1] is previous):
+                    batch.pop()
+                    total -= 1
+                batch.append(row)
+                total += 1
+                previous = row
+                if len(batch) >= batch_size:
+                    # keep the last row back so a duplicate pair split across batches is still caught
+                    self.insert_many(batch[:-1], source=key)
+                    batch = batch[-1:]
+        self.insert_many(batch, source=key)
+        with self._lock, self._conn:
+            self._conn.execute("INSERT OR REPLACE INTO imported_files VALUES (?, ?, ?)", (key, total, time.time()))
+        print(f"✅ Imported {total} trades from {csv_path} into {self.path}")
+        return total
+
+def journal_main() -> None:
+    # import the CSV trade log (once) and print the per-pair summary for the last 7 days and all time
+
+    from utils.logging_utils import Logger
+    journal = TradeJournal()
+    csv_path = Logger._get_log_file_path()
+    if os.path.exists(csv_path):
+        journal.import_csv(csv_path)
+    for label, start in (("Last 7 days", time.time() - 7 * DAY), ("All time", None)):
+        print(f"\n📊 {label}:")
+        for pair, entry in sorted(journal.summary(start).items()):
+            print(f"➡️ {pair}: P&L {entry['realized_pnl']:.2f} INR | Closed trades: {entry['closed_trades']} | "
+                  f"Win rate: {entry['win_rate'] * 100:.1f}% | Open quantity: {entry['open_quantity']:g}")
+
+if __name__ == "__main__":
+    journal_main()